@@ -0,0 +1,395 @@
+# -*- coding: utf8 -*-
+# Copyright 2012 -- 2013 Harald Schilly <harald.schilly@univie.ac.at>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+r"""
+Asyncio
+=======
+
+An :mod:`asyncio` based variant of the :class:`~panobbgo.core.EventBus` and the main
+loop of the :class:`~panobbgo.core.StrategyBase`, enabled via ``--event-loop asyncio``.
+
+All handlers run as tasks on one event loop, instead of one thread per handler:
+
+- ``on_*`` handlers can be coroutines (``async def``).
+  Their return value are points, just like for ordinary handlers.
+- An ``async def on_start`` of a heuristic, which ``yield``\ s points, is a *producer*:
+  this async generator is only advanced by the main loop,
+  when the heuristic's output is empty and there are free slots for new tasks.
+- Completed tasks of the :mod:`evaluators <panobbgo.evaluators>` wake up
+  the main loop, which awaits them.
+- Plain handlers of analyzers (and of the strategy) are short callbacks,
+  which are called directly on the event loop.
+
+Ordinary handlers of heuristics might block when emitting into their
+bounded output queue. Hence, they and all handlers, which are
+:func:`~panobbgo.core.dedicated` to a thread, are still served by the
+:class:`~panobbgo.core.Dispatcher` or threads on their own.
+
+.. Note::
+
+  The ``block`` overflow policy can't block a publisher running on the event loop.
+  Therefore, the queues of handlers running on the event loop are only bounded for
+  the ``drop_oldest`` and ``coalesce`` policies.
+
+.. codeauthor:: Harald Schilly <harald.schilly@univie.ac.at>
+"""
+
+import asyncio
+import threading
+from IPython.utils.timing import time
+
+from .core import EventBus, Heuristic, StopHeuristic, _coalesce, \
+    FIFO, LATEST, BLOCK, DROP_OLDEST
+
+
+class _LoopEvent:
+
+    """
+    Stands in for the :class:`threading.Event` of the main loop,
+    but it can be set from any thread and awaited on the event loop.
+    """
+
+    def __init__(self, loop):
+        self.loop = loop
+        self._thread = threading.get_ident()
+        self._event = asyncio.Event()
+
+    def set(self):
+        if threading.get_ident() == self._thread:
+            self._event.set()
+        else:
+            self.loop.call_soon_threadsafe(self._event.set)
+
+    def clear(self):
+        self._event.clear()
+
+    def is_set(self):
+        return self._event.is_set()
+
+    async def wait(self, timeout=None):
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return self._event.is_set()
+
+
+class _AsyncSlot:
+
+    """
+    The event queue of one handler, which runs on the event loop.
+    Its events are processed by one task.
+    """
+
+    def __init__(self, eventbus, target, key, handler, policy=FIFO, maxsize=0, overflow=BLOCK):
+        from collections import deque
+        self.eventbus = eventbus
+        self.target = target
+        self.key = key
+        self.handler = handler
+        self.stats = eventbus._event_stats(key, target)
+        self.policy = policy
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self.events = deque()
+        self.ready = asyncio.Event()
+        self.busy = False
+        self.task = None
+
+    def put(self, event):
+        bus = self.eventbus
+        if bus.loop is None or threading.get_ident() == bus._thread:
+            self._put(event)
+        else:
+            bus.loop.call_soon_threadsafe(self._put, event)
+
+    def _put(self, event):
+        bus = self.eventbus
+        if self.overflow != BLOCK and 0 < self.maxsize <= len(self.events):
+            if self.overflow == DROP_OLDEST:
+                self.events.popleft()
+                bus._count(bus.dropped, self.key)
+            else:
+                event = _coalesce(self.events.pop(), event)
+                bus._count(bus.coalesced, self.key)
+        self.events.append(event)
+        bus._high_water(self.key, self.target, len(self.events), self.maxsize)
+        self.ready.set()
+
+    def _next(self):
+        if self.policy == FIFO:
+            return self.events.popleft()
+        events = list(self.events)
+        self.events.clear()
+        self.eventbus._count(self.eventbus.coalesced, self.key, len(events) - 1)
+        return events[-1] if self.policy == LATEST else events
+
+    async def run(self):
+        bus = self.eventbus
+        while True:
+            await self.ready.wait()
+            self.ready.clear()
+            while len(self.events) > 0:
+                self.busy = True
+                try:
+                    if not await bus._acall(self.key, self.target, self._next(),
+                                            self.handler, self.stats):
+                        return
+                except Exception as e:
+                    import traceback
+                    bus.logger.critical("Exception: %s in %s: %s -> unsubscribing.\n%s" %
+                                        (self.key, self.target, e, traceback.format_exc()))
+                    bus.unsubscribe(self.key, self.target)
+                    return
+                finally:
+                    self.busy = False
+
+    @property
+    def idle(self):
+        return self.task is None or self.task.done() or \
+            (len(self.events) == 0 and not self.busy)
+
+
+class AsyncEventBus(EventBus):
+
+    """
+    The :class:`~panobbgo.core.EventBus` for the asyncio event loop,
+    see :mod:`panobbgo.aio`.
+    Events can be published from any thread.
+    """
+
+    def __init__(self, config):
+        EventBus.__init__(self, config)
+        self.loop = None
+        self._thread = None
+        self._slots = []
+        self._producers = []
+        self._space = None
+        # the wakeup event of the main loop, set when the producers might have new points
+        self._wakeup = None
+
+    def _bind(self, target, key, method, policy, maxsize, overflow):
+        import inspect
+        native = inspect.iscoroutinefunction(method) or inspect.isasyncgenfunction(method)
+        if not native and (self._is_dedicated(key, method) or isinstance(target, Heuristic)):
+            return EventBus._bind(self, target, key, method, policy, maxsize, overflow)
+        slot = _AsyncSlot(self, target, key, method, policy, maxsize, overflow)
+        self._slots.append(slot)
+        if self.loop is not None:
+            slot.task = self.loop.create_task(slot.run())
+        return slot
+
+    def start(self, loop):
+        """
+        Starts processing the events on the ``loop``, called from inside the loop.
+        """
+        self.loop = loop
+        self._thread = threading.get_ident()
+        self._space = asyncio.Event()
+        for slot in self._slots:
+            slot.task = loop.create_task(slot.run())
+
+    def publish(self, key, event=None, terminate=False, **kwargs):
+        EventBus.publish(self, key, event=event, terminate=terminate, **kwargs)
+        # the handlers update the state of the producers, pull them again
+        if self._wakeup is not None and any(h._producer is not None for h in self._producers):
+            self._wakeup.set()
+
+    async def join(self, timeout=10.):
+        """
+        Waits until all events of the handlers on the event loop are processed.
+        """
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            await asyncio.sleep(1e-3)
+            if all(slot.idle for slot in self._slots):
+                return True
+        return False
+
+    async def stop(self):
+        """
+        Closes the producers, cancels the tasks of the handlers and waits for them.
+        """
+        for h in self._producers:
+            if h._producer is not None:
+                await h._producer.aclose()
+                h._producer = None
+        tasks = [slot.task for slot in self._slots if slot.task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def space(self):
+        """
+        Signals, that there is space in the output of the heuristics, e.g. after
+        the strategy took their points.
+        """
+        if self._space is not None:
+            self._space.set()
+
+    async def emit(self, target, points):
+        """
+        Like :meth:`~panobbgo.core.Heuristic.emit`, but it awaits free space in the
+        output of the heuristic ``target``, instead of blocking the event loop.
+        """
+        epoch = target.epoch
+        block = target._block(points)
+        done = 0
+        while done < len(block):
+            done += target._output.put(block[done:], block=False, epoch=epoch)
+            if done < len(block):
+                self._space.clear()
+                await self._space.wait()
+        target.strategy.wakeup(points=True)
+
+    async def _acall(self, key, target, event, handler=None, stats=None):
+        """
+        The counterpart of :meth:`~panobbgo.core.EventBus._call` on the event loop.
+        """
+        import inspect
+        import types
+        if stats is None:
+            stats = self._event_stats(key, target)
+        events = event if isinstance(event, list) else [event]
+        start = time.time()
+        for e in events:
+            stats.wait.add(start - e._when)
+        self._lag(key, target, start - events[0]._when)
+        try:
+            if handler is None:
+                handler = getattr(target, 'on_%s' % key)
+            try:
+                args, kwargs = ([event], {}) if isinstance(event, list) else ([], event._kwargs)
+                if inspect.isasyncgenfunction(handler):
+                    if key == 'start' and isinstance(target, Heuristic):
+                        # a producer, advanced by pull()
+                        target._producer = handler(*args, **kwargs)
+                        self._producers.append(target)
+                    else:
+                        async for points in handler(*args, **kwargs):
+                            if points is not None:
+                                await self.emit(target, points)
+                else:
+                    new_points = handler(*args, **kwargs)
+                    if isinstance(new_points, types.CoroutineType):
+                        new_points = await new_points
+                    if isinstance(new_points, types.GeneratorType):
+                        for points in new_points:
+                            if points is not None:
+                                await self.emit(target, points)
+                    elif new_points is not None:
+                        await self.emit(target, new_points)
+            except StopHeuristic:
+                raise
+            except Exception:
+                stats.failed += len(events)
+                raise
+            finally:
+                stats.handler.add(time.time() - start)
+            stats.delivered += len(events)
+            if any(e.terminate for e in events):
+                raise StopHeuristic("%s terminated" % target.name)
+        except StopHeuristic as e:
+            self.logger.debug("'%s/on_%s' %s -> unsubscribing." % (target.name, key, e))
+            self.unsubscribe(key, target)
+            return False
+        return True
+
+    async def pull(self, heuristics):
+        """
+        Advances the producers of all given ``heuristics`` with an empty output
+        concurrently by one step and puts their points into the output.
+        Points exceeding the capacity of the output are discarded.
+
+        :return: ``True``, if at least one of them yielded points.
+        """
+        hungry = [h for h in heuristics
+                  if h._producer is not None and h._output.qsize() == 0]
+        if len(hungry) == 0:
+            return False
+        return any(await asyncio.gather(*[self._pull(h) for h in hungry]))
+
+    async def _pull(self, h):
+        stats = self._event_stats('start', h)
+        start = time.time()
+        try:
+            points = await h._producer.__anext__()
+        except (StopAsyncIteration, StopHeuristic):
+            h._producer = None
+            h._stopped = True
+            self.logger.info("'%s' producer stopped." % h.name)
+            return False
+        except Exception as e:
+            import traceback
+            h._producer = None
+            stats.failed += 1
+            self.logger.critical("Exception: start in %s: %s -> stopping.\n%s" %
+                                 (h, e, traceback.format_exc()))
+            return False
+        finally:
+            stats.handler.add(time.time() - start)
+        if points is None:
+            return False
+        block = h._block(points)
+        if len(block) == 0:
+            return False
+        h._output.put(block, block=False)
+        return True
+
+
+async def run_strategy(strategy):
+    """
+    The main loop of the :class:`~panobbgo.core.StrategyBase` on the event loop.
+    Each round (see :meth:`~panobbgo.core.StrategyBase._round`) is preceded by
+    pulling the producers and followed by awaiting the completion of a task or new points.
+    Producers without new points are pulled again after the next event.
+    """
+    loop = asyncio.get_running_loop()
+    bus = strategy.eventbus
+    if not isinstance(bus, AsyncEventBus):
+        raise ValueError("%s needs an AsyncEventBus, not %s" % (strategy.name, bus))
+    strategy._wakeup = bus._wakeup = _LoopEvent(loop)
+    bus.start(loop)
+    bus.publish('start', terminate=True)
+    strategy._start = time.time()
+    bus.register(strategy)
+    strategy.logger.info("Strategy '%s' started on the asyncio event loop" % strategy.name)
+    strategy.loops = 0
+    while True:
+        strategy.loops += 1
+        # events after this point wake up the next round
+        strategy._wakeup.clear()
+
+        pulled = False
+        if strategy.free_slots > 0:
+            pulled = await bus.pull(strategy.heuristics)
+
+        stop = strategy._round()
+        bus.space()
+        if stop:
+            break
+
+        # await a finished task or, if there are free slots, new points
+        strategy._hungry = strategy.free_slots > 0
+        if strategy._hungry and (pulled or strategy._points_ready()):
+            await asyncio.sleep(0)  # give the handlers a chance
+        else:
+            await strategy._wakeup.wait(1.)
+
+    # the handlers on the loop are done, before the modules are stopped
+    bus.publish('finished')
+    await bus.join()
+    await bus.stop()
+    strategy._cleanup(publish=False)
@@ -0,0 +1,158 @@
+# -*- coding: utf8 -*-
+# Copyright 2012 Harald Schilly <harald.schilly@univie.ac.at>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from __future__ import unicode_literals
+
+import asyncio
+import threading
+import mock
+import numpy as np
+
+from panobbgo.core import Analyzer, Heuristic
+from panobbgo.utils import PanobbgoTestCase
+
+
+def get_serial_setup_cluster():
+    def serial_setup_cluster(self, nb_gens, problem):
+        from panobbgo.evaluators import SerialEvaluator
+        self.generators = mock.MagicMock()
+        self.evaluators = SerialEvaluator(self, problem)
+    return serial_setup_cluster
+
+
+class Idle(Heuristic):
+
+    """
+    A producer, which has no points for a while.
+    """
+
+    def __init__(self, strategy):
+        Heuristic.__init__(self, strategy, name="Idle", cap=10)
+        self.idle = 0
+
+    async def on_start(self):
+        import time
+        start = time.time()
+        while time.time() < start + .2:
+            self.idle += 1
+            yield None
+        while True:
+            yield self.problem.random_point()
+
+
+class Finisher(Analyzer):
+
+    def __init__(self, strategy):
+        Analyzer.__init__(self, strategy)
+        self.stopped = False
+        self.finished = None
+
+    async def on_finished(self):
+        self.finished = not self.stopped
+
+    def __stop__(self):
+        self.stopped = True
+        Analyzer.__stop__(self)
+
+
+class AsyncTests(PanobbgoTestCase):
+
+    def test_async_eventbus(self):
+        from panobbgo.aio import AsyncEventBus
+
+        class Collector(Analyzer):
+
+            def __init__(self, strategy):
+                Analyzer.__init__(self, strategy)
+                self.values = []
+                self.threads = set()
+
+            def on_foo(self, i):
+                self.threads.add(threading.get_ident())
+                self.values.append(i)
+
+            async def on_bar(self, i):
+                await asyncio.sleep(0)
+                self.values.append(-i)
+
+        class Producer(Heuristic):
+
+            def __init__(self, strategy):
+                Heuristic.__init__(self, strategy, cap=2)
+                self.steps = 0
+
+            async def on_start(self):
+                for i in range(3):
+                    self.steps += 1
+                    yield np.array([.1 * i, 0.])
+
+            async def on_foo(self, i):
+                if i == 0:
+                    yield np.zeros(2)
+
+        async def main():
+            bus = AsyncEventBus(self.config)
+            coll = Collector(self.strategy)
+            prod = Producer(self.strategy)
+            bus.register(coll)
+            bus.register(prod)
+            bus.start(asyncio.get_running_loop())
+            bus.publish('start', terminate=True)
+            for i in range(10):
+                bus.publish('foo', i=i)
+                bus.publish('bar', i=i)
+            # publishing from another thread
+            t = threading.Thread(target=bus.publish, args=('foo',), kwargs={'i': 10})
+            t.start()
+            t.join()
+            assert await bus.join()
+
+            # handlers ran on the event loop, the producer wasn't advanced yet
+            assert coll.threads == set([threading.get_ident()])
+            assert sorted(coll.values) == sorted(list(range(11)) + [-i for i in range(10)])
+            assert prod._producer is not None and prod.steps == 0
+            assert prod.get_points().tolist() == [[0., 0.]]
+
+            # pulled on demand, until it is exhausted
+            for step in range(4):
+                await bus.pull([prod])
+                assert prod.steps == min(step + 1, 3)
+                assert len(prod.get_points()) == (1 if step < 3 else 0)
+            assert prod._producer is None
+            assert bus.stats()[('foo', 'Collector')].delivered == 11
+            await bus.stop()
+
+        asyncio.run(main())
+
+    @mock.patch('panobbgo.core.StrategyBase._setup_cluster', new_callable=get_serial_setup_cluster)
+    def test_idle_loop(self, my_setup_cluster):
+        from panobbgo.aio import run_strategy
+        from panobbgo.strategies import StrategyRoundRobin
+        from panobbgo_lib.classic import Rosenbrock
+        rr = StrategyRoundRobin(Rosenbrock(2), size=2)
+        rr.config.event_loop = 'asyncio'
+        rr.eventbus = rr._setup_eventbus(rr.config)
+        rr.config.max_eval = 10
+        from panobbgo.analyzers import Best
+        rr.add_analyzer(Best(rr), name='best')
+        idle = Idle(rr)
+        rr.add_heuristic(idle)
+        finisher = Finisher(rr)
+        rr.add_analyzer(finisher)
+        asyncio.run(run_strategy(rr))
+        assert rr.nb_evaluations > 10
+        # the loop waited for the producer, instead of spinning
+        assert idle.idle < 10 and rr.loops < 100
+        # the handlers on the loop got the finished event before the modules were stopped
+        assert finisher.finished is True
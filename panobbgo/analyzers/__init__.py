@@ -47,6 +47,11 @@ the strategy.
    :undoc-members:
    :show-inheritance:
 
+.. automodule:: panobbgo.analyzers.spatial_index
+   :members:
+   :undoc-members:
+   :show-inheritance:
+
 .. codeauthor:: Harald Schilly <harald.schilly@univie.ac.at>
 """
 from __future__ import absolute_import
@@ -56,3 +61,4 @@ from .best import Best
 from .splitter import Splitter
 from .grid import Grid
 from .dedensifyer import Dedensifyer
+from .spatial_index import SpatialIndex
@@ -50,6 +50,45 @@ class AnalyzersUtils(PanobbgoTestCase):
         for r in best.pareto_front:
             print(r)
 
+    def test_spatial_index(self):
+        from panobbgo.analyzers import SpatialIndex
+        idx = SpatialIndex(self.strategy, min_log=12)
+        idx.__start__()
+        results = self.random_results(2, 500)
+        for i in range(0, 500, 7):
+            idx.on_new_results(results[i:i + 7])
+        assert len(idx) == 500
+        assert idx.rebuilds > 0
+        assert idx._tree_size < 500  # some are still in the log
+        xx = np.array([r.x for r in results])
+        x = np.array([.5, .5])
+        dists, nearest = idx.nearest(x, k=6)
+        bf = np.sort(np.linalg.norm(xx - x, axis=1))
+        assert np.allclose(dists, bf[:6])
+        assert np.allclose([np.linalg.norm(r.x - x) for r in nearest], bf[:6])
+        within = idx.within(x, .1)
+        assert len(within) == np.sum(bf <= .1)
+
+    def test_spatial_index_scaling(self):
+        from panobbgo.analyzers import SpatialIndex
+        idx = SpatialIndex(self.strategy, min_log=16)
+        idx.__start__()
+        results = self.random_results(2, 20000)
+        for i in range(0, 20000, 5):
+            idx.on_new_results(results[i:i + 5])
+            # the log stays bounded, independent of the number of results
+            assert len(idx) - idx._tree_size < 16
+        # the runs at least double in size, hence there are O(log n) of them
+        sizes = [end - start for start, end, _ in idx._runs]
+        assert all(a >= 2 * b for a, b in zip(sizes, sizes[1:]))
+        assert len(sizes) <= np.log2(20000 / 16.) + 1
+        assert sum(sizes) == idx._tree_size
+        # and there are only O(n / min_log) rebuilds
+        assert idx.rebuilds <= 20000 // 16
+        x = np.array([.2, .7])
+        bf = np.sort(np.linalg.norm(np.array([r.x for r in results]) - x, axis=1))
+        assert np.allclose(idx.nearest(x, k=10)[0], bf[:10])
+        assert len(idx.within(x, .05)) == np.sum(bf <= .05)
 
 if __name__ == '__main__':
     import unittest
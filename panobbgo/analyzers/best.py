@@ -167,7 +167,7 @@ class Best(Analyzer):
         if cx == cy:
             self.logger.debug("eval plot: cx == cy and discarded")
             return
-        if len(self.results.results) == 0:
+        if len(self.results) == 0:
             return
 
         px = 0  # self.problem.ranges[cx] / 10.
@@ -177,8 +177,7 @@ class Best(Analyzer):
         xmin, xmax = xmin - px, xmax + px
         ymin, ymax = ymin - py, ymax + py
 
-        rslts = list(zip(*[(r.x[cx], r.x[cy], r.fx) for r in self.results.results]))
-        x, y, z = rslts
+        x, y, z = self.results.x[:, cx], self.results.x[:, cy], self.results.fx
         xi = np.linspace(xmin, xmax, 30)
         yi = np.linspace(ymin, ymax, 30)
         # grid the data.
@@ -0,0 +1,140 @@
+# -*- coding: utf8 -*-
+# Copyright 2012 Harald Schilly <harald.schilly@univie.ac.at>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from __future__ import division
+from __future__ import unicode_literals
+
+import numpy as np
+
+from panobbgo.core import Analyzer
+
+
+class SpatialIndex(Analyzer):
+
+    r"""
+    Keeps a spatial index over all results, which answers
+    :meth:`k-nearest <.nearest>` and :meth:`radius <.within>` queries.
+
+    The results are split into consecutive runs, each with its own
+    :class:`scipy.spatial.cKDTree`, and a buffered log of at most ``min_log``
+    results inserted afterwards, which is searched by brute force.
+    When the log is full, it becomes a new run and is merged with the preceding
+    runs as long as they are less than twice as large (the "logarithmic method").
+    Hence, the sizes of the runs at least double from the newest to the oldest one,
+    there are :math:`O(\log n)` of them and each result is part of
+    :math:`O(\log n)` rebuilds. Inserts cost :math:`O(\log^2 n)` amortized
+    and queries :math:`O(\log^2 n)` plus the bounded log.
+
+    Distances are euclidean in the coordinates of the problem.
+    """
+
+    def __init__(self, strategy, min_log=64):
+        """
+        Args:
+
+        - ``min_log``: size of the insert log, when it is turned into a tree.
+        """
+        Analyzer.__init__(self, strategy)
+        self.logger = self.config.get_logger('INDEX')
+        self.min_log = min_log
+        from threading import Lock
+        self._lock = Lock()
+        self._results = []
+        self._x = None  # all coordinates, grows by doubling
+        self._runs = []  # (start, end, tree), oldest first
+        self._tree_size = 0  # the first _tree_size results are in the trees
+        self.rebuilds = 0
+
+    def __start__(self):
+        self._x = np.empty((128, self.problem.dim), dtype=np.float64)
+
+    def on_new_results(self, results):
+        if len(results) == 0:
+            return
+        with self._lock:
+            n, k = len(self._results), len(results)
+            if n + k > len(self._x):
+                cap = len(self._x)
+                while cap < n + k:
+                    cap *= 2
+                x = np.empty((cap, self._x.shape[1]), dtype=np.float64)
+                x[:n] = self._x[:n]
+                self._x = x
+            self._x[n:n + k] = [r.x for r in results]
+            self._results.extend(results)
+        if len(self._results) - self._tree_size >= self.min_log:
+            self._rebuild()
+
+    def _rebuild(self):
+        """
+        Turns the log into a run and merges it with all preceding runs,
+        which are less than twice as large.
+        """
+        from scipy.spatial import cKDTree
+        with self._lock:
+            end = len(self._results)
+            runs = list(self._runs)
+        start = self._tree_size
+        while len(runs) > 0 and runs[-1][1] - runs[-1][0] < 2 * (end - start):
+            start = runs.pop()[0]
+        with self._lock:
+            x = self._x[start:end].copy()
+        runs.append((start, end, cKDTree(x)))
+        with self._lock:
+            self._runs, self._tree_size = runs, end
+        self.rebuilds += 1
+        self.logger.debug("rebuilt index of %d results, %d runs" % (end - start, len(runs)))
+
+    def _snapshot(self):
+        with self._lock:
+            n = len(self._results)
+            return self._runs, self._tree_size, self._x[:n], self._results[:n]
+
+    def __len__(self):
+        return len(self._results)
+
+    def nearest(self, x, k=1):
+        """
+        The ``k`` results nearest to ``x``, sorted by ascending distance.
+
+        :return: tuple of an array of distances and the list of
+                 :class:`Results <panobbgo_lib.lib.Result>`.
+        """
+        runs, size, xx, results = self._snapshot()
+        dists, idxs = [np.empty(0)], [np.empty(0, dtype=np.int64)]
+        for start, end, tree in runs:
+            d, i = tree.query(x, k=min(k, end - start))
+            dists.append(np.atleast_1d(d))
+            idxs.append(start + np.atleast_1d(i))
+        if len(results) > size:
+            dists.append(np.linalg.norm(xx[size:] - x, axis=1))
+            idxs.append(np.arange(size, len(results)))
+        dists, idxs = np.concatenate(dists), np.concatenate(idxs)
+        order = np.argsort(dists, kind='mergesort')[:k]
+        return dists[order], [results[i] for i in idxs[order]]
+
+    def within(self, x, radius):
+        """
+        All results with a distance of at most ``radius`` to ``x``.
+
+        :return: list of :class:`Results <panobbgo_lib.lib.Result>`.
+        """
+        runs, size, xx, results = self._snapshot()
+        idxs = []
+        for start, end, tree in runs:
+            idxs.extend(start + i for i in tree.query_ball_point(x, radius))
+        if len(results) > size:
+            log_dists = np.linalg.norm(xx[size:] - x, axis=1)
+            idxs.extend(size + np.flatnonzero(log_dists <= radius))
+        return [results[i] for i in idxs]
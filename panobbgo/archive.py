@@ -0,0 +1,216 @@
+# -*- coding: utf8 -*-
+# Copyright 2012 -- 2013 Harald Schilly <harald.schilly@univie.ac.at>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+r"""
+Archive
+=======
+
+An append-only on-disk archive of all evaluated results.
+It allows to resume a crashed or aborted run without evaluating
+any point again (see ``resume`` in :class:`~panobbgo.core.StrategyBase`).
+
+Archiving is opt-in, via ``--archive`` on the command line.
+The archive is a directory (by default inside ``~/.panobbgo/archive``)
+with one binary file per column of the :class:`~panobbgo.core.Results`
+database, i.e. ``x``, ``fx``, ``cv_vec``, ``cv`` and ``error`` as raw ``float64``
+values, plus ``who`` as one line per row and a ``meta.json`` file.
+
+New rows are buffered in memory and written in batches.
+An ``fsync`` happens at most every ``fsync_interval`` seconds, which bounds
+the cost of syncing as well as the amount of lost data in case of a crash.
+A timer flushes the buffered rows, if no further rows arrive in the meantime
+(e.g. while waiting for slow evaluations).
+Partially written rows at the end are ignored when loading.
+
+.. codeauthor:: Harald Schilly <harald.schilly@univie.ac.at>
+"""
+
+import os
+import numpy as np
+from IPython.utils.timing import time
+
+# the float columns, stored as raw float64 files
+COLUMNS = ['x', 'fx', 'cv_vec', 'cv', 'error']
+
+
+class ResultArchive:
+
+    """
+    Append-only column store of results in the directory ``path``.
+    """
+
+    def __init__(self, path, fsync_interval=5.0):
+        """
+        :param str path: directory of the archive, created if necessary.
+        :param float fsync_interval: maximum number of seconds between two syncs.
+        """
+        from threading import RLock
+        self.path = path
+        self.fsync_interval = fsync_interval
+        self._lock = RLock()  # the timer flushes in its own thread
+        self._timer = None
+        if not os.path.exists(path):
+            os.makedirs(path)
+        self.meta = self._read_meta()
+        self._files = None
+        self._buffer = []  # list of (column name -> array) dicts
+        self._last_sync = time.time()
+        if self.meta is not None:
+            self._truncate()
+
+    def _fn(self, name):
+        return os.path.join(self.path, name)
+
+    def _read_meta(self):
+        import json
+        fn = self._fn('meta.json')
+        if not os.path.exists(fn):
+            return None
+        with open(fn, 'r') as f:
+            return json.load(f)
+
+    def _write_meta(self, dim, len_cv_vec, problem):
+        import json
+        self.meta = {'dim': dim, 'len_cv_vec': len_cv_vec, 'problem': repr(problem)}
+        with open(self._fn('meta.json'), 'w') as f:
+            json.dump(self.meta, f)
+
+    def _open(self):
+        self._files = dict((name, open(self._fn(name), 'ab')) for name in COLUMNS)
+        self._files['who'] = open(self._fn('who'), 'ab')
+
+    def _truncate(self):
+        """
+        Cuts off incomplete rows (e.g. after a crash), such that new rows
+        are appended in sync across all column files.
+        """
+        nb = len(self.load_columns()['fx'])
+        widths = {'x': self.meta['dim'], 'cv_vec': self.meta['len_cv_vec']}
+        for name in COLUMNS:
+            fn = self._fn(name)
+            if os.path.exists(fn):
+                with open(fn, 'r+b') as f:
+                    f.truncate(nb * widths.get(name, 1) * 8)
+        fn = self._fn('who')
+        if os.path.exists(fn):
+            with open(fn, 'rb') as f:
+                lines = f.read().split(b'\n')[:nb]
+            with open(fn, 'wb') as f:
+                f.write(b''.join(l + b'\n' for l in lines))
+
+    def append(self, columns, problem=None):
+        """
+        Appends the rows, given as a dict of column name -> array.
+        The rows are only written to disk on the next :meth:`.flush`,
+        which is triggered automatically after ``fsync_interval`` seconds.
+        """
+        with self._lock:
+            if self.meta is None:
+                self._write_meta(columns['x'].shape[1], columns['cv_vec'].shape[1], problem)
+            self._buffer.append(columns)
+            if time.time() - self._last_sync > self.fsync_interval:
+                self.flush()
+            elif self._timer is None:
+                from threading import Timer
+                self._timer = Timer(self.fsync_interval, self._on_timer)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _on_timer(self):
+        with self._lock:
+            self._timer = None
+            self.flush()
+
+    def flush(self):
+        """
+        Writes all buffered rows to the column files and syncs them to disk.
+        """
+        with self._lock:
+            if len(self._buffer) == 0:
+                return
+            if self._files is None:
+                self._open()
+            for name in COLUMNS:
+                f = self._files[name]
+                for cols in self._buffer:
+                    np.ascontiguousarray(cols[name], dtype=np.float64).tofile(f)
+            who = ''.join('%s\n' % w for cols in self._buffer for w in cols['who'])
+            self._files['who'].write(who.encode('utf8'))
+            for f in self._files.values():
+                f.flush()
+                os.fsync(f.fileno())
+            self._buffer = []
+            self._last_sync = time.time()
+
+    def close(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self.flush()
+            if self._files is not None:
+                for f in self._files.values():
+                    f.close()
+                self._files = None
+
+    def load_columns(self):
+        """
+        Reads all complete rows from disk.
+
+        :return: dict of column name -> array (who is an object array of strings)
+        """
+        if self.meta is None:
+            return {'x': np.empty((0, 0)), 'fx': np.empty(0), 'cv_vec': np.empty((0, 0)),
+                    'cv': np.empty(0), 'error': np.empty(0), 'who': np.empty(0, dtype=object)}
+        widths = {'x': self.meta['dim'], 'cv_vec': self.meta['len_cv_vec']}
+        cols = {}
+        for name in COLUMNS:
+            fn = self._fn(name)
+            data = np.fromfile(fn, dtype=np.float64) if os.path.exists(fn) else np.empty(0)
+            cols[name] = data
+        who = []
+        if os.path.exists(self._fn('who')):
+            with open(self._fn('who'), 'rb') as f:
+                who = f.read().decode('utf8').split('\n')[:-1]
+        # only complete rows are valid, i.e. a crash during a write is ignored
+        nb = min(len(who), len(cols['fx']), len(cols['cv']), len(cols['error']),
+                 len(cols['x']) // widths['x'])
+        if widths['cv_vec'] > 0:
+            nb = min(nb, len(cols['cv_vec']) // widths['cv_vec'])
+        for name in COLUMNS:
+            w = widths.get(name, None)
+            if w is None:
+                cols[name] = cols[name][:nb]
+            else:
+                cols[name] = cols[name][:nb * w].reshape(nb, w)
+        cols['who'] = np.array(who[:nb], dtype=object)
+        return cols
+
+    def load(self):
+        """
+        Reconstructs the list of :class:`~panobbgo_lib.lib.Result` objects.
+        """
+        from panobbgo_lib import Point, Result
+        cols = self.load_columns()
+        has_cv_vec = self.meta is not None and self.meta['len_cv_vec'] > 0
+        results = []
+        for i in range(len(cols['fx'])):
+            p = Point(cols['x'][i].copy(), cols['who'][i])
+            cv_vec = cols['cv_vec'][i].copy() if has_cv_vec else None
+            results.append(Result(p, cols['fx'][i], cv_vec=cv_vec, error=cols['error'][i]))
+        return results
+
+    def __repr__(self):
+        return 'ResultArchive[%s]' % self.path
@@ -0,0 +1,86 @@
+# -*- coding: utf8 -*-
+# Copyright 2012 Harald Schilly <harald.schilly@univie.ac.at>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from __future__ import unicode_literals
+
+import os
+import shutil
+import tempfile
+import numpy as np
+
+from panobbgo.utils import PanobbgoTestCase
+
+
+class ArchiveTests(PanobbgoTestCase):
+
+    def setUp(self):
+        PanobbgoTestCase.setUp(self)
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_roundtrip(self):
+        from panobbgo.core import Results
+        from panobbgo.archive import ResultArchive
+        results = Results(self.strategy)
+        results.archive = ResultArchive(self.path, fsync_interval=1e6)
+        orig = self.random_results(2, 50, pcv=.5)
+        results += orig[:20]
+        results += orig[20:]
+        assert len(ResultArchive(self.path).load()) == 0  # still buffered
+        results.archive.close()
+
+        archive = ResultArchive(self.path)
+        loaded = archive.load()
+        assert len(loaded) == 50
+        assert np.allclose([r.x for r in loaded], [r.x for r in orig])
+        assert np.allclose([r.fx for r in loaded], [r.fx for r in orig])
+        assert np.allclose([r.cv_vec for r in loaded], [r.cv_vec for r in orig])
+        assert all(r.who == 'test' for r in loaded)
+
+    def test_partial_row(self):
+        from panobbgo.archive import ResultArchive
+        from panobbgo.core import Results
+        results = Results(self.strategy)
+        results.archive = ResultArchive(self.path)
+        results += self.random_results(3, 10)
+        results.archive.close()
+        # simulate a crash while writing the 11th row
+        with open(os.path.join(self.path, 'fx'), 'ab') as f:
+            np.array([1.0]).tofile(f)
+        archive = ResultArchive(self.path)
+        assert len(archive.load()) == 10
+        # ... and appending continues in sync
+        results = Results(self.strategy)
+        results.archive = archive
+        results += self.random_results(3, 5)
+        archive.close()
+        assert len(ResultArchive(self.path).load()) == 15
+
+    def test_idle_flush(self):
+        import time
+        from panobbgo.archive import ResultArchive
+        from panobbgo.core import Results
+        results = Results(self.strategy)
+        results.archive = ResultArchive(self.path, fsync_interval=.05)
+        results += self.random_results(2, 10)
+        assert len(ResultArchive(self.path).load()) == 0  # still buffered
+        # no further results, but the timer flushes them
+        for _ in range(100):
+            time.sleep(.02)
+            if len(ResultArchive(self.path).load()) == 10:
+                break
+        assert len(ResultArchive(self.path).load()) == 10
+        results.archive.close()
@@ -0,0 +1,143 @@
+# -*- coding: utf8 -*-
+# Copyright 2012 -- 2013 Harald Schilly <harald.schilly@univie.ac.at>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+r"""
+Evaluation Cache
+================
+
+Heuristics often emit identical or almost identical points, e.g.
+:class:`~panobbgo.heuristics.Zero` or points clipped back onto the box
+by :meth:`~panobbgo_lib.lib.Problem.project`.
+The :class:`.EvaluationCache` sits between the
+:meth:`~panobbgo.core.StrategyBase.execute` method and the evaluators
+and makes sure, that each point is evaluated only once.
+
+Points are identified by their coordinates, quantized to a grid
+whose spacing is ``tolerance`` times the :attr:`~panobbgo_lib.lib.Problem.ranges`.
+
+.. Note::
+
+  For noisy problems, caching means that repeated points are not sampled
+  again. Disable the cache via ``--no-cache`` if this is not desired.
+
+  Results with a non-finite function value (e.g. the :func:`failed results
+  <panobbgo.evaluators.failed_results>` of a task) are not stored, i.e. such a point
+  is evaluated again, when it is emitted the next time. Set ``cache_failed`` in the
+  config file, to store them, too.
+
+  Answered points do not count as evaluations. To still terminate, if the
+  heuristics only repeat known points, the strategy also stops after
+  ``max_answered`` times ``max_eval`` points were answered by the cache.
+
+.. codeauthor:: Harald Schilly <harald.schilly@univie.ac.at>
+"""
+
+import numpy as np
+from panobbgo_lib import Result
+
+
+class EvaluationCache:
+
+    """
+    Cache of all evaluated results, keyed by the quantized point.
+
+    - :attr:`.hits` counts points answered by an already stored result,
+    - :attr:`.folded` counts points, which are duplicates of a point currently
+      being evaluated (:attr:`.released` counts those, whose result has arrived), and
+    - :attr:`.misses` counts points, which are actually evaluated.
+    """
+
+    def __init__(self, problem, tolerance=1e-9, failed=False):
+        """
+        :param Problem problem:
+        :param float tolerance: relative to the problem's ranges.
+        :param bool failed: if True, results with a non-finite function value are stored, too.
+        """
+        ranges = np.where(problem.ranges > 0, problem.ranges, 1.)
+        self._low = problem.box[:, 0]
+        self._scale = ranges * tolerance
+        self._results = {}  # key -> Result
+        self._pending = {}  # key -> list of points waiting for the same result
+        self.failed = failed
+        self.hits = 0
+        self.folded = 0
+        self.released = 0
+        self.misses = 0
+
+    def key(self, x):
+        """
+        The quantized coordinates of ``x``, a tuple of integers.
+        """
+        return tuple(np.round((x - self._low) / self._scale).astype(np.int64))
+
+    @staticmethod
+    def _answer(point, result):
+        return Result(point, result.fx, cv_vec=result.cv_vec, error=result.error)
+
+    def filter(self, points):
+        """
+        Splits the given list of :class:`~panobbgo_lib.lib.Point` into those,
+        which have to be evaluated and those, which can be answered right away.
+
+        :return: tuple of the list of points to evaluate and the list of results
+                 answered by the cache.
+        """
+        todo, answered = [], []
+        for point in points:
+            key = self.key(point.x)
+            result = self._results.get(key, None)
+            if result is not None:
+                self.hits += 1
+                answered.append(self._answer(point, result))
+            elif key in self._pending:
+                self.folded += 1
+                self._pending[key].append(point)
+            else:
+                self.misses += 1
+                self._pending[key] = []
+                todo.append(point)
+        return todo, answered
+
+    def add(self, results):
+        """
+        Stores newly evaluated results (those with a non-finite function value only,
+        if :attr:`.failed` is set). The waiting duplicates get the result anyways.
+
+        :return: the list of results for the duplicates, which were waiting for them.
+        """
+        answered = []
+        for result in results:
+            key = self.key(result.x)
+            if self.failed or np.isfinite(result.fx):
+                self._results[key] = result
+            for point in self._pending.pop(key, []):
+                answered.append(self._answer(point, result))
+        self.released += len(answered)
+        return answered
+
+    @property
+    def answered(self):
+        """
+        Total number of points answered without an evaluation.
+        Folded points only count, once their result has arrived.
+        """
+        return self.hits + self.released
+
+    def __len__(self):
+        return len(self._results)
+
+    def __repr__(self):
+        return 'EvaluationCache[%d hits, %d folded, %d misses]' % \
+            (self.hits, self.folded, self.misses)
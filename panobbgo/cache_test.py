@@ -0,0 +1,66 @@
+# -*- coding: utf8 -*-
+# Copyright 2012 Harald Schilly <harald.schilly@univie.ac.at>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from __future__ import unicode_literals
+
+import numpy as np
+
+from panobbgo.utils import PanobbgoTestCase
+from panobbgo_lib.lib import Point
+
+
+class CacheTests(PanobbgoTestCase):
+
+    def test_cache(self):
+        from panobbgo.cache import EvaluationCache
+        cache = EvaluationCache(self.problem, tolerance=1e-6)
+        x = np.array([1., .5])
+        p1 = Point(x, 'a')
+        p2 = Point(x + 1e-9, 'b')  # below tolerance
+        p3 = Point(x + 1e-3, 'c')
+        todo, answered = cache.filter([p1, p2, p3])
+        assert todo == [p1, p3]
+        assert answered == []
+        assert cache.folded == 1 and cache.misses == 2
+        assert cache.answered == 0
+
+        # p2 waits for the result of p1
+        answered = cache.add([self.problem(p1)])
+        assert len(answered) == 1
+        assert answered[0].who == 'b'
+        assert answered[0].fx == self.problem(p1).fx
+        assert cache.answered == 1
+
+        # now, it is a hit
+        todo, answered = cache.filter([Point(x, 'd')])
+        assert todo == []
+        assert answered[0].who == 'd'
+        assert cache.hits == 1
+        assert cache.answered == 2
+
+    def test_failed_results(self):
+        from panobbgo.cache import EvaluationCache
+        from panobbgo.evaluators import failed_results
+        p1, p2 = Point(np.array([1., .5]), 'a'), Point(np.array([1., .5]), 'b')
+        for keep in [False, True]:
+            cache = EvaluationCache(self.problem, failed=keep)
+            todo, _ = cache.filter([p1, p2])
+            assert todo == [p1]
+            # the waiting duplicate gets the failure, too
+            answered = cache.add(failed_results(todo))
+            assert len(answered) == 1 and np.isinf(answered[0].fx)
+            # but it is only stored on request, otherwise it is evaluated again
+            todo, answered = cache.filter([Point(p1.x, 'c')])
+            assert len(todo) == (0 if keep else 1)
+            assert len(answered) == (1 if keep else 0)
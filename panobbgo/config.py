@@ -38,6 +38,40 @@ Website: http://dev.harald.schil.ly/panobbgo/
 Sources: https://github.com/haraldschilly/panobbgo
 """
 
+# (section, key, default value) of all options: new config files are created
+# from them and options missing in existing config files are filled in
+_DEFAULTS = [
+    # database config
+    # ('db', 'port', '37010'),
+    # ('db', 'host', 'localhost'),
+    ('db', 'fsync_interval', '5.0'),
+    ('ipython', 'profile', 'default'),
+    ('heuristic', 'capacity', '20'),
+    # core configuration
+    ('core', 'loglevel', '40'),  # default: no debug mode
+    ('core', 'show_interval', '1.0'),
+    ('core', 'max_eval', '1000'),
+    ('core', 'discount', '0.95'),
+    ('core', 'smooth', '0.5'),
+    ('core', 'cache', 'True'),
+    ('core', 'cache_tolerance', '1e-9'),
+    ('core', 'cache_failed', 'False'),
+    ('core', 'max_answered', '1.0'),
+    ('core', 'evaluator', 'ipython'),
+    ('core', 'workers', '0'),
+    ('core', 'chunk_overhead', '0.1'),
+    ('core', 'chunk_latency', '1.0'),
+    ('core', 'pipeline_depth', '2'),
+    ('core', 'dispatch_threads', '4'),
+    ('core', 'event_queue_size', '1000'),
+    ('core', 'event_overflow', 'block'),
+    ('core', 'event_high_water', '64'),
+    ('core', 'event_lag', '1.0'),
+    ('core', 'event_stats_interval', '10.0'),
+    ('core', 'event_loop', 'threads'),
+    ('ui', 'show', 'False'),
+]
+
 
 class Config:
 
@@ -85,6 +119,29 @@ class Config:
                             dest='ipy_profile',
                             help='IPython profile for the ipcluster configuration')
 
+        parser.add_argument('--evaluator',
+                            dest='evaluator',
+                            choices=['ipython', 'processes', 'threads', 'serial'],
+                            help='backend for evaluating the problem')
+
+        parser.add_argument('--workers',
+                            dest='workers',
+                            help="number of local workers for the 'processes' and 'threads' "
+                                 "evaluators [default: number of CPUs]",
+                            type=int)
+
+        parser.add_argument('--dispatch-threads',
+                            dest='dispatch_threads',
+                            help="number of threads serving the event handlers, "
+                                 "0 for one thread per handler",
+                            type=int)
+
+        parser.add_argument('--event-loop',
+                            dest='event_loop',
+                            choices=['threads', 'asyncio'],
+                            help="run the event handlers and the main loop in threads "
+                                 "or on an asyncio event loop")
+
         parser.add_argument('--max',
                             dest='max_eval',
                             help="maximum number of evaluations",
@@ -100,6 +157,33 @@ class Config:
                             help="capacity for each queue in each heuristic",
                             type=int)
 
+        parser.add_argument('--resume',
+                            dest='resume',
+                            help="path to a result archive, which is reloaded to resume a previous run")
+
+        parser.add_argument('--record',
+                            dest='record',
+                            help="file to record all events into, for a replay (see panobbgo.replay)")
+
+        parser.add_argument('--hosted',
+                            dest='hosted',
+                            action='append',
+                            default=[],
+                            help="name of a module, which runs in a worker process "
+                                 "(see panobbgo.hosting). You can specify this option multiple times!")
+
+        parser.add_argument('--archive',
+                            dest='archive',
+                            action='store_true',
+                            default=False,
+                            help="write the results to an on-disk archive (see panobbgo.archive)")
+
+        parser.add_argument('--no-cache',
+                            dest='cache',
+                            action='store_false',
+                            default=True,
+                            help="evaluate duplicate points again (e.g. for noisy problems)")
+
         parser.add_argument("-v",
                             action="count",
                             dest="verbosity",
@@ -133,35 +217,25 @@ class Config:
         # 2/1: does config file exist?
         if not os.path.exists(self.config_fn):
             cfgp = ConfigParser()
-            # create them in the reverse order
-
-            cfgp.add_section('db')  # database config
-            # cfgp.set('db', 'port', '37010')
-            # cfgp.set('db', 'host', 'localhost')
+            for section, key, value in _DEFAULTS:
+                if not cfgp.has_section(section):
+                    cfgp.add_section(section)
+                cfgp.set(section, key, value)
 
-            cfgp.add_section('ipython')
-            cfgp.set('ipython', 'profile', 'default')
-
-            cfgp.add_section('heuristic')
-            cfgp.set('heuristic', 'capacity', '20')
-
-            cfgp.add_section('core')  # core configuration
-            cfgp.set('core', 'loglevel', '40')  # default: no debug mode
-            cfgp.set('core', 'show_interval', '1.0')
-            cfgp.set('core', 'max_eval', '1000')
-            cfgp.set('core', 'discount', '0.95')
-            cfgp.set('core', 'smooth', 0.5)
-
-            cfgp.add_section('ui')
-            cfgp.set('ui', 'show', False)
-
-            with open(self.config_fn, 'wb') as configfile:
+            with open(self.config_fn, 'w') as configfile:
                 cfgp.write(configfile)
 
         # 2/2: reading the config file
         cfgp = ConfigParser()
         cfgp.read(self.config_fn)
 
+        # 2/3: options missing in config files created by older versions
+        for section, key, value in _DEFAULTS:
+            if not cfgp.has_section(section):
+                cfgp.add_section(section)
+            if not cfgp.has_option(section, key):
+                cfgp.set(section, key, value)
+
         # 3: override specific settings
         _cur_verb = cfgp.getint('core', 'loglevel')
         if args is not None:
@@ -174,10 +248,20 @@ class Config:
                 cfgp.set('core', 'smooth', str(args.smooth))
             if args.capacity:
                 cfgp.set('heuristic', 'capacity', str(args.capacity))
+            if args.evaluator:
+                cfgp.set('core', 'evaluator', args.evaluator)
+            if args.workers:
+                cfgp.set('core', 'workers', str(args.workers))
+            if args.dispatch_threads is not None:
+                cfgp.set('core', 'dispatch_threads', str(args.dispatch_threads))
+            if args.event_loop:
+                cfgp.set('core', 'event_loop', args.event_loop)
             if args.ipy_profile:
                 cfgp.set('ipython', 'profile', args.ipy_profile)
             if args.ui:
                 cfgp.set('ui', 'show', "True")
+            if not args.cache:
+                cfgp.set('core', 'cache', "False")
 
         # some generic function
         def getself(section, key):
@@ -200,9 +284,31 @@ class Config:
         self.max_eval = cfgp.getint('core', 'max_eval')
         self.discount = cfgp.getfloat('core', 'discount')
         self.smooth = cfgp.getfloat('core', 'smooth')
+        self.cache = cfgp.getboolean('core', 'cache')
+        self.cache_tolerance = cfgp.getfloat('core', 'cache_tolerance')
+        self.cache_failed = cfgp.getboolean('core', 'cache_failed')
+        self.max_answered = cfgp.getfloat('core', 'max_answered')
+        self.evaluator = cfgp.get('core', 'evaluator')
+        self.workers = cfgp.getint('core', 'workers')
+        self.chunk_overhead = cfgp.getfloat('core', 'chunk_overhead')
+        self.chunk_latency = cfgp.getfloat('core', 'chunk_latency')
+        self.pipeline_depth = cfgp.getint('core', 'pipeline_depth')
+        self.dispatch_threads = cfgp.getint('core', 'dispatch_threads')
+        self.event_queue_size = cfgp.getint('core', 'event_queue_size')
+        self.event_overflow = cfgp.get('core', 'event_overflow')
+        self.event_high_water = cfgp.getint('core', 'event_high_water')
+        self.event_lag = cfgp.getfloat('core', 'event_lag')
+        self.event_stats_interval = cfgp.getfloat('core', 'event_stats_interval')
+        self.event_loop = cfgp.get('core', 'event_loop')
         self.capacity = cfgp.getint('heuristic', 'capacity')
         self.ipy_profile = cfgp.get('ipython', 'profile')
         self.ui_show = cfgp.getboolean('ui', 'show')
+        self.archive = False if args is None else args.archive
+        self.archive_dir = os.path.join(self._appdata_dir, 'archive')
+        self.fsync_interval = cfgp.getfloat('db', 'fsync_interval')
+        self.resume = None if args is None else args.resume
+        self.record = None if args is None else args.record
+        self.hosted = [] if args is None else args.hosted
         self.logger_focus = [] if args is None else args.logger_focus
         self.ui_redraw_delay = 0.5
         self.version = __version__
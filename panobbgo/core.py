@@ -39,6 +39,10 @@ and base-classes for the modules:
 from .config import Config
 from panobbgo_lib import Result, Point
 from IPython.utils.timing import time
+from queue import Queue
+from threading import current_thread
+import math
+import types
 import numpy as np
 
 
@@ -49,67 +53,195 @@ class Results:
     The new results are fed directly by the :class:`.StrategyBase`, outside of the
     :class:`.EventBus`.
 
-    .. Note::
+    Internally, the results are stored column-wise in preallocated
+    :class:`numpy.ndarray` blocks (``x``, ``fx``, ``cv_vec``, ``cv``, ``who``
+    and ``error``), which grow by doubling their capacity.
+    Hence, adding a batch of results only costs time proportional to the
+    size of the batch.
+    The pandas DataFrame in :attr:`.results` is only a lazily built view.
 
-      Later on, maybe this will be a cool actual database which allows to
-      persistently store past evaluations for a given problem.
-      This would allow resuming and further a-posteriory analysis.
-      In the meantime, this is a pandas DataFrame.
+    If an :attr:`.archive` (a :class:`~panobbgo.archive.ResultArchive`) is set,
+    all new results are also appended to it. This allows resuming
+    and further a-posteriory analysis.
     """
 
+    # initial number of rows, when the first result arrives
+    INITIAL_CAPACITY = 128
+
     def __init__(self, strategy):
         self.logger = strategy.config.get_logger('RSLTS')
         self.strategy = strategy
         self.eventbus = strategy.eventbus
         self.problem = strategy.problem
-        self.results = None
+        self._n = 0  # number of stored rows
+        self._cap = 0  # allocated rows
+        self._cols = None  # dict of column name -> array
+        self._len_cv_vec = 0
+        self._frame_cache = None
         self._last_nb = 0  # for logging
+        self.archive = None
+
+    def _init_columns(self, r):
+        """
+        Allocates the columns, based on the shape of the first result ``r``.
+        """
+        self._dim = len(r.x)
+        self._len_cv_vec = 0 if r.cv_vec is None else len(r.cv_vec)
+        self._cap = Results.INITIAL_CAPACITY
+        self._cols = {
+            'x': np.empty((self._cap, self._dim), dtype=np.float64),
+            'fx': np.empty(self._cap, dtype=np.float64),
+            'cv_vec': np.empty((self._cap, self._len_cv_vec), dtype=np.float64),
+            'cv': np.empty(self._cap, dtype=np.float64),
+            'who': np.empty(self._cap, dtype=object),
+            'error': np.empty(self._cap, dtype=np.float64)
+        }
+
+    def _reserve(self, size):
+        """
+        Makes sure, that there is room for ``size`` rows.
+        The capacity is doubled until it fits, which amortizes the copying.
+        """
+        if size <= self._cap:
+            return
+        cap = self._cap
+        while cap < size:
+            cap *= 2
+        for name, col in list(self._cols.items()):
+            new_col = np.empty((cap,) + col.shape[1:], dtype=col.dtype)
+            new_col[:self._n] = col[:self._n]
+            self._cols[name] = new_col
+        self._cap = cap
 
     def add_results(self, new_results):
         """
         Add one single or a list of new @Result objects.
         Then, publish a ``new_result`` event.
         """
-        from pandas import (DataFrame, MultiIndex)
-        if self.results is None:
-            if len(new_results) == 0:
-                return
-            r = new_results[0]
-            midx_x = [('x', _) for _ in range(len(r.x))]
-            len_cv_vec = 0 if r.cv_vec is None else len(r.cv_vec)
-            midx_cv = [('cv', _) for _ in range(len_cv_vec)]
-            midx = MultiIndex.from_tuples(
-                midx_x + [('fx', 0)] +
-                midx_cv + [('cv', 0), ('who', 0), ('error', 0)])
-            self.results = DataFrame(columns=midx)
+        if len(new_results) == 0:
+            return
+        if self._cols is None:
+            self._init_columns(new_results[0])
 
         assert all([isinstance(_, Result) for _ in new_results])
         # notification for all received results at once
         self.eventbus.publish("new_results", results=new_results)
 
-        new_rows = []
-        for r in new_results:
-            new_rows.append(
-                np.r_[r.x, r.fx,
-                      [] if r.cv_vec is None else r.cv_vec,
-                      [r.cv, r.who, r.error]])
-        results_new = DataFrame(new_rows, columns=self.results.columns)
-        self.results = self.results.append(results_new, ignore_index=True)
-
-        if len(self.results) / 100 > self._last_nb / 100:
+        k = len(new_results)
+        self._reserve(self._n + k)
+        rows = slice(self._n, self._n + k)
+        cols = self._cols
+        cols['x'][rows] = [r.x for r in new_results]
+        cols['fx'][rows] = [r.fx for r in new_results]
+        if self._len_cv_vec > 0:
+            cols['cv_vec'][rows] = [r.cv_vec for r in new_results]
+        cols['cv'][rows] = [r.cv for r in new_results]
+        cols['who'][rows] = [r.who for r in new_results]
+        cols['error'][rows] = [r.error for r in new_results]
+        self._n += k
+        self._frame_cache = None
+
+        if self.archive is not None:
+            self.archive.append(dict((name, col[rows]) for name, col in cols.items()),
+                                self.problem)
+
+        if len(self) // 100 > self._last_nb // 100:
             self.info()
-            self._last_nb = len(self.results)
+            self._last_nb = len(self)
+
+    def _column(self, name):
+        if self._cols is None:
+            return None
+        col = self._cols[name][:self._n]
+        col.flags.writeable = False
+        return col
+
+    @property
+    def x(self):
+        r"""
+        Read-only :math:`(n, \mathit{dim})` array of all evaluated points.
+        """
+        return self._column('x')
+
+    @property
+    def fx(self):
+        """
+        Read-only array of all function values.
+        """
+        return self._column('fx')
+
+    @property
+    def cv_vec(self):
+        """
+        Read-only array of all constraint violation vectors (possibly zero columns).
+        """
+        return self._column('cv_vec')
+
+    @property
+    def cv(self):
+        """
+        Read-only array of all constraint violations.
+        """
+        return self._column('cv')
+
+    @property
+    def who(self):
+        """
+        Read-only array of the names of the heuristics, which generated the points.
+        """
+        return self._column('who')
+
+    @property
+    def error(self):
+        """
+        Read-only array of the error margins.
+        """
+        return self._column('error')
+
+    def _frame(self, start=0, stop=None):
+        """
+        Builds a :class:`pandas.DataFrame` for the rows ``start`` to ``stop``.
+        """
+        from pandas import DataFrame, MultiIndex
+        stop = self._n if stop is None else stop
+        rows = slice(start, stop)
+        cols = self._cols
+        midx = [('x', i) for i in range(self._dim)]
+        data = [cols['x'][rows, i] for i in range(self._dim)]
+        midx.append(('fx', 0))
+        data.append(cols['fx'][rows])
+        midx.extend(('cv_vec', i) for i in range(self._len_cv_vec))
+        data.extend(cols['cv_vec'][rows, i] for i in range(self._len_cv_vec))
+        midx.extend([('cv', 0), ('who', 0), ('error', 0)])
+        data.extend([cols['cv'][rows], cols['who'][rows], cols['error'][rows]])
+        df = DataFrame(dict(enumerate(data)), index=np.arange(start, stop))
+        df.columns = MultiIndex.from_tuples(midx)
+        return df
+
+    @property
+    def results(self):
+        """
+        All results as a :class:`pandas.DataFrame` (or ``None`` if there are none yet).
+        It is built on demand and cached until new results arrive.
+        """
+        if self._cols is None:
+            return None
+        df = self._frame_cache
+        if df is None:
+            df = self._frame_cache = self._frame()
+        return df
 
     def info(self):
         self.logger.info("%d results in DB" % len(self))
-        self.logger.debug("Dataframe Results:\n%s" % self.results.tail(3))
+        if self._n > 0:
+            self.logger.debug("Dataframe Results:\n%s" % self._frame(max(0, self._n - 3)))
 
     def __iadd__(self, results):
         self.add_results(results)
         return self
 
     def __len__(self):
-        return len(self.results) if self.results is not None else 0
+        return self._n
 
 
 class Module:
@@ -119,6 +251,11 @@ class Module:
     :class:`.Heuristic` and :class:`.Analyzer`.
     """
 
+    #: if True, the module runs in a worker process, see :mod:`panobbgo.hosting`
+    hosted = False
+    #: attributes of a hosted module, which are mirrored into the controller
+    hosted_state = ()
+
     def __init__(self, strategy, name=None):
         """
         :param StrategyBase strategy:
@@ -130,6 +267,8 @@ class Module:
         self.config = strategy.config
         self._name = name
         self._threads = []
+        self._mailbox = None  # set by the Dispatcher of the EventBus
+        self._host = None  # the ModuleHost, if it is hosted in a worker process
         # implicit dependency check (only class references)
         self._depends_on = []
 
@@ -191,6 +330,8 @@ class Module:
         """
         Called right at the end after the strategy has finished.
         """
+        if self._host is not None:
+            self._host.close()
         for t in self._threads:
             if t.isAlive():
                 try:
@@ -217,6 +358,191 @@ class Module:
         return 'Module %s' % self.name
 
 
+class PointBuffer:
+
+    """
+    The bounded output of a :class:`.Heuristic`: a ring buffer, which stores
+    the points as rows of one ``float64`` block of ``cap`` rows.
+    The block is allocated for the dimension of the first points.
+    If ``cap`` is not positive, it is unbounded and grows by doubling.
+
+    It is thread-safe: :meth:`.put` blocks while it is full
+    (like a :class:`~queue.Queue`), and :meth:`.get` takes a block of points at once.
+
+    Each row is tagged with an :attr:`.epoch`. After :meth:`.bump`, the rows of
+    older epochs are stale: they are discarded lazily, when they are taken
+    by :meth:`.get` or when :meth:`.put` needs their space, and counted
+    in :attr:`.discarded`.
+    """
+
+    def __init__(self, cap):
+        import threading
+        self.cap = cap
+        #: the current epoch, rows of older epochs are stale
+        self.epoch = 0
+        #: number of stale rows, which were discarded
+        self.discarded = 0
+        self._block = None
+        self._epochs = None  # the epoch of each row
+        self._low = 0  # no stored row is older
+        self._head = 0  # index of the oldest row
+        self._size = 0
+        self._lock = threading.Lock()
+        self.not_full = threading.Condition(self._lock)
+
+    def _grow(self, dim, size):
+        """
+        Allocates the block, or doubles it when it is unbounded.
+        """
+        if self._block is None:
+            cap = self.cap if self.cap > 0 else 16
+            while cap < size and self.cap <= 0:
+                cap *= 2
+            self._block = np.empty((cap, dim), dtype=np.float64)
+            self._epochs = np.empty(cap, dtype=np.int64)
+            return
+        cap = len(self._block)
+        while cap < size:
+            cap *= 2
+        block = np.empty((cap, self._block.shape[1]), dtype=np.float64)
+        epochs = np.empty(cap, dtype=np.int64)
+        block[:self._size] = self._read(self._block, self._size)
+        epochs[:self._size] = self._read(self._epochs, self._size)
+        self._block, self._epochs, self._head = block, epochs, 0
+
+    def _read(self, a, n):
+        """
+        The ``n`` oldest entries of ``a``, i.e. the block or the epochs.
+        """
+        cap = len(a)
+        end = self._head + n
+        if end <= cap:
+            return a[self._head:end].copy()
+        return np.concatenate((a[self._head:], a[:end - cap]))
+
+    def _write(self, rows, epoch):
+        cap = len(self._block)
+        start = (self._head + self._size) % cap
+        k = min(len(rows), cap - start)
+        self._block[start:start + k] = rows[:k]
+        self._block[:len(rows) - k] = rows[k:]
+        self._epochs[start:start + k] = epoch
+        if k < len(rows):
+            self._epochs[:len(rows) - k] = epoch
+        if self._size == 0 or epoch < self._low:
+            self._low = epoch
+        self._size += len(rows)
+
+    def _take(self, n):
+        rows = self._read(self._block, n)
+        self._head = (self._head + n) % len(self._block)
+        self._size -= n
+        return rows
+
+    def _drop_stale(self):
+        """
+        Discards the stale rows at the head.
+        """
+        epoch = self.epoch
+        n = 0
+        cap = len(self._block)
+        while n < self._size and self._epochs[(self._head + n) % cap] < epoch:
+            n += 1
+        if n > 0:
+            self._take(n)
+            self.discarded += n
+        return n
+
+    def bump(self):
+        """
+        Starts a new epoch, all stored rows are stale.
+
+        :return: the new epoch.
+        """
+        self.epoch += 1
+        return self.epoch
+
+    def put(self, rows, block=True, epoch=None):
+        """
+        Appends the given 2-dimensional array of points, tagged with the ``epoch``
+        (default: the current one).
+        If it is full, it waits until there is space (``block=True``),
+        otherwise the remaining rows are not stored.
+        Rows of an older epoch are discarded right away.
+
+        :return: the number of stored or discarded rows.
+        """
+        if epoch is None:
+            epoch = self.epoch
+        done = 0
+        with self.not_full:
+            if self._block is None or (self.cap <= 0 and self._size + len(rows) > len(self._block)):
+                self._grow(rows.shape[1], self._size + len(rows))
+            while done < len(rows):
+                if epoch < self.epoch:
+                    self.discarded += len(rows) - done
+                    done = len(rows)
+                    break
+                free = len(self._block) - self._size
+                if free == 0 and self._drop_stale() == 0:
+                    if not block:
+                        break
+                    self.not_full.wait()
+                    continue
+                k = min(len(self._block) - self._size, len(rows) - done)
+                self._write(rows[done:done + k], epoch)
+                done += k
+        return done
+
+    def get(self, limit=None):
+        """
+        Takes up to ``limit`` (default: all) of the oldest points, which are not stale.
+
+        :return: :class:`numpy.ndarray` of shape ``(n, dim)``.
+        """
+        with self.not_full:
+            if self._block is None:
+                return np.empty((0, 0), dtype=np.float64)
+            epoch = self.epoch
+            parts = []
+            got = taken = 0
+            while self._size > 0 and (limit is None or got < limit):
+                n = self._size if limit is None else min(limit - got, self._size)
+                # only look at the epochs, if there might be stale rows
+                fresh = self._read(self._epochs, n) >= epoch if self._low < epoch else None
+                rows = self._take(n)
+                taken += n
+                if fresh is not None and not fresh.all():
+                    rows = rows[fresh]
+                    self.discarded += n - len(rows)
+                parts.append(rows)
+                got += len(rows)
+            if taken > 0:
+                self.not_full.notify_all()
+            if len(parts) == 1:
+                return parts[0]
+            if len(parts) == 0:
+                return np.empty((0, self._block.shape[1]), dtype=np.float64)
+            return np.concatenate(parts)
+
+    def clear(self):
+        """
+        Discards all points and wakes up the waiting :meth:`.put`.
+        """
+        with self.not_full:
+            self._head = self._size = 0
+            self.not_full.notify_all()
+
+    def qsize(self):
+        return self._size
+
+    def __len__(self):
+        return self._size
+
+    def __repr__(self):
+        return 'PointBuffer[%d/%d, epoch %d]' % (self._size, self.cap, self.epoch)
+
+
 class StopHeuristic(Exception):
 
     """
@@ -242,14 +568,20 @@ class Heuristic(Module):
 
     #. They can be parameterized by passing in optional arguments in the constructor.
        This should be reflected in the :attr:`~.Module.name`!
-    #. The :class:`.EventBus` spawns a thread for each ``on_*`` method
-       and calls them when a corresponding :class:`.Event` occurs.
+    #. The :class:`.EventBus` calls the ``on_*`` methods when a corresponding
+       :class:`.Event` occurs -- in the worker threads of its :class:`.Dispatcher`
+       or in a thread on their own for ``on_start`` and :func:`.dedicated` handlers.
+       Handlers may also be coroutines or async generators,
+       which run natively on the :mod:`asyncio event loop <panobbgo.aio>`.
     #. Of course, they are capable of storing their state in the instance.
        This is also the way of how information is shared between those threads.
     #. The `main purpose` of a heuristic is to emit new search points
        by calling either :meth:`.emit` or returning a list of points.
        The datatype must be :class:`numpy.ndarray` of
        `floats <http://docs.scipy.org/doc/numpy/reference/arrays.scalars.html>`_.
+    #. Instead of filling its output in advance, it may generate points on demand
+       by overwriting :meth:`.produce`: the strategy asks it for exactly
+       the number of points it dispatches, always against its latest state.
     #. Additionally, the can get hold of other heuristics or anayzers via the strategy instance.
     #. The :class:`.EventBus` inside this strategy instance allows them to publish their
        own events, too. This can be used to signal related heuristics something
@@ -262,58 +594,160 @@ class Heuristic(Module):
         self.logger = self.config.get_logger('HEUR')
         self.cap = cap if cap is not None else self.config.capacity
         self._stopped = False
-        from Queue import Queue
-        self._output = Queue(self.cap)
+        # the async generator of an ``async def on_start``, when run by the AsyncEventBus
+        self._producer = None
+        self._output = PointBuffer(self.cap)
+        # generates points on demand, see produce()
+        self._on_demand = type(self).produce is not Heuristic.produce
 
         # statistics; performance
         self.performance = 0.0
 
     def clear_output(self):
-        q = self._output
-        with q.not_full:
-            # with q.mutex:
-            # del self._output.queue[:]  # LifoQueue
-            q.queue.clear()  # Queue
-            q.not_full.notify()  # to wakeup "put()"
+        """
+        Discards all points in the output right now.
 
-    def emit(self, points):
+        .. Note::
+
+          A producer thread might emit points for the old state right afterwards.
+          Hence, prefer :meth:`.bump_epoch`.
         """
-        This is used to send out new search points for evaluation.
-        Args:
+        self._output.clear()
+
+    @property
+    def epoch(self):
+        """
+        The current epoch of the output, see :meth:`.bump_epoch`.
+        """
+        return self._output.epoch
 
-        - ``points``: Either a :class:`numpy.ndarray` of ``float64`` or preferrably a list of them.
+    def bump_epoch(self):
         """
-        try:
-            if points is None:
-                raise StopHeuristic()
+        Invalidates all points emitted so far, e.g. when the state they are based on
+        is outdated. Nothing is locked: the stale points are skipped lazily,
+        when the strategy takes the points, and counted in :attr:`.discarded`.
+
+        :return: the new epoch, which can be passed on to :meth:`.emit`.
+        """
+        return self._output.bump()
+
+    @property
+    def discarded(self):
+        """
+        Number of stale points, which were discarded.
+        """
+        return self._output.discarded
+
+    def _block(self, points):
+        """
+        Converts the emitted ``points`` into a 2-dimensional array of points,
+        which are projected into the box of the problem all at once.
+        """
+        if isinstance(points, np.ndarray):
+            if points.ndim not in (1, 2):
+                raise Exception("points must be a 1- or 2-dimensional numpy ndarray")
+            block = points.reshape(1, -1) if points.ndim == 1 else points
+        else:
             if not isinstance(points, (list, tuple)):
                 points = [points]
+            if len(points) == 0:
+                return np.empty((0, 0))
             for point in points:
                 if not isinstance(point, np.ndarray):
                     raise Exception("point is not a numpy ndarray")
-                x = self.problem.project(point)
-                point = Point(x, self.name)
-                self._output.put(point)
+            block = np.array(points, dtype=np.float64, ndmin=2)
+        return self.problem.project(np.asarray(block, dtype=np.float64))
+
+    def emit(self, points, epoch=None):
+        """
+        This is used to send out new search points for evaluation.
+        Args:
+
+        - ``points``: Either a :class:`numpy.ndarray` of ``float64``, a list of them or
+          preferrably a 2-dimensional array with one point per row.
+          The points are projected into the box all at once and stored as one block.
+        - ``epoch``: the :attr:`.epoch` of the state, the points were computed for
+          (default: the current one). They are discarded, if it is outdated.
+        """
+        try:
+            if points is None:
+                raise StopHeuristic()
+            block = self._block(points)
+            if len(block) > 0:
+                self._output.put(block, epoch=epoch)
+            self.strategy.wakeup(points=True)
         except StopHeuristic:
             self._stopped = True
             self.logger.info("'%s' heuristic stopped." % self.name)
 
-    def get_points(self, limit=None):
+    def produce(self, n):
         """
-        this drains the output Queue until ``limit``
-        elements are removed or the Queue is empty.
-        For each actually emitted point,
-        the performance value is discounted (i.e. "punishment" or "energy
-        consumption")
+        Overwrite this method to generate points on demand.
+        It is called by :meth:`.get_points` from the main loop of the strategy,
+        when the output holds less than the ``n`` requested points.
+        Hence, it must not block and it should rely on the latest state
+        of the heuristic, which the ``on_*`` handlers update.
+
+        Args:
+
+        - ``n``: the number of points, which will be dispatched.
+
+        :return: ``None``, if there are no points right now, or up to ``n`` points
+                 (like for :meth:`.emit`), surplus points are stored in the output.
+                 Raise :class:`.StopHeuristic`, if it has finished.
         """
-        from queue import Empty
-        new_points = []
+        return None
+
+    def _produce(self, n):
+        stats = self.eventbus._event_stats('produce', self)
+        start = time.time()
         try:
-            while limit is None or len(new_points) < limit:
-                new_points.append(self._output.get(block=False))
-        except Empty:
-            pass
-        return new_points
+            points = self.produce(n)
+            stats.delivered += 1
+        except StopHeuristic:
+            self._stopped = True
+            self.logger.info("'%s' heuristic stopped." % self.name)
+            return None
+        except Exception as e:
+            import traceback
+            self._stopped = True
+            stats.failed += 1
+            self.logger.critical("Exception: produce in %s: %s -> stopping.\n%s" %
+                                 (self, e, traceback.format_exc()))
+            return None
+        finally:
+            stats.handler.add(time.time() - start)
+        if points is None:
+            return None
+        block = self._block(points)
+        if len(block) > n:
+            self._output.put(block[n:], block=False)
+            block = block[:n]
+        return block
+
+    def get_points(self, limit=None):
+        """
+        this drains the output buffer until ``limit``
+        points are removed or the buffer is empty.
+        If it generates points on demand, the missing ones are requested
+        via :meth:`.produce`.
+
+        :return: :class:`numpy.ndarray` of shape ``(n, dim)``, one point per row.
+        """
+        points = self._output.get(limit)
+        if self._on_demand and not self._stopped and limit is not None \
+                and len(points) < limit:
+            new = self._produce(limit - len(points))
+            if new is not None and len(new) > 0:
+                points = new if len(points) == 0 else np.concatenate((points, new))
+        return points
+
+    def get_point_list(self, limit=None):
+        """
+        Like :meth:`.get_points`, but as a list of :class:`~panobbgo_lib.lib.Point`,
+        which the strategies submit for evaluation.
+        """
+        return [Point(x, self.name) for x in self.get_points(limit)]
 
     @property
     def active(self):
@@ -321,11 +755,17 @@ class Heuristic(Module):
         This is queried by the strategy to determine, if it should still consider it.
         This is the case, iff there is still something in its output queue
         or if there is a chance that there will be something in the future (at least
-        one thread is running).
+        one thread is running, it is still subscribed to events in the
+        :class:`.Dispatcher`, its worker process is active or it
+        :meth:`produces <.produce>` points on demand and didn't stop).
         """
         t = any(t.isAlive() for t in self._threads)
+        m = self._mailbox is not None and len(self._mailbox.keys) > 0
         q = self._output.qsize() > 0
-        return t or q
+        p = self._producer is not None
+        h = self._host is not None and self._host.active
+        d = self._on_demand and not self._stopped
+        return t or m or q or p or h or d
 
 
 class HeuristicSubprocess(Heuristic):
@@ -334,6 +774,11 @@ class HeuristicSubprocess(Heuristic):
     This Heuristic is a subclass of :class:`.Heuristic`, which is additionally starting
     a subprocess, which communicates with the main thread via a pipe in a blocking
     communication scheme.
+
+    .. Note::
+
+      The :class:`~panobbgo.workers.HeuristicWorker` is the non-blocking variant,
+      which shares the results with the subprocess via shared memory.
     """
 
     def __init__(self, strategy, name=None, cap=None):
@@ -381,18 +826,437 @@ class Event:
 
     """
     This class holds the data for one single :class:`~.EventBus` event.
+    The keyword arguments are accessible as attributes.
+
+    Events are immutable, since one event is shared by all subscribers.
     """
 
+    __slots__ = ('_when', '_kwargs', 'terminate')
+
     def __init__(self, **kwargs):
-        self._when = time.time()
-        self._kwargs = kwargs
-        for k, v in list(kwargs.items()):
-            setattr(self, k, v)
+        _set_when(self, time.time())
+        _set_kwargs(self, kwargs)
+        _set_terminate(self, False)
+
+    @classmethod
+    def _create(cls, kwargs, terminate=False, when=None):
+        """
+        Fast constructor for the :class:`.EventBus`, without copying the ``kwargs``.
+        """
+        event = _new(cls)
+        _set_when(event, time.time() if when is None else when)
+        _set_kwargs(event, kwargs)
+        _set_terminate(event, terminate)
+        return event
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        try:
+            return self._kwargs[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Event is immutable")
 
     def __repr__(self):
         return "Event[%s]" % self._kwargs
 
 
+# the slots are written via their descriptors, bypassing Event.__setattr__
+_new = object.__new__
+_set_when = Event.__dict__['_when'].__set__
+_set_kwargs = Event.__dict__['_kwargs'].__set__
+_set_terminate = Event.__dict__['terminate'].__set__
+
+
+def _coalesce(old, new):
+    """
+    Merges two events of the same key into one: list values
+    (e.g. the ``results`` of ``new_results``) are concatenated,
+    all others are taken from the ``new`` event.
+    It keeps the timestamp of the ``old`` one, to get the lag right.
+    """
+    kwargs = dict(old._kwargs)
+    for k, v in list(new._kwargs.items()):
+        if isinstance(v, list) and isinstance(kwargs.get(k, None), list):
+            kwargs[k] = kwargs[k] + v
+        else:
+            kwargs[k] = v
+    return Event._create(kwargs, old.terminate or new.terminate, old._when)
+
+
+#: delivery policies, see :func:`.delivery`
+FIFO, LATEST, BATCH = 'fifo', 'latest', 'batch'
+
+#: policies for full event queues, see :func:`.delivery`
+BLOCK, DROP_OLDEST, COALESCE = 'block', 'drop_oldest', 'coalesce'
+
+
+def delivery(policy=FIFO, maxsize=None, overflow=None):
+    """
+    Decorator, which sets how the :class:`.EventBus` delivers
+    the events to an ``on_<key>`` handler:
+
+    - ``'fifo'`` (default): each event, in the order of publishing.
+    - ``'latest'``: only the most recent pending event, older ones are
+      superseded and skipped (i.e. a slot for one event).
+    - ``'batch'``: all pending events at once, i.e. the handler is called
+      with the list of pending :class:`Events <.Event>` as its only argument.
+
+    The superseded or batched events are counted in :attr:`.EventBus.coalesced`.
+
+    The number of pending events per handler is bounded by ``maxsize``
+    (``0`` means unbounded). If the queue is full, the ``overflow`` policy is
+
+    - ``'block'``: the publisher waits until there is space again,
+      except for the worker threads of the :class:`.Dispatcher`, which coalesce
+      instead (otherwise, they could wait for each other),
+    - ``'drop_oldest'``: the oldest pending event is discarded
+      (counted in :attr:`.EventBus.dropped`),
+    - ``'coalesce'``: the new event is merged into the newest pending one,
+      see :func:`._coalesce`.
+
+    Both default to the ``event_queue_size`` and ``event_overflow`` configuration.
+    """
+    if policy not in (FIFO, LATEST, BATCH):
+        raise ValueError("unknown delivery policy '%s'" % policy)
+    if overflow not in (None, BLOCK, DROP_OLDEST, COALESCE):
+        raise ValueError("unknown overflow policy '%s'" % overflow)
+
+    def decorate(method):
+        method.delivery = policy
+        method.maxsize = maxsize
+        method.overflow = overflow
+        return method
+    return decorate
+
+
+def _run_coroutine(coro):
+    import asyncio
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+def _iterate_async(agen):
+    """
+    Iterates over the async generator ``agen`` in a blocking way.
+    """
+    import asyncio
+    loop = asyncio.new_event_loop()
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(agen.__anext__())
+            except StopAsyncIteration:
+                return
+    finally:
+        loop.run_until_complete(agen.aclose())
+        loop.close()
+
+
+def dedicated(method):
+    """
+    Decorator for ``on_<key>`` handlers, which run for a long time
+    (e.g. loops emitting points). The :class:`.EventBus` serves them by a thread
+    on their own instead of a worker of the :class:`.Dispatcher`.
+    """
+    method.dedicated = True
+    return method
+
+
+class _Mailbox:
+
+    """
+    The queue of events for one subscriber of the :class:`.Dispatcher`.
+    ``keys`` are those of its handlers, which are still subscribed.
+
+    ``events`` holds tuples of the key and the event. For the ``latest`` and ``batch``
+    :func:`.delivery` policies, the event is ``None`` and the actual pending event
+    (or list of events) is in ``pending``.
+    ``sizes`` counts the pending events per key.
+    """
+
+    def __init__(self, target):
+        from threading import Lock, Condition
+        from collections import deque, Counter
+        self.target = target
+        self.lock = Lock()
+        self.not_full = Condition(self.lock)
+        self.events = deque()
+        self.pending = {}
+        self.sizes = Counter()
+        self.keys = set()
+        self.handlers = {}  # key -> (bound handler, EventStatistics)
+        self.scheduled = False  # in the ready queue or being processed
+        self.waiting = 0  # number of publishers waiting for not_full
+
+    def _index(self, key, newest=False):
+        idxs = range(len(self.events) - 1, -1, -1) if newest else range(len(self.events))
+        for i in idxs:
+            if self.events[i][0] == key:
+                return i
+
+    def drop_oldest(self, key, batch):
+        """
+        Discards the oldest pending event of ``key``.
+        """
+        if batch:
+            self.pending[key].pop(0)
+        else:
+            del self.events[self._index(key)]
+        self.sizes[key] -= 1
+
+    def coalesce(self, key, event, batch):
+        """
+        Merges the ``event`` into the newest pending one of ``key``.
+        """
+        if batch:
+            self.pending[key][-1] = _coalesce(self.pending[key][-1], event)
+        else:
+            i = self._index(key, newest=True)
+            self.events[i] = (key, _coalesce(self.events[i][1], event))
+
+
+class _EventQueue(Queue):
+
+    """
+    The bounded event queue of a handler running in a thread on its own.
+    """
+
+    def __init__(self, eventbus, key, target, maxsize=0, overflow=BLOCK):
+        Queue.__init__(self, maxsize if overflow == BLOCK else 0)
+        self.eventbus = eventbus
+        self.key = key
+        self.target = target
+        self.bound = maxsize
+        self.overflow = overflow
+        self.closed = False
+
+    def close(self):
+        """
+        Called, when the handler thread has finished: the pending events
+        and all further ones are dropped, blocked publishers are released.
+        """
+        bus = self.eventbus
+        with self.mutex:
+            self.closed = True
+            bus._count(bus.dropped, self.key, len(self.queue))
+            self.queue.clear()
+            self.not_full.notify_all()
+
+    def _put(self, event):
+        if self.closed:
+            self.eventbus._count(self.eventbus.dropped, self.key)
+        else:
+            self.queue.append(event)
+
+    def put(self, event, block=True, timeout=None):
+        bus = self.eventbus
+        if self.closed:
+            bus._count(bus.dropped, self.key)
+            return
+        overflow = self.overflow
+        if overflow == BLOCK and bus._dispatcher is not None:
+            overflow = bus._dispatcher.nonblocking(self.key, overflow)
+        if overflow == BLOCK:
+            Queue.put(self, event, block, timeout)
+        else:
+            with self.not_full:
+                if 0 < self.bound <= len(self.queue):
+                    if overflow == DROP_OLDEST:
+                        self.queue.popleft()
+                        bus._count(bus.dropped, self.key)
+                    else:
+                        event = _coalesce(self.queue.pop(), event)
+                        bus._count(bus.coalesced, self.key)
+                        self.unfinished_tasks -= 1
+                self._put(event)
+                self.unfinished_tasks += 1
+                self.not_empty.notify()
+        bus._high_water(self.key, self.target, self.qsize(), self.bound)
+
+
+class _MailboxSlot:
+
+    """
+    Stands in for the event queue of one handler, see :meth:`.EventBus.publish`.
+    """
+
+    def __init__(self, dispatcher, mailbox, key, policy=FIFO, maxsize=0, overflow=BLOCK):
+        self.dispatcher = dispatcher
+        self.mailbox = mailbox
+        self.key = key
+        self.policy = policy
+        self.maxsize = maxsize
+        self.overflow = overflow
+
+    def put(self, event):
+        self.dispatcher.post(self.mailbox, self.key, event,
+                             self.policy, self.maxsize, self.overflow)
+
+
+class Dispatcher:
+
+    """
+    Serves the event handlers of all subscribers of the :class:`.EventBus`
+    with a fixed pool of worker threads.
+
+    Each subscriber has a mailbox, which holds its events in the order of publishing.
+    A mailbox with events is put into a ready queue, from where the workers take it.
+    Since only one worker at a time processes a mailbox, the handlers of a
+    subscriber are called one after another and in order.
+    After ``batch`` events, the worker puts the mailbox back into the ready queue
+    to give the other subscribers a chance.
+
+    The workers never block on a full mailbox or queue: it might only be served by
+    workers, which are blocked themselves. Hence, they coalesce the event instead.
+    """
+
+    def __init__(self, eventbus, nb_threads, batch=16):
+        from queue import Queue
+        self.eventbus = eventbus
+        self.logger = eventbus.logger
+        self.nb_threads = nb_threads
+        self.batch = batch
+        self._ready = Queue()
+        self._threads = []
+        self._warned = set()  # keys, which would have blocked a worker
+
+    def slot(self, target, key, policy=FIFO, maxsize=0, overflow=BLOCK, handler=None):
+        """
+        Subscribes the ``handler`` (by default ``on_<key>``) of the ``target``
+        to its mailbox, delivering events according to the given :func:`.delivery` policies.
+
+        :return: the object to put the events into.
+        """
+        if getattr(target, '_mailbox', None) is None:
+            target._mailbox = _Mailbox(target)
+        if handler is None:
+            handler = getattr(target, 'on_%s' % key)
+        target._mailbox.handlers[key] = (handler, self.eventbus._event_stats(key, target))
+        target._mailbox.keys.add(key)
+        if len(self._threads) == 0:
+            self._start()
+        return _MailboxSlot(self, target._mailbox, key, policy, maxsize, overflow)
+
+    def _start(self):
+        from threading import Thread
+        for i in range(self.nb_threads):
+            t = Thread(target=self._run, name='EventBus::worker-%d' % i)
+            t.daemon = True
+            t.start()
+            self._threads.append(t)
+
+    def is_worker(self):
+        """
+        ``True``, if the current thread is one of the workers.
+        """
+        return current_thread() in self._threads
+
+    def nonblocking(self, key, overflow):
+        """
+        The overflow policy for ``key`` in the current thread,
+        i.e. ``'coalesce'`` instead of ``'block'`` in a worker.
+        """
+        if overflow != BLOCK or not self.is_worker():
+            return overflow
+        if key not in self._warned:
+            self._warned.add(key)
+            self.logger.warning("full queue for '%s' in a dispatcher worker, coalescing "
+                                "instead of blocking" % key)
+        return COALESCE
+
+    def post(self, mailbox, key, event, policy=FIFO, maxsize=0, overflow=BLOCK):
+        bus = self.eventbus
+        with mailbox.lock:
+            batch = policy == BATCH
+            while policy != LATEST and 0 < maxsize <= mailbox.sizes[key]:
+                if overflow == BLOCK:
+                    overflow = self.nonblocking(key, overflow)
+                if overflow == BLOCK:
+                    mailbox.waiting += 1
+                    mailbox.not_full.wait()
+                    mailbox.waiting -= 1
+                elif overflow == DROP_OLDEST:
+                    mailbox.drop_oldest(key, batch)
+                    bus._count(bus.dropped, key)
+                else:
+                    mailbox.coalesce(key, event, batch)
+                    bus._count(bus.coalesced, key)
+                    event = None
+                    break
+            if event is None:
+                pass
+            elif policy == FIFO:
+                mailbox.events.append((key, event))
+                mailbox.sizes[key] += 1
+            elif key in mailbox.pending:
+                if policy == LATEST:
+                    mailbox.pending[key] = event
+                else:
+                    mailbox.pending[key].append(event)
+                    mailbox.sizes[key] += 1
+                bus._count(bus.coalesced, key)
+            else:
+                mailbox.pending[key] = event if policy == LATEST else [event]
+                mailbox.events.append((key, None))
+                mailbox.sizes[key] += 1
+            size = mailbox.sizes[key]
+            schedule = not mailbox.scheduled
+            mailbox.scheduled = True
+        bus._high_water(key, mailbox.target, size, maxsize)
+        if schedule:
+            self._ready.put(mailbox)
+
+    def _run(self):
+        while True:
+            mailbox = self._ready.get()
+            nb = 0
+            while True:
+                # take up to the remaining batch of events at once, to save locking
+                with mailbox.lock:
+                    events = mailbox.events
+                    if len(events) == 0:
+                        mailbox.scheduled = False
+                        break
+                    if nb >= self.batch:
+                        self._ready.put(mailbox)
+                        break
+                    items = []
+                    for _ in range(min(len(events), self.batch - nb)):
+                        key, event = events.popleft()
+                        if event is None:
+                            event = mailbox.pending.pop(key)
+                            mailbox.sizes[key] = 0
+                        else:
+                            mailbox.sizes[key] -= 1
+                        items.append((key, event))
+                    if mailbox.waiting > 0:
+                        mailbox.not_full.notify_all()
+                nb += len(items)
+                for key, event in items:
+                    if key in mailbox.keys:
+                        handler, stats = mailbox.handlers[key]
+                        self._handle(mailbox.target, key, event, handler, stats)
+                    else:
+                        self.eventbus._count(self.eventbus.dropped, key,
+                                             len(event) if isinstance(event, list) else 1)
+
+    def _handle(self, target, key, event, handler=None, stats=None):
+        try:
+            self.eventbus._call(key, target, event, handler, stats)
+        except Exception as e:
+            import traceback
+            self.logger.critical("Exception: %s in %s: %s -> unsubscribing.\n%s" %
+                                 (key, target, e, traceback.format_exc()))
+            self.eventbus.unsubscribe(key, target)
+
+
 class EventBus:
 
     """
@@ -406,8 +1270,29 @@ class EventBus:
 
     def __init__(self, config):
         self._subs = {}
+        # key -> tuple of (target, put, stats) for publish, replaced on every change
+        self._table = {}
         self.config = config
         self.logger = config.get_logger('EVBUS')
+        import collections
+        import threading
+        self._subs_lock = threading.RLock()
+        self._count_lock = threading.Lock()
+        #: number of events per key, which were superseded or batched by a :func:`.delivery` policy
+        self.coalesced = collections.Counter()
+        #: number of events per key, which were discarded without delivery
+        self.dropped = collections.Counter()
+        self._stats = {}
+        #: maximum number of pending events per key and subscriber name
+        self.high_water = {}
+        #: maximum lag (time between publishing and handling an event) in seconds
+        #: per key and subscriber name
+        self.max_lag = {}
+        #: if set, an :class:`~panobbgo.replay.EventRecorder`, which receives all published events
+        self.recorder = None
+        self._dispatcher = None
+        if config.dispatch_threads > 0:
+            self._dispatcher = Dispatcher(self, config.dispatch_threads)
 
     @property
     def keys(self):
@@ -420,97 +1305,217 @@ class EventBus:
         """
         Registers a given ``target`` for this EventBus instance.
         It needs to have suitable ``on_<key>`` methods.
-        For each of them, a :class:`~threading.Thread` is spawn as a daemon.
+
+        By default, they are served by the fixed pool of worker threads of the
+        :class:`.Dispatcher`, whose size is set via ``dispatch_threads``.
+        The ``on_start`` handlers, (async) generators and handlers marked as
+        :func:`.dedicated` get a :class:`~threading.Thread` on their own, spawned as a daemon.
+        If ``dispatch_threads`` is ``0``, this is done for all handlers.
+
+        :attr:`~.Module.hosted` targets (or those named via ``--hosted``)
+        run in a worker process, see :mod:`panobbgo.hosting`.
 
         :param Module target:
         """
-        from queue import Empty, Queue  # LifoQueue
+        target.eventbus_events = {}
+        host = None
+        if getattr(target, 'hosted', False) or target.name in self.config.hosted:
+            from .hosting import ModuleHost
+            target._host = host = ModuleHost(self, target)
+        # bind all 'on_<key>' methods to events in the eventbus
+        import inspect
+        for name, method in inspect.getmembers(target, predicate=inspect.ismethod):
+            if not name.startswith("on_"):
+                continue
+            key = self._check_key(name[3:])
+            policy = getattr(method, 'delivery', FIFO)
+            maxsize = getattr(method, 'maxsize', None)
+            maxsize = self.config.event_queue_size if maxsize is None else maxsize
+            overflow = getattr(method, 'overflow', None) or self.config.event_overflow
+            if host is not None:
+                target.eventbus_events[key] = host.slot(key, maxsize, overflow)
+            else:
+                target.eventbus_events[key] = self._bind(target, key, method,
+                                                         policy, maxsize, overflow)
+            self.subscribe(key, target)
+
+    def _bind(self, target, key, method, policy, maxsize, overflow):
+        """
+        Sets up the delivery of the events of ``key`` to the handler ``method``.
+
+        :return: the object, which receives the events via ``put(event)``.
+        """
+        from queue import Empty
         from threading import Thread
 
         # important: this decouples the dispatcher's thread from the actual
         # target
-        def run(key, target, drain=False):
-            if drain:  # not using draining for now, doesn't make much sense
-                isfirst = True
-                while True:
-                    # draining the queue... otherwise it might get really huge
-                    # it's up to the heuristics to only work with the most
-                    # important points
-                    events = []
-                    terminate = False
-                    try:
-                        while True:
-                            event = \
-                                target.eventbus_events[key].get(block=isfirst)
-                            terminate |= event.terminate
-                            events.append(event)
-                            isfirst = False
-                    except Empty:
-                        isfirst = True
-
-                    try:
-                        new_points = getattr(target, 'on_%s' % key)(events)
-                        # heuristics might call self.emit and/or return a list
-                        if new_points is not None:
-                            target.emit(new_points)
-                        if terminate:
-                            raise StopHeuristic("%s terminated" % target.name)
-                    except StopHeuristic as e:
-                        self.logger.debug("'%s/on_%s' %s -> unsubscribing." %
-                                          (target.name, key, e.message))
-                        self.unsubscribe(key, target)
-                        return
-
-            else:  # not draining (default)
+        def run(key, target, policy=FIFO):
+            queue = target.eventbus_events[key]
+            stats = self._event_stats(key, target)
+            try:
                 while True:
-                    try:
-                        event = target.eventbus_events[key].get(block=True)
-                        assert isinstance(event, Event)
+                    event = queue.get(block=True)
+                    assert isinstance(event, Event)
+                    if policy != FIFO:
+                        # draining the queue, according to the delivery policy
+                        events = [event]
                         try:
-                            new_points = getattr(
-                                target, 'on_%s' % key)(**event._kwargs)
-                            # heuristics might call self.emit and/or return a
-                            # list
-                            if new_points is not None:
-                                target.emit(new_points)
-                            if event.terminate:
-                                raise StopHeuristic("%s terminated" % target.name)
-                        except StopHeuristic as e:
-                            self.logger.debug(
-                                "'%s/on_%s' %s -> unsubscribing." %
-                                (target.name, key, e.message))
-                            self.unsubscribe(key, target)
-                            return
-                    except Exception as e:
-                        # usually, they only happen during shutdown
-                        if self.config.debug:
-                            # sys.exc_info() -> re-create original exception
-                            # (otherwise we don't know the actual cause!)
-                            import sys
-                            ex = sys.exc_info()
-                            raise (ex[1], None, ex[2])
-                        else:  # just issue a critical warning
-                            self.logger.critical(
-                                "Exception: %s in %s: %s" % (key, target, e))
+                            while True:
+                                events.append(queue.get(block=False))
+                        except Empty:
+                            pass
+                        self._count(self.coalesced, key, len(events) - 1)
+                        event = events[-1] if policy == LATEST else events
+                    if not self._call(key, target, event, method, stats):
                         return
+            except Exception as e:
+                import traceback
+                self.logger.critical("Exception: %s in %s: %s -> unsubscribing.\n%s" %
+                                     (key, target, e, traceback.format_exc()))
+                self.unsubscribe(key, target)
+            finally:
+                # nobody takes the events any more, don't let the publishers wait for it
+                queue.close()
+
+        if self._dispatcher is not None and not self._is_dedicated(key, method):
+            return self._dispatcher.slot(target, key, policy, maxsize, overflow, method)
+        # the queue is in place, before the thread starts running
+        target.eventbus_events[key] = queue = \
+            _EventQueue(self, key, target, maxsize, overflow)
+        t = Thread(target=run,
+                   args=(key, target, policy),
+                   name='EventBus::%s/%s' % (target.name, key))
+        t.daemon = True
+        t.start()
+        target._threads.append(t)
+        return queue
+
+    def _event_stats(self, key, target):
+        from .stats import EventStatistics
+        name = (key, target.name)
+        with self._count_lock:
+            if name not in self._stats:
+                self._stats[name] = EventStatistics()
+            return self._stats[name]
+
+    def stats(self):
+        """
+        The statistics of all events per key and subscriber name.
 
-        target.eventbus_events = {}
-        # bind all 'on_<key>' methods to events in the eventbus
+        :return: dict of ``(key, name)`` to :class:`~panobbgo.stats.EventStatistics`.
+        """
+        with self._count_lock:
+            return dict(self._stats)
+
+    def log_stats(self, logger):
+        """
+        Writes the :meth:`.stats` into the given ``logger``,
+        the subscribers with the highest total handler time first.
+        """
+        stats = sorted(list(self.stats().items()), key=lambda ks: -ks[1].total_time)
+        logger.info("EventBus: %d subscriptions, %d coalesced, %d dropped" %
+                    (len(stats), sum(self.coalesced.values()), sum(self.dropped.values())))
+        for (key, name), s in stats:
+            logger.info("  %-20s %-24s %s" % (key, name, s))
+
+    def _count(self, counter, key, nb=1):
+        if nb > 0:
+            with self._count_lock:
+                counter[key] += nb
+
+    @staticmethod
+    def _crossed(old, new, threshold):
+        """
+        True, if ``new`` reaches a new power of two multiple of the ``threshold``.
+        """
+        if new < threshold:
+            return False
+        return old < threshold or \
+            int(math.log2(new / float(threshold))) > int(math.log2(old / float(threshold)))
+
+    def _high_water(self, key, target, size, maxsize):
+        name = (key, target.name)
+        if size <= self.high_water.get(name, 0):
+            return  # fast path, without the lock
+        with self._count_lock:
+            old = self.high_water.get(name, 0)
+            if size <= old:
+                return
+            self.high_water[name] = size
+        if self._crossed(old, size, self.config.event_high_water) or size == maxsize:
+            self.logger.warning("%s/on_%s has %d pending events (bound %d)" %
+                                (target.name, key, size, maxsize))
+
+    def _lag(self, key, target, lag):
+        name = (key, target.name)
+        if lag <= self.max_lag.get(name, 0.):
+            return  # fast path, without the lock
+        with self._count_lock:
+            old = self.max_lag.get(name, 0.)
+            if lag <= old:
+                return
+            self.max_lag[name] = lag
+        if self._crossed(old, lag, self.config.event_lag):
+            self.logger.warning("%s/on_%s lags %.3f [s] behind" % (target.name, key, lag))
+
+    @staticmethod
+    def _is_dedicated(key, method):
         import inspect
-        for name, _ in inspect.getmembers(target, predicate=inspect.ismethod):
-            if not name.startswith("on_"):
-                continue
-            key = self._check_key(name[3:])
-            target.eventbus_events[key] = Queue()
-            t = Thread(target=run,
-                       args=(key, target,),
-                       name='EventBus::%s/%s' % (target.name, key))
-            t.daemon = True
-            t.start()
-            target._threads.append(t)
-            # thread running, now subscribe to events
-            self.subscribe(key, target)
-            # logger.debug("%s subscribed and running." % t.name)
+        return key == 'start' or getattr(method, 'dedicated', False) \
+            or inspect.isgeneratorfunction(method) or inspect.isasyncgenfunction(method)
+
+    def _call(self, key, target, event, handler=None, stats=None):
+        """
+        Calls the ``on_<key>`` handler of the ``target`` for the given ``event``
+        or list of events (for the ``batch`` :func:`.delivery` policy).
+        The ``handler`` and its ``stats`` are bound at registration,
+        otherwise they are looked up.
+
+        :return: ``False``, if the handler is done and has been unsubscribed.
+        """
+        if stats is None:
+            stats = self._event_stats(key, target)
+        events = event if isinstance(event, list) else [event]
+        start = time.time()
+        for e in events:
+            stats.wait.add(start - e._when)
+        self._lag(key, target, start - events[0]._when)
+        try:
+            if handler is None:
+                handler = getattr(target, 'on_%s' % key)
+            try:
+                if isinstance(event, list):
+                    new_points = handler(event)
+                else:
+                    new_points = handler(**event._kwargs)
+                # coroutines and async generators run on an event loop of this thread
+                if isinstance(new_points, types.CoroutineType):
+                    new_points = _run_coroutine(new_points)
+                elif isinstance(new_points, types.AsyncGeneratorType):
+                    new_points = _iterate_async(new_points)
+                # heuristics might call self.emit and/or return (or yield) a list
+                if isinstance(new_points, types.GeneratorType):
+                    for points in new_points:
+                        if points is not None:
+                            target.emit(points)
+                elif new_points is not None:
+                    target.emit(new_points)
+            except StopHeuristic:
+                raise
+            except Exception:
+                stats.failed += len(events)
+                raise
+            finally:
+                stats.handler.add(time.time() - start)
+            stats.delivered += len(events)
+            if any(e.terminate for e in events):
+                raise StopHeuristic("%s terminated" % target.name)
+        except StopHeuristic as e:
+            self.logger.debug("'%s/on_%s' %s -> unsubscribing." % (target.name, key, e))
+            self.unsubscribe(key, target)
+            return False
+        return True
 
     @staticmethod
     def _check_key(key):
@@ -525,11 +1530,23 @@ class EventBus:
         .. Note:: counterpart is :func:`unsubscribe`.
         """
         self._check_key(key)
-        if key not in self._subs:
-            self._subs[key] = []
+        with self._subs_lock:
+            if key not in self._subs:
+                self._subs[key] = []
+
+            assert target not in self._subs[key]
+            self._subs[key].append(target)
+            self._update_table(key)
 
-        assert target not in self._subs[key]
-        self._subs[key].append(target)
+    def _update_table(self, key):
+        """
+        Replaces the subscribers of ``key`` in the dispatch table. Since the table is
+        never changed in place, :meth:`.publish` reads it without a lock.
+        """
+        table = dict(self._table)
+        table[key] = tuple((t, t.eventbus_events[key].put, self._event_stats(key, t))
+                           for t in self._subs[key])
+        self._table = table
 
     def unsubscribe(self, key, target):
         """
@@ -546,12 +1563,23 @@ class EventBus:
             return
 
         self._check_key(key)
-        if key not in self._subs:
-            self.logger.critical("cannot unsubscribe unknown key '%s'" % key)
-            return
+        with self._subs_lock:
+            if key not in self._subs:
+                self.logger.critical("cannot unsubscribe unknown key '%s'" % key)
+                return
+
+            if target in self._subs[key]:
+                self._subs[key].remove(target)
+                self._update_table(key)
+        if getattr(target, '_mailbox', None) is not None:
+            target._mailbox.keys.discard(key)
 
-        if target in self._subs[key]:
-            self._subs[key].remove(target)
+    def subscribed(self, key):
+        """
+        True, if there is at least one subscriber for ``key`` (or a :attr:`.recorder`).
+        This allows to skip preparing events, which nobody receives.
+        """
+        return self.recorder is not None or len(self._table.get(key, ())) > 0
 
     def publish(self, key, event=None, terminate=False, **kwargs):
         """
@@ -567,17 +1595,32 @@ class EventBus:
                          (use it for ``on_start`` and similar).
         - ``**kwargs``: any additional keyword arguments are stored inside the Event
                         if ``event`` is ``None``.
+
+        .. Note::
+
+          This is the fast path: the subscribers are a snapshot of the dispatch table,
+          their handlers are bound at registration and one :class:`.Event` is shared.
         """
-        if key not in self._subs:
+        if self.recorder is not None:
+            self.recorder.record(key, kwargs if event is None else event._kwargs, terminate)
+
+        subs = self._table.get(key)
+        if subs is None:
             if self.config.debug:
                 self.logger.warning("key '%s' unknown." % key)
             return
+        if len(subs) == 0:
+            return
 
-        for target in self._subs[key]:
-            event = Event(**kwargs) if event is None else event
-            event.terminate = terminate
-            # logger.info("EventBus: publishing %s -> %s" % (key, event))
-            target.eventbus_events[key].put(event)
+        if event is None:
+            event = Event._create(kwargs, terminate)
+        elif event.terminate != terminate:
+            event = Event._create(event._kwargs, terminate, event._when)
+        with self._count_lock:
+            for _, _, stats in subs:
+                stats.published += 1
+        for _, put, _ in subs:
+            put(event)
 
 
 class StrategyBase:
@@ -592,22 +1635,30 @@ class StrategyBase:
 
     #. Overwrite the :meth:`.execute`, which returns a list of new search points
        (by requesting them from the :mod:`~panobbgo.heuristics` via the
-       :meth:`~panobbgo.core.Heuristic.get_points` method) and might
+       :meth:`~panobbgo.core.Heuristic.get_point_list` method) and might
        also emit :class:`Events <panobbgo.core.Event>`.
 
     This ``execute`` method will be called repeatedly as long as there are less than the
     given maximum number of search points evaluated.
+    Between two calls, the main loop sleeps until a task has finished or
+    -- if there are :attr:`.free_slots` -- a heuristic has emitted new points.
+    Hence, ``execute`` should not wait for points itself.
+    Heuristics, which :meth:`~panobbgo.core.Heuristic.produce` points on demand,
+    generate as many points as ``execute`` requests from them.
     """
     # constant reference id for sending the evaluation code to workers
     PROBLEM_KEY = "problem"
 
-    def __init__(self, problem, parse_args=False):
+    def __init__(self, problem, parse_args=False, resume=None):
         """
 
 
         @type problem: panobbgo_lib.lib.Problem
         @param problem: 
         @param parse_args: 
+        @param resume: path of a :class:`~panobbgo.archive.ResultArchive`.
+                       Its results are replayed (i.e. not evaluated again)
+                       and the run continues with the remaining ``max_eval`` budget.
         """
         self._name = name = self.__class__.__name__
         self.config = config = Config(parse_args)
@@ -625,14 +1676,29 @@ class StrategyBase:
 
         # statistics
         self.show_last = 0  # for printing the info line in _add_tasks()
+        self.event_stats_last = time.time()  # for dumping the EventBus.stats()
         self.time_start = time.time()
-        self.tasks_walltimes = {}
+        from .stats import TaskStatistics
+        self.stats = TaskStatistics()
 
         # task accounting (tasks != points !!!)
-        self.jobs_per_client = 1  # number of tasks per client in 'chunksize'
+        self.jobs_per_client = 1  # number of points per task, the 'chunksize'
+        from .evaluators import ChunkSizeController
+        self.chunking = ChunkSizeController(self, self.stats,
+                                            overhead=config.chunk_overhead,
+                                            latency=config.chunk_latency,
+                                            depth=config.pipeline_depth)
         self.pending = set([])
         self.new_finished = []
-        self.finished = []
+        from .pending import PendingPoints
+        #: the points being evaluated, see :mod:`panobbgo.pending`
+        self.in_flight = PendingPoints(problem.dim, problem.ranges)
+
+        # the main loop sleeps on this, until there is something to do
+        import threading
+        self._wakeup = threading.Event()
+        self._hungry = True  # wake up on new points?
+        self._executed = 0  # number of points of the last execute()
 
         # init & start everything
         self._setup_cluster(0, problem)
@@ -642,8 +1708,14 @@ class StrategyBase:
         self._heuristics = collections.OrderedDict()
         self._analyzers = collections.OrderedDict()
         self.problem = problem
-        self.eventbus = EventBus(config)
+        self.eventbus = self._setup_eventbus(config)
         self.results = Results(self)
+        if config.cache:
+            from .cache import EvaluationCache
+            self.cache = EvaluationCache(problem, config.cache_tolerance, config.cache_failed)
+        else:
+            self.cache = None
+        self._resume = resume if resume is not None else config.resume
 
         # UI
         if config.ui_show:
@@ -662,20 +1734,22 @@ class StrategyBase:
             self.add_heuristic(h)
 
         # analyzers
-        from .analyzers import Best, Grid, Splitter
-        best = Best(self)
-        self._analyzers.update({
-            'best': best,
-            'grid': Grid(self),
-            'splitter': Splitter(self)
-        })
-        for a in self._analyzers.values():
-            self.add_analyzer(a)
+        from .analyzers import Best, Grid, Splitter, SpatialIndex
+        for name, klass in [('best', Best), ('grid', Grid),
+                            ('splitter', Splitter), ('spatial_index', SpatialIndex)]:
+            self.add_analyzer(klass(self), name=name)
 
         self.check_dependencies()
 
         self.logger.debug("EventBus keys: %s" % self.eventbus.keys)
 
+        if self.config.record is not None:
+            from .replay import EventRecorder
+            self.eventbus.recorder = EventRecorder(self.config.record, self.problem)
+            self.logger.info("recording events to %s" % self.config.record)
+
+        self._setup_archive()
+
         try:
             import threading
             if isinstance(self, threading.Thread):
@@ -710,12 +1784,14 @@ class StrategyBase:
         self._heuristics[name] = h
         self.init_module(h)
 
-    def add_analyzer(self, a):
+    def add_analyzer(self, a, name=None):
         """
 
         :param Analyzer a:
+        :param str name: key for :meth:`.analyzer`, default is the name of ``a``.
         """
-        name = a.name
+        if name is None:
+            name = a.name
         assert name not in self._analyzers, \
             "Names of analyzers need to be unique. '%s' is already used." % name
         self._analyzers[name] = a
@@ -756,79 +1832,170 @@ class StrategyBase:
         module.eventbus.register(module)
 
     def _setup_cluster(self, nb_gens, problem):
-        from IPython.parallel import Client
-        c = self._client = Client(profile=self.config.ipy_profile)
-        c.clear()  # clears remote engines
-        c.purge_results('all')  # all results are memorized in the hub
-
-        if len(c.ids) < nb_gens + 1:
-            raise Exception('I need at least %d clients.' % (nb_gens + 1))
-        dv_evaluators = c[nb_gens:]
-        dv_evaluators[StrategyBase.PROBLEM_KEY] = problem
-        self.generators = c.load_balanced_view(c.ids[:nb_gens])
-        self.evaluators = c.load_balanced_view(c.ids[nb_gens:])
-        self.direct_view = c.ids[:]
-        # TODO remove this hack. "problem" wasn't pushed to all clients
-        # time.sleep(1e-1)
-
-        # import some packages (also locally)
-        # with c[:].sync_imports():
-        #  import numpy
-        #  import math
+        """
+        Creates the :mod:`evaluator backend <panobbgo.evaluators>`,
+        as configured via ``evaluator`` in the config or ``--evaluator``.
+        """
+        from .evaluators import create_evaluator
+        self.evaluators = create_evaluator(self, problem)
+        self.logger.info("evaluators: %s" % self.evaluators)
+
+    def _setup_eventbus(self, config):
+        """
+        Creates the :class:`.EventBus`, or the :class:`~panobbgo.aio.AsyncEventBus`
+        if ``event_loop`` in the config or ``--event-loop`` is ``asyncio``.
+        """
+        if config.event_loop == 'asyncio':
+            from .aio import AsyncEventBus
+            return AsyncEventBus(config)
+        return EventBus(config)
+
+    def _setup_archive(self):
+        """
+        Opens the :class:`~panobbgo.archive.ResultArchive` for the results.
+        When resuming, the archived results are replayed via the
+        :class:`.Results` database, i.e. all analyzers receive them as
+        ``new_results`` events, and new results are appended to the same archive.
+        """
+        from .archive import ResultArchive
+        path = self._resume
+        if path is None:
+            if not self.config.archive:
+                return
+            import os
+            name = '%s-%s' % (self.problem.__class__.__name__,
+                              time.strftime('%Y%m%d-%H%M%S'))
+            path = os.path.join(self.config.archive_dir, name)
+        archive = ResultArchive(path, fsync_interval=self.config.fsync_interval)
+        if self._resume is not None:
+            if archive.meta is not None and archive.meta['dim'] != self.problem.dim:
+                raise ValueError("%s has dimension %d, but problem has %d" %
+                                 (archive, archive.meta['dim'], self.problem.dim))
+            old = archive.load()
+            self.logger.info("resuming with %d results from %s" % (len(old), archive))
+            chunk = 1000
+            for i in range(0, len(old), chunk):
+                self.results += old[i:i + chunk]
+            if self.cache is not None:
+                self.cache.add(old)
+        self.logger.info("writing results to %s" % archive)
+        self.results.archive = archive
 
     @property
     def best(self):
         return self._analyzers['best'].best
 
+    def wakeup(self, points=False):
+        """
+        Wakes up the main loop. The evaluators call this when a task has finished
+        and heuristics when they have emitted new ``points`` -- the latter only
+        matters if there are free slots for new tasks.
+        """
+        if not points or self._hungry:
+            self._wakeup.set()
+
+    @property
+    def free_slots(self):
+        """
+        Number of tasks, which could be started right now,
+        such that each worker has ``pipeline_depth`` tasks in flight.
+        """
+        return max(0, self.chunking.depth * len(self.evaluators)
+                   - len(self.evaluators.outstanding))
+
     @property
     def name(self):
         return self._name
 
     def _run(self):
+        if self.config.event_loop == 'asyncio':
+            import asyncio
+            from .aio import run_strategy
+            asyncio.run(run_strategy(self))
+            return
         self.eventbus.publish('start', terminate=True)
-        from IPython.parallel import Reference
-        prob_ref = Reference(StrategyBase.PROBLEM_KEY)  # see _setup_cluster
         self._start = time.time()
         self.eventbus.register(self)
         self.logger.info("Strategy '%s' started" % self._name)
         self.loops = 0
         while True:
             self.loops += 1
+            # events after this point wake up the next round
+            self._wakeup.clear()
 
-            # execute the actual strategy
-            points = self.execute()
-
-            # distribute work
-            new_tasks = self.evaluators.map_async(prob_ref,
-                                                  points,
-                                                  chunksize=self.jobs_per_client,
-                                                  ordered=False)
-
-            # and don't forget, this updates the statistics
-            self._add_tasks(new_tasks)
-
-            # collect new results for each finished task, hand them over to result DB
-            new_results = []
-            for msg_id in self.new_finished:
-                list(map(new_results.append, self.evaluators.get_result(msg_id).result))
-            self.results += new_results
+            if self._round():
+                break
 
-            self.jobs_per_client = max(1,
-                                       int(min(self.config.max_eval / 50.,
-                                               1. / self.avg_time_per_task)))
+            # sleep until a task finished or, if there are free slots,
+            # a heuristic emitted new points (the timeout is just a safeguard)
+            self._hungry = self.free_slots > 0
+            if not (self._hungry and self._points_ready()):
+                self._wakeup.wait(1.)
 
-            # show heuristic performances after each round
-            # logger.info('  '.join(('%s:%.3f' % (h, h.performance) for h in
-            # heurs)))
+        self._cleanup()
 
-            # stopping criteria
-            if len(self.results) > self.config.max_eval:
-                break
+    def _points_ready(self):
+        """
+        True, if the next round gets new points without waiting: either a heuristic
+        has points in its output, or one :meth:`produces <.Heuristic.produce>` them
+        on demand and the last round got some.
+        """
+        heuristics = self.heuristics
+        if any(h._output.qsize() > 0 for h in heuristics):
+            return True
+        return self._executed > 0 and \
+            any(h._on_demand and not h._stopped for h in heuristics)
 
-            # limit loop speed
-            self.evaluators.wait(None, 1e-3)
+    def _round(self):
+        """
+        One round of the main loop: gets new points via :meth:`.execute`,
+        submits them and hands over the results of all finished tasks.
 
-        self._cleanup()
+        :return: ``True``, if the stopping criteria is met.
+        """
+        # execute the actual strategy
+        points = self.execute()
+        self._executed = len(points)
+
+        # duplicates are answered by the cache, or wait for the pending evaluation
+        cached = []
+        if self.cache is not None:
+            points, cached = self.cache.filter(points)
+
+        # distribute work
+        new_tasks = []
+        if len(points) > 0:
+            new_tasks = self.evaluators.submit(points, chunksize=self.jobs_per_client)
+            x = self.in_flight.add(points)
+            if self.eventbus.subscribed('new_pending'):
+                self.eventbus.publish('new_pending', points=x)
+
+        # and don't forget, this updates the statistics
+        # and collects the new results of all finished tasks
+        new_results = self._add_tasks(new_tasks)
+
+        # hand them over to result DB
+        if self.cache is not None:
+            cached.extend(self.cache.add(new_results))
+        self.results += new_results + cached
+
+        self.jobs_per_client = self.chunking.decide(
+            self.config.max_eval - self.nb_evaluations, len(self.evaluators))
+
+        # show heuristic performances after each round
+        # logger.info('  '.join(('%s:%.3f' % (h, h.performance) for h in
+        # heurs)))
+
+        # stopping criteria
+        if self.nb_evaluations > self.config.max_eval:
+            return True
+        # heuristics, which only repeat known points, would never reach max_eval
+        if self.cache is not None and \
+                self.cache.answered > self.config.max_answered * self.config.max_eval:
+            self.logger.warning('stopping: %d points answered by the cache, '
+                                'but only %d evaluated' % (self.cache.answered, self.nb_evaluations))
+            return True
+        return False
 
     def execute(self):
         """
@@ -836,22 +2003,29 @@ class StrategyBase:
         """
         raise Exception('You need to extend the class StrategyBase and overwrite this execute method.')
 
-    def _cleanup(self):
+    def _cleanup(self, publish=True):
         """
         cleanup + shutdown
+
+        Args:
+
+        - ``publish``: if ``False``, the ``finished`` event has been published already.
         """
-        self.eventbus.publish('finished')
+        if publish:
+            self.eventbus.publish('finished')
         self._end = time.time()
-        for msg_id in self.evaluators.outstanding:
-            try:
-                self.evaluators.get_result(msg_id).abort()
-            except:
-                pass
+        self.evaluators.shutdown()
         self.logger.info("Strategy '%s' finished after %.3f [s] and %d loops."
                          % (self._name, self._end - self._start, self.loops))
 
         self.info()
+        self.eventbus.log_stats(self.slogger)
         self.results.info()
+        if self.results.archive is not None:
+            self.results.archive.close()
+        if self.eventbus.recorder is not None:
+            self.eventbus.recorder.close()
+            self.logger.info("%s" % self.eventbus.recorder)
         [m.__stop__() for m in self.analyzers + self.heuristics]
         if self.config.ui_show:
             self.ui.finish()  # blocks figure window
@@ -859,19 +2033,30 @@ class StrategyBase:
     def _add_tasks(self, new_tasks):
         """
         Accounting routine for the parallel tasks, only used by :meth:`.run`.
+
+        :param list new_tasks: task ids of the newly submitted tasks
+        :return: list of the results of all finished tasks
         """
-        if new_tasks is not None:
-            for mid in new_tasks.msg_ids:
-                self.pending.add(mid)
-        self.new_finished = self.pending.difference(self.evaluators.outstanding)
-        self.pending = self.pending.difference(self.new_finished)
-        for tid in self.new_finished:
-            self.finished.append(tid)
-            self.tasks_walltimes[tid] = self.evaluators.get_result(tid).elapsed
+        self.pending.update(new_tasks)
+        new_results = []
+        self.new_finished = []
+        for tid, results, elapsed, walltime, worker in self.evaluators.collect():
+            self.new_finished.append(tid)
+            self.stats.add_task(results, elapsed, walltime, worker)
+            new_results.extend(results)
+        self.pending.difference_update(self.new_finished)
+        done = self.in_flight.remove([r.point for r in new_results])
+        if len(done) > 0 and self.eventbus.subscribed('pending_done'):
+            self.eventbus.publish('pending_done', points=done)
 
         if time.time() - self.show_last > self.config.show_interval:
             self.info()
             self.show_last = time.time()
+        interval = self.config.event_stats_interval
+        if interval > 0 and time.time() - self.event_stats_last > interval:
+            self.eventbus.log_stats(self.slogger)
+            self.event_stats_last = time.time()
+        return new_results
 
     def info(self):
         """
@@ -880,22 +2065,38 @@ class StrategyBase:
         """
         avg = self.avg_time_per_task
         pend = len(self.pending)
-        fini = len(self.finished)
-        peval = len(self.results)
+        fini = self.stats.nb_tasks
+        peval = self.nb_evaluations
         s = '{0:4d} ({1:4d}) pnts | Tasks: {2:3d} pend, {3:3d} finished | ' \
-            '{4:6.3f} [s] cpu, {5:6.3f} [s] wall, {6:6.3f} [s/task]' \
-            .format(peval, len(self.results), pend, fini, self.time_cpu, self.time_wall, avg)
+            '{4:6.3f} [s] cpu, {5:6.3f} [s] wall, {6:6.3f} [s/task] | Chunks: {7:d} pnts' \
+            .format(peval, len(self.results), pend, fini, self.time_cpu, self.time_wall, avg,
+                    self.jobs_per_client)
+        s += ' | Queue: {0:.2e} [s] median, {1:.2e} [s] q90'.format(
+            self.stats.queue_delay.quantile(.5), self.stats.queue_delay.quantile(.9))
+        if self.cache is not None:
+            s += ' | Cache: {0:d} hits, {1:d} folded, {2:d} misses'.format(
+                self.cache.hits, self.cache.folded, self.cache.misses)
         self.slogger.info(s)
+        for who in self.stats.heuristics:
+            self.slogger.debug('  %-20s %.2e [s/pnt]' % (who, self.stats.heuristic(who).mean))
+        for h in self._heuristics.values():
+            if h.discarded > 0:
+                self.slogger.info('  %-20s %d stale points discarded' % (h.name, h.discarded))
+
+    @property
+    def nb_evaluations(self):
+        """
+        Number of actually evaluated points, i.e. without those answered by the cache.
+        """
+        answered = self.cache.answered if self.cache is not None else 0
+        return len(self.results) - answered
 
     @property
     def avg_time_per_task(self):
         """
-        :return float: average time per task
+        :return float: average evaluation time per task, ``NaN`` if no task has finished yet.
         """
-        if len(self.tasks_walltimes) > 1:
-            return np.average(list(self.tasks_walltimes.values()))
-        self.slogger.warning("avg time per task for 0 tasks! -> returning NaN")
-        return np.NAN
+        return self.stats.evaltime.mean
 
     @property
     def time_wall(self):
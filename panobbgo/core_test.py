@@ -0,0 +1,476 @@
+# -*- coding: utf8 -*-
+# Copyright 2012 Harald Schilly <harald.schilly@univie.ac.at>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from __future__ import unicode_literals
+
+import numpy as np
+
+from panobbgo.utils import PanobbgoTestCase
+
+
+class CoreTests(PanobbgoTestCase):
+
+    def test_results(self):
+        from panobbgo.core import Results
+        results = Results(self.strategy)
+        assert len(results) == 0
+        assert results.results is None
+        results += []
+        assert len(results) == 0
+
+        batches = [self.random_results(2, n, pcv=.5) for n in [1, 100, 200, 3]]
+        for batch in batches:
+            results += batch
+        all_results = sum(batches, [])
+        N = len(all_results)
+        assert len(results) == N
+        assert results.x.shape == (N, 2)
+        assert np.allclose(results.x, [r.x for r in all_results])
+        assert np.allclose(results.fx, [r.fx for r in all_results])
+        assert np.allclose(results.cv, [r.cv for r in all_results])
+        assert np.allclose(results.cv_vec, [r.cv_vec for r in all_results])
+        assert list(results.who) == ['test'] * N
+
+        df = results.results
+        assert df is results.results  # cached
+        assert df.shape == (N, 2 + 1 + 2 + 3)
+        assert np.allclose(df['fx'][0], results.fx)
+        results += self.random_results(2, 1)
+        assert results.results is not df
+        assert len(results.results) == N + 1
+
+    def test_dispatcher(self):
+        from panobbgo.core import EventBus, Module, dedicated
+        from threading import Event, current_thread
+
+        class Subscriber(Module):
+
+            def __init__(self, strategy, name):
+                Module.__init__(self, strategy, name)
+                self.values = []
+                self.threads = set()
+                self.done = Event()
+                self.started = Event()
+
+            def on_start(self):
+                self.started.set()
+
+            @dedicated
+            def on_loop(self):
+                self.threads.add('loop')
+
+            def on_foo(self, i):
+                self.values.append(i)
+                self.threads.add(current_thread().name)
+
+            def on_bar(self):
+                self.done.set()
+
+        self.config.dispatch_threads = 2
+        bus = EventBus(self.config)
+        subs = [Subscriber(self.strategy, 'sub%d' % i) for i in range(5)]
+        for sub in subs:
+            bus.register(sub)
+            # dedicated threads for on_start and on_loop
+            assert len(sub._threads) == 2
+            assert sub._mailbox.keys == set(['foo', 'bar'])
+        assert len(bus._dispatcher._threads) == 2
+
+        bus.publish('start', terminate=True)
+        for i in range(100):
+            bus.publish('foo', i=i)
+        bus.publish('bar')
+        for sub in subs:
+            assert sub.done.wait(10.)
+            assert sub.started.wait(10.)
+            assert sub.values == list(range(100))
+            assert all(t.startswith('EventBus::worker-') for t in sub.threads)
+
+        bus.unsubscribe('foo', subs[0])
+        assert subs[0]._mailbox.keys == set(['bar'])
+
+        stats = bus.stats()
+        foo = stats[('foo', 'sub1')]
+        assert foo.published == foo.delivered == 100
+        assert foo.failed == 0
+        assert foo.wait.count == foo.handler.count == 100
+        assert foo.handler.max >= 0 and foo.total_time >= 0
+        assert stats[('start', 'sub1')].delivered == 1
+
+    def test_delivery_policies(self):
+        from panobbgo.core import EventBus, Module, delivery
+        from threading import Event
+
+        class Subscriber(Module):
+
+            def __init__(self, strategy):
+                Module.__init__(self, strategy, 'sub')
+                self.gate = Event()
+                self.latest, self.batches = [], []
+
+            @delivery('latest')
+            def on_latest(self, i):
+                self.gate.wait()  # events pile up meanwhile
+                self.latest.append(i)
+
+            @delivery('batch')
+            def on_batch(self, events):
+                self.gate.wait()
+                self.batches.append([e.i for e in events])
+
+        for threads in [2, 0]:
+            self.config.dispatch_threads = threads
+            bus = EventBus(self.config)
+            sub = Subscriber(self.strategy)
+            bus.register(sub)
+            for i in range(10):
+                bus.publish('latest', i=i)
+                bus.publish('batch', i=i)
+            # at most the first event of each key is being processed
+            import time
+            time.sleep(.1)
+            sub.gate.set()
+            while len(sub.latest) == 0 or sub.latest[-1] != 9 or \
+                    sum(len(b) for b in sub.batches) < 10:
+                time.sleep(.01)
+            assert len(sub.latest) <= 2
+            assert bus.coalesced['latest'] == 10 - len(sub.latest)
+            assert sum(sub.batches, []) == list(range(10))
+            assert len(sub.batches) <= 2
+            assert bus.coalesced['batch'] == 10 - len(sub.batches)
+
+    def test_bounded_queues(self):
+        from panobbgo.core import EventBus, Module, delivery
+        from threading import Event, Thread
+        import time
+
+        def subscriber(key, overflow):
+            # one subscriber per key, they do not block each other
+
+            @delivery(maxsize=3, overflow=overflow)
+            def handler(self, items):
+                self.gate.wait()
+                self.received.append(items)
+            sub = type(str('Sub'), (Module,), {'on_%s' % key: handler})(self.strategy, key)
+            sub.gate, sub.received = gate, []
+            return sub
+
+        for threads in [2, 0]:
+            self.config.dispatch_threads = threads
+            bus = EventBus(self.config)
+            gate = Event()
+            dropping = subscriber('dropping', 'drop_oldest')
+            coalescing = subscriber('coalescing', 'coalesce')
+            blocking = subscriber('blocking', 'block')
+            for sub in [dropping, coalescing, blocking]:
+                bus.register(sub)
+
+            def publish(key):
+                for i in range(10):
+                    bus.publish(key, items=[i])
+                    time.sleep(.05 if i == 0 else 0)  # the first one is taken right away
+            publish('dropping')
+            publish('coalescing')
+            publisher = Thread(target=publish, args=('blocking',))
+            publisher.daemon = True
+            publisher.start()
+            time.sleep(.1)
+            assert publisher.is_alive()  # waits for free space
+            gate.set()
+            publisher.join(10.)
+            deadline = time.time() + 10.
+            while len(dropping.received) < 4 or len(coalescing.received) < 4 or \
+                    len(blocking.received) < 10:
+                assert time.time() < deadline
+                time.sleep(.01)
+
+            assert dropping.received == [[0], [7], [8], [9]]
+            assert bus.dropped['dropping'] == 6
+            assert coalescing.received == [[0], [1], [2], list(range(3, 10))]
+            assert bus.coalesced['coalescing'] == 6
+            assert blocking.received == [[i] for i in range(10)]
+            assert bus.high_water[('blocking', 'blocking')] == 3
+            assert bus.max_lag[('dropping', 'dropping')] >= .1
+
+    def test_mutual_publishing(self):
+        from panobbgo.core import EventBus, Module, delivery
+        from threading import Barrier, Event
+
+        barrier = Barrier(2, timeout=10.)
+
+        def subscriber(key, other):
+            # publishes into the full mailbox of the other one, while it does the same
+
+            @delivery(maxsize=2, overflow='block')
+            def handler(self, items):
+                self.received.extend(items)
+                if items == ['start']:
+                    barrier.wait()
+                    for i in range(5):
+                        self.eventbus.publish(other, items=[i])
+                if len(self.received) == 6:
+                    self.done.set()
+            sub = type(str('Sub'), (Module,), {'on_%s' % key: handler})(self.strategy, key)
+            sub.received, sub.done = [], Event()
+            return sub
+
+        self.config.dispatch_threads = 2
+        bus = self.strategy.eventbus = EventBus(self.config)
+        ping, pong = subscriber('ping', 'pong'), subscriber('pong', 'ping')
+        for sub in [ping, pong]:
+            bus.register(sub)
+        bus.publish('ping', items=['start'])
+        bus.publish('pong', items=['start'])
+        # the workers coalesce instead of waiting for each other
+        for sub in [ping, pong]:
+            assert sub.done.wait(10.)
+            assert sub.received == ['start'] + list(range(5))
+        assert bus.coalesced['ping'] > 0 and bus.coalesced['pong'] > 0
+
+    def test_dedicated_failure(self):
+        from panobbgo.core import EventBus, Module, dedicated, delivery
+        from threading import Thread
+
+        class Failing(Module):
+
+            @dedicated
+            @delivery(maxsize=5, overflow='block')
+            def on_fail(self, i):
+                raise ValueError("failing %d" % i)
+
+        self.config.dispatch_threads = 2
+        bus = EventBus(self.config)
+        failing = Failing(self.strategy)
+        bus.register(failing)
+
+        def publish():
+            for i in range(20):
+                bus.publish('fail', i=i)
+        publisher = Thread(target=publish)
+        publisher.daemon = True
+        publisher.start()
+        # the failing handler is unsubscribed and doesn't block the publisher
+        publisher.join(10.)
+        assert not publisher.is_alive()
+        assert failing not in bus._subs['fail']
+        assert bus._event_stats('fail', failing).failed == 1
+
+    def test_eventbus_stats(self):
+        from panobbgo.core import EventBus, Module
+        import time
+
+        class Failing(Module):
+
+            def on_fail(self, x):
+                if x < 0:
+                    raise ValueError("negative")
+
+        self.config.dispatch_threads = 1
+        bus = EventBus(self.config)
+        sub = Failing(self.strategy)
+        bus.register(sub)
+        bus.publish('fail', x=1)
+        bus.publish('fail', x=-1)
+        bus.publish('fail', x=2)  # unsubscribed after failure
+        deadline = time.time() + 10.
+        while bus.stats()[('fail', 'Failing')].failed == 0:
+            assert time.time() < deadline
+            time.sleep(.01)
+        stats = bus.stats()[('fail', 'Failing')]
+        assert stats.published == 3
+        assert stats.delivered == 1
+        assert stats.failed == 1
+
+        import mock
+        logger = mock.MagicMock()
+        bus.log_stats(logger)
+        lines = [c[0][0] for c in logger.info.call_args_list]
+        assert len(lines) == 2
+        assert '1 subscriptions' in lines[0]
+        assert '1 fail' in lines[1]
+
+    def test_event(self):
+        from panobbgo.core import Event, _coalesce
+        e = Event(a=1, b=[1])
+        assert e.a == 1 and e.b == [1] and not e.terminate
+        with self.assertRaises(AttributeError):
+            e.a = 2
+        with self.assertRaises(AttributeError):
+            e.c
+        with self.assertRaises(AttributeError):
+            e._foo
+        merged = _coalesce(e, Event._create({'a': 2, 'b': [2]}, terminate=True))
+        assert merged.a == 2 and merged.b == [1, 2] and merged.terminate
+        assert merged._when == e._when
+
+    def test_dispatch_table(self):
+        from panobbgo.core import EventBus, Module
+
+        class Queue:
+
+            def __init__(self):
+                self.events = []
+
+            def put(self, event):
+                self.events.append(event)
+
+        class Sub(Module):
+
+            def on_foo(self, i):
+                pass
+
+        bus = EventBus(self.config)
+        subs = [Sub(self.strategy) for _ in range(2)]
+        for sub in subs:
+            sub.eventbus_events = {'foo': Queue()}
+        # the queue methods are bound when subscribing
+        subs[0].eventbus_events['foo'].put = lambda event: bus.unsubscribe('foo', subs[1])
+        for sub in subs:
+            bus.subscribe('foo', sub)
+
+        # unsubscribing while publishing doesn't affect the running publish
+        bus.publish('foo', i=1)
+        assert len(subs[1].eventbus_events['foo'].events) == 1
+        bus.publish('foo', i=2)
+        assert len(subs[1].eventbus_events['foo'].events) == 1
+        assert [t for t, _, _ in bus._table['foo']] == [subs[0]]
+
+        # one event object is shared by all subscribers
+        subs[0].eventbus_events['foo'] = Queue()
+        bus.unsubscribe('foo', subs[0])
+        bus.subscribe('foo', subs[0])
+        bus.subscribe('foo', subs[1])
+        bus.publish('foo', i=3)
+        assert subs[0].eventbus_events['foo'].events[0] is subs[1].eventbus_events['foo'].events[-1]
+        assert bus.stats()[('foo', 'Sub')].published == 5
+
+    def test_point_buffer(self):
+        from panobbgo.core import PointBuffer
+        import threading
+        buf = PointBuffer(4)
+        assert buf.get().shape == (0, 0)
+        assert buf.put(np.arange(6.).reshape(3, 2)) == 3
+        assert buf.get(2).tolist() == [[0., 1.], [2., 3.]]
+        # wraps around the end of the block
+        assert buf.put(np.arange(6., 12.).reshape(3, 2)) == 3
+        assert len(buf) == 4
+        assert buf.put(np.zeros((2, 2)), block=False) == 0
+        assert buf.get().tolist() == [[4., 5.], [6., 7.], [8., 9.], [10., 11.]]
+
+        # a full buffer blocks, until there is space
+        buf.put(np.ones((4, 2)))
+        t = threading.Thread(target=buf.put, args=(np.full((2, 2), 2.),))
+        t.start()
+        t.join(.05)
+        assert t.is_alive()
+        assert len(buf.get(1)) == 1
+        import time
+        deadline = time.time() + 1.
+        while len(buf) < 4:  # the first row fits now
+            assert time.time() < deadline
+            time.sleep(1e-3)
+        assert t.is_alive()
+        buf.clear()
+        t.join(1.)
+        assert not t.is_alive()
+        assert buf.get().tolist() == [[2., 2.]]
+
+        # unbounded
+        buf = PointBuffer(0)
+        assert buf.put(np.zeros((100, 3))) == 100
+        assert buf.get(50).shape == (50, 3) and len(buf) == 50
+
+    def test_point_buffer_epochs(self):
+        from panobbgo.core import PointBuffer, Heuristic
+        buf = PointBuffer(4)
+        buf.put(np.zeros((2, 2)))
+        assert buf.bump() == 1
+        buf.put(np.ones((1, 2)))
+        # stale rows are only discarded, when they are taken
+        assert len(buf) == 3 and buf.discarded == 0
+        assert buf.get(1).tolist() == [[1., 1.]]
+        assert buf.discarded == 2 and len(buf) == 0
+        assert buf.get(1).shape == (0, 2)
+
+        # rows of an older epoch are discarded right away
+        assert buf.put(np.ones((2, 2)), epoch=0) == 2
+        assert len(buf) == 0 and buf.discarded == 4
+
+        # a full buffer makes room by dropping the stale rows
+        buf.put(np.zeros((4, 2)))
+        buf.bump()
+        assert buf.put(np.full((3, 2), 2.), block=False) == 3
+        assert buf.discarded == 8
+        assert buf.get().tolist() == [[2., 2.]] * 3
+
+        h = Heuristic(self.strategy, cap=5)
+        epoch = h.epoch
+        h.emit(np.zeros(2))
+        assert h.bump_epoch() == epoch + 1
+        h.emit(np.ones(2), epoch=epoch)  # computed for the old state
+        h.emit(np.full(2, .5))
+        assert h.get_points().tolist() == [[.5, .5]]
+        assert h.discarded == 2
+
+    def test_heuristic_output(self):
+        from panobbgo.core import Heuristic
+        h = Heuristic(self.strategy, cap=5)
+        box = self.problem.box
+        h.emit(np.array([[0., 0.], [100., -100.]]))
+        h.emit([np.ones(2)])
+        h.emit(np.zeros(2))
+        h.emit([])
+        pts = h.get_points(3)
+        assert pts.shape == (3, 2)
+        assert np.allclose(pts[1], [box[0, 1], box[1, 0]])
+        points = h.get_point_list()
+        assert len(points) == 1 and points[0].who == 'Heuristic'
+        assert not h._stopped
+        h.emit(None)
+        assert h._stopped
+
+    def test_heuristic_produce(self):
+        from panobbgo.core import Heuristic, EventBus, StopHeuristic
+
+        class OnDemand(Heuristic):
+
+            def __init__(self, strategy):
+                Heuristic.__init__(self, strategy, cap=5)
+                self.requests = []
+
+            def produce(self, n):
+                self.requests.append(n)
+                if len(self.requests) == 3:
+                    raise StopHeuristic()
+                return np.zeros((n + 1, 2))  # one point too many
+
+        self.strategy.eventbus = EventBus(self.config)
+        assert not Heuristic(self.strategy)._on_demand
+        h = OnDemand(self.strategy)
+        assert h._on_demand and h.active
+        h.emit(np.ones((2, 2)))
+        # the emitted points first, then the missing ones on demand
+        pts = h.get_points(3)
+        assert pts.tolist() == [[1., 1.], [1., 1.], [0., 0.]]
+        assert h.requests == [1]
+        # the surplus point was stored
+        assert len(h._output) == 1
+        assert len(h.get_points()) == 1 and h.requests == [1]
+        assert len(h.get_point_list(4)) == 4 and h.requests == [1, 4]
+        # the surplus, the request for the missing point stops it
+        assert len(h.get_points(2)) == 1 and h.requests == [1, 4, 1]
+        assert h._stopped and not h.active
+        assert h.get_points(2).shape == (0, 2) and h.requests == [1, 4, 1]
+        stats = self.strategy.eventbus.stats()[('produce', 'OnDemand')]
+        assert stats.delivered == 2 and stats.handler.count == 3
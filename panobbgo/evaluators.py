@@ -0,0 +1,543 @@
+# -*- coding: utf8 -*-
+# Copyright 2012 -- 2013 Harald Schilly <harald.schilly@univie.ac.at>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+r"""
+Evaluators
+==========
+
+The :class:`~panobbgo.core.StrategyBase` hands the points over to an
+evaluator backend, which evaluates the :class:`~panobbgo_lib.lib.Problem`
+in chunks ("tasks") of several points.
+The backend is selected via the ``evaluator`` option in the config file
+or ``--evaluator`` on the command line:
+
+- ``ipython``: :class:`.IPythonEvaluator`, a running `IPython.parallel` cluster
+- ``processes``: :class:`.ProcessPoolEvaluator`, a local pool of processes
+- ``threads``: :class:`.ThreadPoolEvaluator`, a local pool of threads,
+  only useful for problems releasing the GIL
+- ``serial``: :class:`.SerialEvaluator`, evaluates in the main process (e.g. for testing)
+
+.. inheritance-diagram:: panobbgo.evaluators
+
+.. codeauthor:: Harald Schilly <harald.schilly@univie.ac.at>
+"""
+
+import numpy as np
+
+
+def evaluate_chunk(problem, X):
+    r"""
+    Evaluates the rows of the :math:`(n, \mathit{dim})` array ``X`` via
+    :meth:`~panobbgo_lib.lib.Problem.batch` and measures the time it took.
+    This runs on the workers.
+
+    :return: tuple of the array of function values, the array of
+             constraint violation vectors (or ``None``), the elapsed time
+             and the id of the worker (host, process and thread).
+    """
+    import os
+    import socket
+    import threading
+    from time import time
+    start = time()
+    fx, cv = problem.batch(X)
+    worker = '%s:%d:%d' % (socket.gethostname(), os.getpid(), threading.get_ident())
+    return fx, cv, time() - start, worker
+
+
+def chunk_results(points, fx, cv):
+    """
+    Builds the :class:`Results <panobbgo_lib.lib.Result>` for the ``points``
+    of a chunk from the compact arrays returned by :func:`.evaluate_chunk`.
+    """
+    from panobbgo_lib import Result
+    if cv is None:
+        return [Result(p, fx[i]) for i, p in enumerate(points)]
+    return [Result(p, fx[i], cv_vec=cv[i]) for i, p in enumerate(points)]
+
+
+def failed_results(points):
+    """
+    The :class:`Results <panobbgo_lib.lib.Result>` for the ``points`` of a failed chunk.
+    Their function value and its :attr:`~panobbgo_lib.lib.Result.error` are infinite.
+    """
+    from panobbgo_lib import Result
+    return [Result(p, np.inf, error=np.inf) for p in points]
+
+
+def chunks(points, chunksize):
+    """
+    Splits the list of ``points`` into chunks of ``chunksize``.
+
+    :return: generator of tuples of the list of points and
+             the array of their coordinates (one point per row).
+    """
+    for i in range(0, len(points), chunksize):
+        chunk = points[i:i + chunksize]
+        yield chunk, np.array([p.x for p in chunk], dtype=np.float64)
+
+
+class Evaluator:
+
+    """
+    "Abstract" parent class of all evaluator backends.
+
+    A task is a chunk of points, identified by a task id.
+    Each task evaluates its chunk at once via :func:`.evaluate_chunk`
+    and only sends back compact arrays, the results are built locally.
+
+    Backends report finished tasks via :meth:`._task_done`, which queues them
+    and wakes up the :meth:`main loop <panobbgo.core.StrategyBase.wakeup>`.
+    Finished tasks are collected via :meth:`.collect`.
+    If the evaluation of a task raises an exception, it is logged and
+    its points get :func:`failed results <.failed_results>`.
+    """
+
+    def __init__(self, strategy, problem):
+        from threading import Lock
+        from queue import Queue
+        self.strategy = strategy
+        self.config = strategy.config
+        self.problem = problem
+        self.logger = self.config.get_logger('EVAL')
+        self._tid = 0
+        self._lock = Lock()
+        self._outstanding = set()
+        self._submitted = {}  # task id -> submit time
+        self._finished = Queue()
+
+    def __len__(self):
+        """
+        Number of workers.
+        """
+        raise NotImplementedError()
+
+    def submit(self, points, chunksize=1):
+        """
+        Starts evaluating the list of ``points`` in chunks of ``chunksize``.
+
+        :return: list of task ids.
+        """
+        from time import time
+        tids = []
+        for chunk, X in chunks(points, chunksize):
+            tid = self._next_tid()
+            with self._lock:
+                self._outstanding.add(tid)
+                self._submitted[tid] = time()
+            self._start(tid, chunk, X)
+            tids.append(tid)
+        return tids
+
+    def _next_tid(self):
+        tid = self._tid
+        self._tid += 1
+        return tid
+
+    def _start(self, tid, chunk, X):
+        """
+        Starts the evaluation of one task, the backend has to call
+        :meth:`._task_done` when it is finished.
+        """
+        raise NotImplementedError()
+
+    def _task_done(self, tid, chunk, outcome):
+        """
+        Called by the backend (possibly from another thread), when the task ``tid``
+        has finished. ``outcome`` is unpacked via :meth:`._unpack` in :meth:`.collect`.
+        """
+        from time import time
+        with self._lock:
+            self._outstanding.discard(tid)
+            walltime = time() - self._submitted.pop(tid)
+        self._finished.put((tid, chunk, outcome, walltime))
+        self.strategy.wakeup()
+
+    def _unpack(self, outcome):
+        """
+        :return: the tuple ``(fx, cv, elapsed, worker)`` of the ``outcome`` of a task,
+                 ``None``, if the task was cancelled, or the exception,
+                 if it failed.
+        """
+        return outcome
+
+    def _unpack_all(self, outcomes):
+        """
+        Unpacks the ``outcomes`` of all tasks collected at once,
+        backends can overwrite this to fetch them in one go.
+        """
+        return [self._unpack(o) for o in outcomes]
+
+    @property
+    def outstanding(self):
+        """
+        Set of task ids, which are not finished yet.
+        """
+        with self._lock:
+            return set(self._outstanding)
+
+    def collect(self):
+        """
+        Removes all finished tasks.
+
+        :return: list of tuples ``(task id, list of results, elapsed time, wall time, worker)``,
+                 where the elapsed time is spent evaluating on the worker and
+                 the wall time passed between submitting and finishing the task.
+                 The worker is ``None`` for a failed task.
+        """
+        from queue import Empty
+        done = []
+        try:
+            while True:
+                done.append(self._finished.get(block=False))
+        except Empty:
+            pass
+        finished = []
+        outcomes = self._unpack_all([outcome for _, _, outcome, _ in done])
+        for (tid, chunk, _, walltime), outcome in zip(done, outcomes):
+            if isinstance(outcome, Exception):
+                self.logger.warning("task %d with %d points failed: %s" % (tid, len(chunk), outcome))
+                finished.append((tid, failed_results(chunk), walltime, walltime, None))
+            elif outcome is not None:
+                fx, cv, elapsed, worker = outcome
+                results = chunk_results(chunk, fx, cv)
+                finished.append((tid, results, elapsed, walltime, worker))
+        return finished
+
+    def shutdown(self):
+        """
+        Aborts all outstanding tasks.
+        """
+        pass
+
+    def __repr__(self):
+        return '%s[%d workers]' % (self.__class__.__name__, len(self))
+
+
+class SerialEvaluator(Evaluator):
+
+    """
+    Evaluates all points right away, inside the calling thread.
+    """
+
+    def __len__(self):
+        return 1
+
+    def _start(self, tid, chunk, X):
+        try:
+            outcome = evaluate_chunk(self.problem, X)
+        except Exception as ex:
+            outcome = ex
+        self._task_done(tid, chunk, outcome)
+
+
+class PoolEvaluator(Evaluator):
+
+    """
+    Evaluates the tasks in a :mod:`concurrent.futures` executor.
+    Subclasses create the actual pool in :meth:`._create_pool`.
+    """
+
+    def __init__(self, strategy, problem, workers=None):
+        """
+        :param int workers: number of workers, default is the number of CPUs.
+        """
+        Evaluator.__init__(self, strategy, problem)
+        if not workers:
+            import multiprocessing
+            workers = multiprocessing.cpu_count()
+        self.workers = workers
+        self._futures = {}  # task id -> future
+        self._pool = self._create_pool(workers)
+
+    def _create_pool(self, workers):
+        raise NotImplementedError()
+
+    def __len__(self):
+        return self.workers
+
+    def _start(self, tid, chunk, X):
+        future = self._pool.submit(evaluate_chunk, self.problem, X)
+        self._futures[tid] = future
+
+        def done(f):
+            self._futures.pop(tid, None)
+            self._task_done(tid, chunk, f)
+        future.add_done_callback(done)
+
+    def _unpack(self, future):
+        if future.cancelled():
+            return None
+        if future.exception() is not None:
+            return future.exception()
+        return future.result()
+
+    def shutdown(self):
+        for f in list(self._futures.values()):
+            f.cancel()
+        self._pool.shutdown(wait=False)
+
+
+class ThreadPoolEvaluator(PoolEvaluator):
+
+    """
+    A pool of threads. Only useful, if the problem releases the GIL
+    (e.g. calls into NumPy or external code).
+    """
+
+    def _create_pool(self, workers):
+        from concurrent.futures import ThreadPoolExecutor
+        return ThreadPoolExecutor(max_workers=workers)
+
+
+class ProcessPoolEvaluator(PoolEvaluator):
+
+    """
+    A pool of local processes. The problem is pickled along with each task.
+    """
+
+    def _create_pool(self, workers):
+        from concurrent.futures import ProcessPoolExecutor
+        return ProcessPoolExecutor(max_workers=workers)
+
+
+class IPythonEvaluator(Evaluator):
+
+    """
+    Evaluates on the engines of an `IPython.parallel` cluster,
+    using the configured IPython profile.
+    The problem is pushed once to all engines and referenced
+    by :attr:`~panobbgo.core.StrategyBase.PROBLEM_KEY` afterwards.
+
+    If the ``AsyncResult`` objects support done-callbacks (``ipyparallel``),
+    they report finished tasks right away. Otherwise, a monitor thread
+    waits for them every ``poll`` seconds, so that the main loop does not have to.
+
+    All tasks finished since the last :meth:`~.Evaluator.collect` are
+    retrieved with one request. The client and the hub keep all results
+    in memory, hence consumed results are purged from both after
+    every ``purge`` collected tasks.
+    """
+
+    def __init__(self, strategy, problem, nb_gens=0, poll=1e-3, purge=100):
+        Evaluator.__init__(self, strategy, problem)
+        from IPython.parallel import Client, Reference
+        from .core import StrategyBase
+        c = self._client = Client(profile=self.config.ipy_profile)
+        c.clear()  # clears remote engines
+        c.purge_results('all')  # all results are memorized in the hub
+
+        if len(c.ids) < nb_gens + 1:
+            raise Exception('I need at least %d clients.' % (nb_gens + 1))
+        dv_evaluators = c[nb_gens:]
+        dv_evaluators[StrategyBase.PROBLEM_KEY] = problem
+        self.generators = c.load_balanced_view(c.ids[:nb_gens])
+        self._view = c.load_balanced_view(c.ids[nb_gens:])
+        self.direct_view = c.ids[:]
+        self._prob_ref = Reference(StrategyBase.PROBLEM_KEY)
+        self._pending = {}  # msg id -> (task id, points, async result)
+        self._stopped = False
+        self.poll = poll
+        self._monitor = None
+        self.purge = purge
+        self._consumed = []  # msg ids of collected, not yet purged tasks
+
+    def __len__(self):
+        return len(self._view)
+
+    def _start(self, tid, chunk, X):
+        ar = self._view.apply_async(evaluate_chunk, self._prob_ref, X)
+        msg_id = ar.msg_ids[0]
+        if hasattr(ar, 'add_done_callback'):
+            ar.add_done_callback(lambda ar: self._task_done(tid, chunk, msg_id))
+            return
+        with self._lock:
+            self._pending[msg_id] = (tid, chunk)
+        if self._monitor is None:
+            from threading import Thread
+            self._monitor = Thread(target=self._run_monitor, name='%s-monitor' % self)
+            self._monitor.daemon = True
+            self._monitor.start()
+
+    def _run_monitor(self):
+        import time
+        while not self._stopped:
+            self._client.spin()
+            outstanding = self._view.outstanding
+            with self._lock:
+                done = [k for k in self._pending if k not in outstanding]
+                done = [(k, self._pending.pop(k)) for k in done]
+            for msg_id, (tid, chunk) in done:
+                self._task_done(tid, chunk, msg_id)
+            time.sleep(self.poll)
+
+    def _unpack_all(self, msg_ids):
+        if len(msg_ids) == 0:
+            return []
+        try:
+            outcomes = self._client.get_result(msg_ids, block=True).get()
+        except Exception:
+            # at least one failed, hence one by one
+            outcomes = []
+            for msg_id in msg_ids:
+                try:
+                    outcomes.append(self._client.get_result(msg_id, block=True).get())
+                except Exception as ex:
+                    outcomes.append(ex)
+        self._consumed.extend(msg_ids)
+        if len(self._consumed) >= self.purge:
+            self._purge()
+        return outcomes
+
+    def _purge(self):
+        """
+        Removes the consumed results from the hub and the local caches of the client.
+        """
+        consumed, self._consumed = self._consumed, []
+        try:
+            self._client.purge_results(jobs=consumed)
+        except Exception as ex:
+            self.logger.warning("purging results failed: %s" % ex)
+        c = self._client
+        for msg_id in consumed:
+            c.results.pop(msg_id, None)
+            c.metadata.pop(msg_id, None)
+        consumed = set(consumed)
+        c.history = [m for m in c.history if m not in consumed]
+        self._view.history = [m for m in self._view.history if m not in consumed]
+
+    def shutdown(self):
+        self._stopped = True
+        for msg_id in self._view.outstanding:
+            try:
+                self._view.get_result(msg_id).abort()
+            except:
+                pass
+
+
+class ChunkSizeController:
+
+    r"""
+    Chooses the number of points per task (the chunk size) and
+    the number of tasks in flight per worker.
+
+    Each task costs some dispatch overhead :math:`o` (serialization, scheduling,
+    communication), i.e. the wall time of a task minus its evaluation time,
+    while evaluating a point takes :math:`t` seconds.
+    The fraction of the overhead in a task of :math:`c` points is
+    :math:`o / (o + c \, t)`, hence it is below ``overhead`` for
+
+    .. math::
+
+      c \geq \frac{o \, (1 - \mathit{overhead})}{\mathit{overhead} \cdot t}
+
+    On the other hand, large chunks delay new results (and new best points)
+    for the heuristics. Therefore, a task should not take longer than ``latency``
+    seconds and the chunks are at most the remaining evaluations spread over all slots.
+
+    Both are read from the :class:`~panobbgo.stats.TaskStatistics`:
+    :math:`t` is the moving average of the evaluation time per point on each worker
+    (or of all tasks, as long as no worker is known).
+    Since the queue delay of a task also contains the time it waited behind
+    others, :math:`o` is its lower quartile.
+
+    This gives a chunk size per worker, see :attr:`.chunksizes`.
+    The backends hand out the tasks from one queue to the next idle worker,
+    i.e. a chunk can't be addressed to a specific worker. Hence, the smallest one is used:
+    the tasks of the slowest worker stay below ``latency``
+    and faster workers simply take more tasks.
+    """
+
+    def __init__(self, strategy, stats, overhead=.1, latency=1., depth=2):
+        """
+        Args:
+
+        - ``stats``: the :class:`~panobbgo.stats.TaskStatistics` of the strategy.
+        - ``overhead``: target fraction of the dispatch overhead per task.
+        - ``latency``: maximum evaluation time of a single task in seconds.
+        - ``depth``: number of tasks in flight per worker.
+        """
+        self.logger = strategy.config.get_logger('STATS')
+        self.max_chunksize = max(1, int(strategy.config.max_eval / 50.))
+        self.stats = stats
+        self.target = overhead
+        self.latency = latency
+        self.depth = depth
+        self.chunksize = 1
+        #: the chunk size for each worker, according to its evaluation time per point
+        self.chunksizes = {}
+
+    @property
+    def time_per_point(self):
+        return self.stats.point_time.ewma
+
+    def _chunksize(self, t, o, remaining, workers):
+        t = max(t, 1e-9)
+        c = o * (1. - self.target) / (self.target * t)
+        c = min(c, self.latency / t, self.max_chunksize,
+                remaining / float(max(1, workers * self.depth)))
+        return max(1, int(np.ceil(c)))
+
+    @property
+    def overhead(self):
+        return self.stats.queue_delay.quantile(.25)
+
+    def decide(self, remaining, workers):
+        """
+        Computes the :attr:`.chunksizes` of the workers, given the ``remaining``
+        number of evaluations and the number of ``workers``.
+        Changes of the smallest one are logged in the ``STATS`` logger.
+
+        :return: the chunk size
+        """
+        o = self.overhead
+        times = dict((w, self.stats.worker(w).ewma) for w in self.stats.workers)
+        if len(times) == 0:
+            times = {None: self.time_per_point}
+        if np.isnan(o) or all(np.isnan(t) for t in times.values()):
+            return self.chunksize
+        self.chunksizes = dict((w, self._chunksize(t, o, remaining, workers))
+                               for w, t in times.items() if not np.isnan(t))
+        slowest = min(self.chunksizes, key=self.chunksizes.get)
+        c, t = self.chunksizes[slowest], times[slowest]
+        if c != self.chunksize:
+            self.logger.info("chunksize %d -> %d | %d..%d on %d workers | "
+                             "%.2e [s/pnt] eval on %s, %.2e [s/task] overhead, %.1f%% overhead" %
+                             (self.chunksize, c, c, max(self.chunksizes.values()),
+                              len(self.chunksizes), t, slowest, o, 100. * o / (o + c * t)))
+            self.chunksize = c
+        return c
+
+
+#: maps the config name to the evaluator backend
+BACKENDS = {
+    'ipython': IPythonEvaluator,
+    'processes': ProcessPoolEvaluator,
+    'threads': ThreadPoolEvaluator,
+    'serial': SerialEvaluator
+}
+
+
+def create_evaluator(strategy, problem):
+    """
+    Creates the evaluator backend, as configured in ``config.evaluator``.
+    """
+    name = strategy.config.evaluator
+    if name not in BACKENDS:
+        raise ValueError("unknown evaluator '%s', choose one of %s" %
+                         (name, ', '.join(sorted(BACKENDS.keys()))))
+    if issubclass(BACKENDS[name], PoolEvaluator):
+        return BACKENDS[name](strategy, problem, workers=strategy.config.workers)
+    return BACKENDS[name](strategy, problem)
@@ -0,0 +1,173 @@
+# -*- coding: utf8 -*-
+# Copyright 2012 Harald Schilly <harald.schilly@univie.ac.at>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from __future__ import unicode_literals
+
+import numpy as np
+
+from panobbgo.utils import PanobbgoTestCase
+from panobbgo_lib.classic import Rosenbrock
+from panobbgo_lib.lib import Point
+
+
+class Failing(Rosenbrock):
+
+    """
+    Raises for all chunks, which contain a point with a negative first coordinate.
+    """
+
+    def eval_batch(self, X):
+        if np.any(X[:, 0] < 0):
+            raise ValueError('negative')
+        return Rosenbrock.eval_batch(self, X)
+
+
+class EvaluatorsTests(PanobbgoTestCase):
+
+    def evaluate(self, evaluator, nb=10, chunksize=3):
+        from threading import Event
+        wakeup = Event()
+        self.strategy.wakeup.side_effect = lambda: wakeup.set()
+        points = [Point(np.random.rand(2), 'test') for _ in range(nb)]
+        tids = evaluator.submit(points, chunksize=chunksize)
+        assert len(tids) == 4
+        finished = []
+        while True:
+            wakeup.clear()
+            finished.extend(evaluator.collect())
+            if len(finished) == len(tids):
+                break
+            # finished tasks wake up the strategy
+            assert wakeup.wait(10.)
+        assert sorted(tid for tid, _, _, _, _ in finished) == sorted(tids)
+        assert len(evaluator.outstanding) == 0
+        results = sum([r for _, r, _, _, _ in finished], [])
+        assert all(0 <= elapsed <= walltime for _, _, elapsed, walltime, _ in finished)
+        assert all(worker is not None for _, _, _, _, worker in finished)
+        xx = sorted(tuple(r.x) for r in results)
+        assert xx == sorted(tuple(p.x) for p in points)
+        for r in results:
+            assert r.fx == self.problem(r.point).fx
+        evaluator.shutdown()
+
+    def test_serial(self):
+        from panobbgo.evaluators import SerialEvaluator
+        ev = SerialEvaluator(self.strategy, self.problem)
+        assert len(ev) == 1
+        self.evaluate(ev)
+
+    def test_threads(self):
+        from panobbgo.evaluators import ThreadPoolEvaluator
+        self.evaluate(ThreadPoolEvaluator(self.strategy, self.problem, workers=2))
+
+    def test_processes(self):
+        from panobbgo.evaluators import ProcessPoolEvaluator
+        ev = ProcessPoolEvaluator(self.strategy, self.problem, workers=2)
+        assert len(ev) == 2
+        self.evaluate(ev)
+
+    def evaluate_failing(self, evaluator):
+        from threading import Event
+        wakeup = Event()
+        self.strategy.wakeup.side_effect = lambda: wakeup.set()
+        points = [Point(np.array([x, 0.]), 'test') for x in [.1, .2, -.3, .4]]
+        tids = evaluator.submit(points, chunksize=2)
+        finished = []
+        while len(finished) < len(tids):
+            wakeup.clear()
+            finished.extend(evaluator.collect())
+            assert len(finished) == len(tids) or wakeup.wait(10.)
+        results = dict((tuple(r.x), r) for _, rr, _, _, _ in finished for r in rr)
+        assert len(results) == 4
+        # only the chunk with the negative point failed
+        for x in [.1, .2]:
+            assert np.isfinite(results[(x, 0.)].fx)
+        for x in [-.3, .4]:
+            assert results[(x, 0.)].fx == np.inf and results[(x, 0.)].error == np.inf
+        evaluator.shutdown()
+
+    def test_failing_tasks(self):
+        from panobbgo.evaluators import SerialEvaluator, ThreadPoolEvaluator, ProcessPoolEvaluator
+        problem = Failing(2)
+        self.evaluate_failing(SerialEvaluator(self.strategy, problem))
+        self.evaluate_failing(ThreadPoolEvaluator(self.strategy, problem, workers=2))
+        self.evaluate_failing(ProcessPoolEvaluator(self.strategy, problem, workers=2))
+
+    def test_chunksize_controller(self):
+        from panobbgo.evaluators import ChunkSizeController
+        from panobbgo.stats import TaskStatistics
+        self.config.max_eval = 10000
+        stats = TaskStatistics()
+        csc = ChunkSizeController(self.strategy, stats, overhead=.1, latency=1., depth=2)
+        assert csc.decide(1000, 4) == 1  # nothing measured yet
+        # 1 ms per point, 10 ms overhead per task -> about 90 points per task
+        points = [Point(np.zeros(2), 'test')] * 10
+        for _ in range(5):
+            stats.add_task([self.problem(p) for p in points], 1e-2, 2e-2)
+        assert np.isclose(csc.time_per_point, 1e-3)
+        assert np.isclose(csc.overhead, 1e-2, rtol=.05)
+        assert 85 <= csc.decide(10000, 4) <= 95
+        # but not more than the remaining evaluations for all slots
+        assert csc.decide(80, 4) == 10
+        # a task should not take longer than 50 ms
+        csc.latency = .05
+        assert csc.decide(10000, 4) == 50
+
+        # per worker: the tasks of the slower one (10 ms per point) are smaller
+        for _ in range(5):
+            stats.add_task([self.problem(p) for p in points], 1e-2, 2e-2, worker='fast')
+            stats.add_task([self.problem(p) for p in points], 1e-1, 2e-1, worker='slow')
+        assert csc.decide(10000, 4) == 5
+        assert csc.chunksizes == {'fast': 50, 'slow': 5}
+
+    def test_ipython_bulk_retrieval(self):
+        import mock
+        from panobbgo.evaluators import IPythonEvaluator, Evaluator
+        # the cluster itself is mocked
+        ev = IPythonEvaluator.__new__(IPythonEvaluator)
+        Evaluator.__init__(ev, self.strategy, self.problem)
+        ev._client = c = mock.MagicMock()
+        ev._view = mock.MagicMock()
+        ev.purge, ev._consumed = 3, []
+        c.results, c.metadata = {'a': 1, 'b': 2, 'c': 3}, {'a': 1}
+        c.history = ev._view.history = ['a', 'b', 'c']
+        c.get_result.return_value.get.return_value = ['A', 'B']
+
+        assert ev._unpack_all(['a', 'b']) == ['A', 'B']
+        c.get_result.assert_called_once_with(['a', 'b'], block=True)
+        assert not c.purge_results.called
+        ev._unpack_all(['c'])
+        c.purge_results.assert_called_once_with(jobs=['a', 'b', 'c'])
+        assert c.results == {} and c.metadata == {}
+        assert c.history == [] and ev._view.history == []
+        assert ev._consumed == []
+
+        # a failed task only fails itself
+        def get_result(msg_ids, block):
+            ar = mock.MagicMock()
+            if msg_ids == 'e' or 'e' in msg_ids:
+                ar.get.side_effect = ValueError('remote')
+            else:
+                ar.get.return_value = msg_ids.upper()
+            return ar
+        c.get_result.side_effect = get_result
+        outcomes = ev._unpack_all(['d', 'e'])
+        assert outcomes[0] == 'D' and isinstance(outcomes[1], ValueError)
+
+    def test_create_evaluator(self):
+        from panobbgo.evaluators import create_evaluator, SerialEvaluator
+        self.config.evaluator = 'serial'
+        assert isinstance(create_evaluator(self.strategy, self.problem), SerialEvaluator)
+        self.config.evaluator = 'unknown'
+        self.assertRaises(ValueError, create_evaluator, self.strategy, self.problem)
@@ -45,28 +45,17 @@ class Extremal(Heuristic):
         center = low + (high - low) / 2.
         self.vals = np.row_stack((low, zero, center, high))
 
-    def on_start(self):
+    def produce(self, n):
         import numpy as np
-        while True:
-            ret = np.empty(self.problem.dim)
-            for i in range(self.problem.dim):
-                r = np.random.rand()
-                for idx, val in enumerate(self.probabilities):
-                    if val > r:
-                        radius = self.problem.ranges[i] * self.diameter
-                        # jitter = radius * (np.random.rand() - .5)
-                        jitter = np.random.normal(0, radius)
-                        if idx == 0:
-                            # minimum border
-                            ret[i] = self.vals[idx, i] + abs(jitter)
-                        elif idx == len(self.probabilities) - 1:
-                            # maximum border
-                            ret[i] = self.vals[idx, i] - abs(jitter)
-                        else:
-                            # around center or zero
-                            ret[i] = self.vals[idx, i] + jitter
-                        break  # since we found the idx, break!
-            self.emit(ret)
-            # stop early, if run by unittests
-            if self.strategy.config.testing_mode:
-                return
+        dim = self.problem.dim
+        # for each coordinate, the index of the value it is sampled around
+        idx = np.searchsorted(self.probabilities, np.random.rand(n, dim), side='right')
+        idx = np.minimum(idx, len(self.probabilities) - 1)
+        radius = self.problem.ranges * self.diameter
+        # jitter = radius * (np.random.rand(n, dim) - .5)
+        jitter = np.random.normal(0, 1, (n, dim)) * radius
+        # inwards at the minimum and maximum border, around center or zero
+        jitter[idx == 0] = np.abs(jitter[idx == 0])
+        last = idx == len(self.probabilities) - 1
+        jitter[last] = -np.abs(jitter[last])
+        return self.vals[idx, np.arange(dim)] + jitter
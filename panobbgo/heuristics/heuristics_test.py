@@ -26,15 +26,60 @@ class HeuristicTests(PanobbgoTestCase):
         avg = WeightedAverage(self.strategy)
         assert avg is not None
 
+    def test_weighted_average_nearest(self):
+        from . import WeightedAverage
+        from panobbgo.analyzers import SpatialIndex
+        from panobbgo.pending import PendingPoints
+        idx = SpatialIndex(self.strategy, min_log=4)
+        idx.__start__()
+        results = self.random_results(2, 50)
+        idx.on_new_results(results)
+        self.strategy.analyzer.return_value = idx
+        self.strategy.in_flight = PendingPoints(2, self.problem.ranges)
+        avg = WeightedAverage(self.strategy, spacing=0.)
+        avg.__start__()
+        assert avg.neighbors == 6
+        best = min(results, key=lambda r: r.fx)
+        avg.on_new_best(best)
+        self.strategy.analyzer.assert_called_with('spatial_index')
+        pts = avg.get_points()
+        assert len(pts) > 0
+        # the first point is the weighted average of the six nearest results,
+        # unless it is too close to the best one
+        near = idx.nearest(best.x, k=6)[1]
+        yy = np.log1p(np.array([r.fx for r in near]) - best.fx)
+        mean = np.average([r.x for r in near], axis=0, weights=-yy + 1.1 * yy.max())
+        assert np.allclose(pts[0], mean) or np.linalg.norm(best.x - mean) <= .01
+
     def test_random(self):
         from . import Random
         rnd = Random(self.strategy)
         assert rnd is not None
+        assert rnd.produce(3) is None  # no split yet
+
+        class Leaf:
+            box = np.array([[0., 1.], [10., 12.]])
+            ranges = box[:, 1] - box[:, 0]
+
+        rnd.leaf = Leaf()
+        pts = rnd.produce(20)
+        assert pts.shape == (20, 2)
+        assert np.all(Leaf.box[:, 0] <= pts) and np.all(pts <= Leaf.box[:, 1])
 
     def test_latin_hypercube(self):
         from . import LatinHypercube
         lhyp = LatinHypercube(self.strategy, 3)
         assert lhyp is not None
+        lhyp.__start__()
+        # one hypercube after another, also across requests
+        pts = np.concatenate([lhyp.produce(2), lhyp.produce(4)])
+        assert pts.shape == (6, 2)
+        box = self.problem.box
+        assert np.all(box[:, 0] <= pts) and np.all(pts <= box[:, 1])
+        cells = (pts - self.problem.box[:, 0]) // lhyp.lengths
+        for cube in [cells[:3], cells[3:]]:
+            for i in range(2):
+                assert sorted(cube[:, i]) == [0, 1, 2]
 
     def test_nelder_mead(self):
         from . import NelderMead
@@ -48,6 +93,97 @@ class HeuristicTests(PanobbgoTestCase):
         M = np.array([_.x for _ in base])
         assert np.linalg.matrix_rank(M) == dim
 
+        # on demand, for the latest best box or its parents
+        assert nm.produce(4) is None
+
+        class Box:
+
+            def __init__(self, results, parent=None):
+                self.results = results
+                self.parent = parent
+
+        nm.on_new_best_box(Box(self.random_results(2, 1), Box(self.random_results(2, 5))))
+        # the base is cached, produce only samples from it
+        import mock
+        with mock.patch.object(nm, 'gram_schmidt') as gs:
+            assert nm.produce(4).shape == (4, 2)
+            assert not gs.called
+        nm.on_new_best_box(Box(self.random_results(2, 1)))
+        assert nm.produce(4) is None
+
+    def test_quadratic_wls(self):
+        from . import QuadraticWlsModel
+        from panobbgo_lib.lib import Result, Point
+        wls = QuadraticWlsModel(self.strategy)
+        results = []
+        for x in np.random.uniform(-1, 1, (20, 2)):
+            results.append(Result(Point(x, 'test'), (x[0] - .3) ** 2 + 2 * (x[1] + .2) ** 2))
+        bounds = [(-2., 2.), (-2., 2.)]
+        sol = wls.submit(results, bounds, results[0].x).result(30)
+        assert np.allclose(sol, [.3, -.2], atol=1e-4)
+        wls.__stop__()
+
+    def test_lbfgsb(self):
+        import threading
+        from . import LBFGSB
+        from panobbgo_lib.lib import Point
+        lbfgsb = LBFGSB(self.strategy)
+        lbfgsb.__start__()
+        t = threading.Thread(target=lbfgsb.on_start)
+        t.daemon = True
+        t.start()
+        rounds = 0
+        while t.is_alive() and rounds < 500:
+            pts = lbfgsb.get_points()
+            if len(pts) == 0:
+                t.join(1e-3)
+                continue
+            # the whole stencil at once, one round-trip per gradient
+            assert pts.shape == (3, 2)
+            rounds += 1
+            # in any order and together with other results
+            results = [self.problem(Point(x, lbfgsb.name)) for x in pts[::-1]]
+            results.insert(1, self.problem(Point(pts[0], 'other')))
+            lbfgsb.on_new_results(results)
+        t.join(10)
+        assert not t.is_alive()
+        x, fx, info = lbfgsb.solution
+        assert np.allclose(x, [1., 1.], atol=1e-3)
+        assert info['funcalls'] == rounds
+
+    def test_lbfgsb_lost_points(self):
+        import threading
+        import time
+        from . import LBFGSB
+        from panobbgo_lib.lib import Point
+        lbfgsb = LBFGSB(self.strategy, timeout=.05)
+        lbfgsb.__start__()
+        t = threading.Thread(target=lbfgsb.on_start)
+        t.daemon = True
+        t.start()
+
+        def wait_points():
+            for _ in range(1000):
+                pts = lbfgsb.get_points()
+                if len(pts) > 0:
+                    return pts
+                time.sleep(1e-3)
+
+        stencil = wait_points()
+        assert stencil.shape == (3, 2)
+        # the stencil is lost, hence emitted again after the timeout
+        again = wait_points()
+        assert sorted(map(tuple, again)) == sorted(map(tuple, stencil))
+        # only the missing point is emitted again
+        lbfgsb.on_new_results([self.problem(Point(x, lbfgsb.name)) for x in again[:2]])
+        missing = wait_points()
+        assert missing.tolist() == again[2:].tolist()
+        # stopping ends the waiting
+        lbfgsb.__stop__()
+        t.join(1)
+        assert not t.is_alive()
+        assert lbfgsb.solution is None
+
     def test_center(self):
         from . import Center
         cntr = Center(self.strategy)
@@ -70,11 +206,14 @@ class HeuristicTests(PanobbgoTestCase):
         assert np.allclose(extr.vals[2], self.problem.center)
         assert np.allclose(extr.vals[3], box[:, 1])
 
-        # simulate on_start, produces one point in testing mode
-        extr.on_start()
-        from Queue import Queue
-        assert isinstance(extr._output, Queue)
-        p = extr._output.get()
+        # points on demand, inside the box and near the borders
+        pts = extr.get_points(200)
+        assert pts.shape == (200, 2)
+        assert np.all(box[:, 0] <= pts) and np.all(pts <= box[:, 1])
+        near = np.abs(pts - extr.vals[:, None, :]) <= 5 * self.problem.ranges * extr.diameter
+        assert np.all(near.any(axis=0))
+        assert len(extr.get_points(0)) == 0
+        p = extr.get_point_list(1)[0]
         from panobbgo_lib import Point
         assert isinstance(p, Point)
         assert p in self.problem.box
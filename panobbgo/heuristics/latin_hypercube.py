@@ -46,20 +46,37 @@ class LatinHypercube(Heuristic):
         if not isinstance(div, int):
             raise Exception("LH: div needs to be an integer")
         self.div = div
+        self._cube = None  # the remaining points of the current hypercube
 
     def __start__(self):
         # length of each box'es dimension
         self.lengths = self.problem.ranges / float(self.div)
 
-    def on_start(self):
+    def hypercube(self):
+        """
+        A new hypercube, one point per row.
+        """
         import numpy as np
         div = self.div
         dim = self.problem.dim
-        while True:
-            pts = np.repeat(
-                np.arange(div, dtype=np.float64), dim).reshape(div, dim)
-            pts += np.random.rand(div, dim)  # add [0,1) jitter
-            pts *= self.lengths             # scale with length, already divided by div
-            pts += self.problem.box[:, 0]    # shift with min
-            [np.random.shuffle(pts[:, i]) for i in range(dim)]
-            self.emit([p for p in pts])  # needs to be a list of np.ndarrays
+        pts = np.repeat(
+            np.arange(div, dtype=np.float64), dim).reshape(div, dim)
+        pts += np.random.rand(div, dim)  # add [0,1) jitter
+        pts *= self.lengths             # scale with length, already divided by div
+        pts += self.problem.box[:, 0]    # shift with min
+        [np.random.shuffle(pts[:, i]) for i in range(dim)]
+        return pts
+
+    def produce(self, n):
+        """
+        Takes the points of one hypercube after another.
+        """
+        import numpy as np
+        parts = []
+        while n > 0:
+            if self._cube is None or len(self._cube) == 0:
+                self._cube = self.hypercube()
+            parts.append(self._cube[:n])
+            self._cube = self._cube[n:]
+            n -= len(parts[-1])
+        return np.concatenate(parts)
@@ -22,45 +22,129 @@ class LBFGSB(Heuristic):
 
     """
     This uses :func:`scipy.optimize.fmin_l_bfgs_b` in a subprocess.
+
+    The gradients are finite differences, computed by the heuristic itself:
+    for each point the optimizer asks for, it emits the whole stencil
+    (the point and one step along each axis) at once and gathers their results
+    in :meth:`.on_new_results`. Hence, one gradient takes one round-trip
+    of parallel evaluations, instead of ``dim + 1`` sequential ones.
+
+    Args:
+
+    - ``epsilon``: step size of the finite differences, relative to the ranges of the box.
+    - ``timeout``: seconds to wait for the results of a stencil,
+      before its missing points are emitted again.
     """
 
-    def __init__(self, strategy):
-        Heuristic.__init__(self, strategy, cap=1)
+    def __init__(self, strategy, epsilon=1e-8, timeout=10.):
+        Heuristic.__init__(self, strategy, cap=strategy.problem.dim + 1)
         self.logger = self.config.get_logger("LBFGS")
+        self.epsilon = epsilon
+        self.timeout = timeout
+        import threading
+        self._lock = threading.Lock()
+        self._stencil = {}  # coordinates of a stencil point -> its index
+        self._fx = None  # function values of the stencil
+        self._missing = 0
+        self._complete = threading.Event()
+        self.solution = None
 
     def __start__(self):
         from multiprocessing import Process, Pipe
+        import numpy as np
+        box = self.problem.box
         self.p1, self.p2 = Pipe()
-        self.out1, self.out2 = Pipe(False)
-        self.lbfgsb = Process(target=self.worker, args=(self.p2, self.out2,
-                                                        self.problem.dim), name='%s-LBFGS' % self.name)
+        self.lbfgsb = Process(target=self.worker,
+                              args=(self.p2, np.zeros(self.problem.dim),
+                                    list(zip(box[:, 0], box[:, 1]))),
+                              name='%s-LBFGS' % self.name)
         self.lbfgsb.daemon = True
         self.lbfgsb.start()
 
     @staticmethod
-    def worker(pipe, output, dims):
+    def worker(pipe, x0, bounds):
         from scipy.optimize import fmin_l_bfgs_b
-        import numpy as np
 
         def f(x):
             pipe.send(x)
-            fx = pipe.recv()
-            return fx
+            fx, grad = pipe.recv()
+            return fx, grad
+
+        solution = fmin_l_bfgs_b(f, x0, bounds=bounds)
+        pipe.send(('solution', solution))
 
-        solution = fmin_l_bfgs_b(f, np.zeros(dims), approx_grad=True)
-        print(solution)
-        output.send(solution)
+    def stencil(self, x):
+        """
+        The points for the forward differences at ``x``, one per row, and the steps.
+        A step is backwards, if the forward one would leave the box.
+        """
+        import numpy as np
+        steps = self.epsilon * self.problem.ranges
+        steps = np.where(x + steps <= self.problem.box[:, 1], steps, -steps)
+        points = np.tile(x, (len(x) + 1, 1))
+        points[1:] += np.diag(steps)
+        return self.problem.project(points), steps
 
     def on_start(self):
-        while True:
-            if self.out1.poll(0):
-                output = self.out1.recv()
-                self.logger.info(output)
+        import numpy as np
+        while not self._stopped:
+            if not self.p1.poll(self.timeout):
+                continue
             x = self.p1.recv()
-            self.logger.info("x: %s" % x)
-            self.emit(x)
+            if isinstance(x, tuple):
+                self.solution = x[1]
+                self.logger.info("solution: %s" % (self.solution,))
+                return
+            self.logger.debug("x: %s" % x)
+            points, steps = self.stencil(x)
+            with self._lock:
+                self._stencil = dict((p.tobytes(), i) for i, p in enumerate(points))
+                self._fx = np.empty(len(points))
+                self._missing = len(points)
+                self._complete.clear()
+            self.emit(points)
+            if not self._wait():
+                return
+            fx = self._fx
+            self.p1.send((fx[0], (fx[1:] - fx[0]) / steps))
+
+    def _wait(self):
+        """
+        Waits until all results of the stencil have arrived. Points might get lost,
+        e.g. when the output buffer discards them. Hence, the missing ones
+        are emitted again after each ``timeout``.
+
+        :return: ``False``, if the heuristic has been stopped meanwhile.
+        """
+        import numpy as np
+        while True:
+            complete = self._complete.wait(self.timeout)
+            if self._stopped:
+                return False
+            if complete:
+                return True
+            with self._lock:
+                missing = list(self._stencil.keys())
+            if len(missing) > 0:
+                self.logger.warning("%d stencil points missing after %.1f [s], emitting them again" %
+                                    (len(missing), self.timeout))
+                self.emit(np.array([np.frombuffer(b, dtype=np.float64) for b in missing]))
+
+    def __stop__(self):
+        self._stopped = True
+        self._complete.set()
+        Heuristic.__stop__(self)
+        if self.lbfgsb.is_alive():
+            self.lbfgsb.terminate()
 
     def on_new_results(self, results):
-        for result in results:
-            if result.who == self.name:
-                self.p1.send(result.fx)
+        with self._lock:
+            for result in results:
+                if result.who != self.name:
+                    continue
+                idx = self._stencil.pop(result.x.tobytes(), None)
+                if idx is not None:
+                    self._fx[idx] = result.fx
+                    self._missing -= 1
+            if self._missing == 0 and self._fx is not None:
+                self._complete.set()
@@ -15,7 +15,7 @@
 from panobbgo.analyzers.best import Best
 
 
-from panobbgo.core import Heuristic
+from panobbgo.core import Heuristic, delivery
 
 
 class Nearby(Heuristic):
@@ -33,37 +33,41 @@ class Nearby(Heuristic):
        * ``all``: desturb all axes
 
     - ``new``: number of new points to generate (default: 1)
+    - ``oversample``: it samples this many times more candidates and prefers those,
+      which are at least half the radius away from the
+      :mod:`points in flight <panobbgo.pending>` (default: 4)
     """
 
-    def __init__(self, strategy, cap=3, radius=1. / 100, new=1, axes='one'):
+    def __init__(self, strategy, cap=3, radius=1. / 100, new=1, axes='one', oversample=4):
         Heuristic.__init__(
             self, strategy,
             cap=cap, name="Nearby %.3f/%s" % (radius, axes))
         self.radius = radius
         self.new = new
         self.axes = axes
+        self.oversample = oversample
         self._depends_on = [Best]
 
+    @delivery('latest')
     def on_new_best(self, best):
         import numpy as np
-        ret = []
         x = best.x
         if x is None:
             return
-        # generate self.new many new points near best x
-        for _ in range(self.new):
-            new_x = x.copy()
-            if self.axes == 'all':
-                dx = (2.0 * np.random.rand(
-                    self.problem.dim) - 1.0) * self.radius
-                dx *= self.problem.ranges
-                new_x += dx
-            elif self.axes == 'one':
-                idx = np.random.randint(self.problem.dim)
-                dx = (2.0 * np.random.rand() - 1.0) * self.radius
-                dx *= self.problem.ranges[idx]
-                new_x[idx] += dx
-            else:
-                raise Exception("axis parameter not 'one' or 'all'")
-            ret.append(new_x)
-        self.emit(ret)
+        # generate candidates near best x
+        dim = self.problem.dim
+        n = self.new * max(1, self.oversample)
+        ret = np.tile(x, (n, 1))
+        if self.axes == 'all':
+            ret += (2.0 * np.random.rand(n, dim) - 1.0) * self.radius * self.problem.ranges
+        elif self.axes == 'one':
+            idx = np.random.randint(dim, size=n)
+            dx = (2.0 * np.random.rand(n) - 1.0) * self.radius
+            ret[np.arange(n), idx] += dx * self.problem.ranges[idx]
+        else:
+            raise Exception("axis parameter not 'one' or 'all'")
+        # the new ones first, which are not close to a pending evaluation
+        ret = self.problem.project(ret)
+        dists = self.strategy.in_flight.distances(ret)
+        order = np.argsort(-np.minimum(dists, self.radius / 2.), kind='mergesort')
+        self.emit(ret[order[:self.new]])
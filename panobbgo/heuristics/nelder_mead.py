@@ -41,8 +41,8 @@ class NelderMead(Heuristic):
     def __init__(self, strategy):
         Heuristic.__init__(self, strategy, name="Nelder Mead")
         self.logger = self.config.get_logger('H:NM')
-        from threading import Event
-        self.got_bb = Event()
+        self.best_box = None
+        self._base = None  # the base for the best box
 
     def gram_schmidt(self, dim, results, tol=1e-4):
         """
@@ -109,53 +109,33 @@ class NelderMead(Heuristic):
         factor = np.random.rayleigh(scale=scale) - offset
         return worst.x + factor * (centroid - worst.x)
 
-    def on_start(self):
+    def produce(self, n):
         """
         Algorithm Outline:
 
-        #. Wait until a first or new best box has been found.
+        #. The base of the latest best box is computed in :meth:`.on_new_best_box`.
 
-        #. Clear the ``got_bb`` flag, later on we use this to be notified
-           about new best boxes via :meth:`.on_new_best_box`.
-
-        #. ``bb`` is the currently used best box, it might be ``None`` if
-           we have to look up the parents when searching for more result points.
-
-        #. Inside the outer while, we try to find a suiteable base via :meth:`.gram_schmidt`.
-
-        #. If we got such a base, we generate new search points via :meth:`.nelder_mead`
-           until the queue is full (which blocks) or there is a new best box (breaks inner loop).
-
-        #. The ``break`` exits the outer while and we start fresh with the new best box.
+        #. If there is such a base, we generate ``n`` new search points via
+           :meth:`.nelder_mead`. Otherwise, there are none until the next best box.
         """
-        dim = self.problem.dim
-        while True:
-            self.got_bb.wait()
-            bb = self.best_box
-            self.got_bb.clear()
-            while bb is not None:
-                base = self.gram_schmidt(dim, bb.results)
-                if base:  # was able to find a base
-                    if len(base) == 0:
-                        break
-                    # TODO split nelder_mead into a init phase, and a sampling
-                    # routine
-                    while not self.got_bb.is_set():
-                        new_point = self.nelder_mead(base[:])
-                        # self.logger.info("new point: %s" % new_point)
-                        self.emit(new_point)
-                    break
-                else:  # not able to find base, try with parent of current best box
-                    bb = bb.parent
-                    if bb is None:
-                        self.got_bb.clear(
-                        )  # the "wait()" at the top is now active
+        base = self._base
+        if not base:
+            return None
+        # TODO split nelder_mead into a init phase, and a sampling routine
+        return np.array([self.nelder_mead(base[:]) for _ in range(n)])
 
     def on_new_best_box(self, best_box):
         """
-        When a new best box has been found by the :class:`~.analyzers.Splitter`, the
-        ``got_bb`` :class:`~threading.Event` is set and the output queue is cleared.
+        When a new best box has been found by the :class:`~.analyzers.Splitter`,
+        we try to find a suiteable base in it via :meth:`.gram_schmidt`.
+        If there are not enough results in it, we look up its parents.
+        The following points are generated for it and the older ones are stale.
         """
-        self.best_box = best_box
-        self.got_bb.set()
-        self.clear_output()  # clearing must come last
+        base = None
+        box = best_box
+        while box is not None and not base:
+            base = self.gram_schmidt(self.problem.dim, box.results)
+            box = box.parent
+        self.best_box, self._base = best_box, base
+        self.bump_epoch()
+        self.strategy.wakeup(points=True)
@@ -14,33 +14,29 @@ from __future__ import unicode_literals
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from panobbgo.core import Heuristic
+from panobbgo.core import Heuristic, delivery
 
 
 class Random(Heuristic):
 
     """
-    always generates random points inside the box of the
-    "best leaf" (see "Splitter") until the capped queue is full.
+    generates random points inside the box of the
+    "best leaf" (see "Splitter") on demand.
     """
 
     def __init__(self, strategy, cap=None, name=None):
         name = "Random" if name is None else name
         self.leaf = None
-        from threading import Event
-        # used in on_start, to continue when we have a leaf.
-        self.first_split = Event()
         Heuristic.__init__(self, strategy, name=name)
 
-    def on_start(self):
+    def produce(self, n):
         import numpy as np
-        self.first_split.wait()
-        splitter = self.strategy.analyzer("splitter")
-        while True:
-            r = self.leaf.ranges * np.random.rand(
-                splitter.dim) + self.leaf.box[:, 0]
-            self.emit(r)
+        leaf = self.leaf
+        if leaf is None:  # no split yet
+            return None
+        return leaf.ranges * np.random.rand(n, len(leaf.ranges)) + leaf.box[:, 0]
 
+    @delivery('latest')
     def on_new_split(self, box, children, dim):
         """
         we are only interested in the (possibly new)
@@ -48,5 +44,5 @@ class Random(Heuristic):
         """
         best = self.strategy.analyzer("best").best
         self.leaf = self.strategy.analyzer("splitter").get_leaf(best)
-        self.clear_output()
-        self.first_split.set()
+        self.bump_epoch()
+        self.strategy.wakeup(points=True)
@@ -13,51 +13,67 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 from panobbgo.analyzers.best import Best
+from panobbgo.analyzers.spatial_index import SpatialIndex
 
-from panobbgo.core import Heuristic
+from panobbgo.core import Heuristic, delivery
 
 
 class WeightedAverage(Heuristic):
 
     """
-    This strategy calculates the weighted average of all points
-    in the box around the best point of the :class:`~panobbgo.analyzers.Splitter`.
+    This strategy calculates the weighted average of the ``neighbors`` results
+    nearest to the best point (default: ``3 * dim``), as found by the
+    :class:`~panobbgo.analyzers.SpatialIndex`.
+    Points closer than ``spacing`` (relative to the ranges of the box)
+    to a :mod:`point in flight <panobbgo.pending>` are rejected.
     """
 
-    def __init__(self, strategy, k=.1):
+    def __init__(self, strategy, k=.1, spacing=1e-3, neighbors=None):
         Heuristic.__init__(self, strategy)
         self.k = k
+        self.neighbors = neighbors
+        self.spacing = spacing
         self.logger = self.config.get_logger('WAvg')
 
     def __start__(self):
         self.minstd = min(self.problem.ranges) / 1000.
+        if self.neighbors is None:
+            self.neighbors = 3 * self.problem.dim
 
     def check_dependencies(self, analyzers, heuristics):
-        return any(isinstance(a, Best) for a in analyzers)
+        return any(isinstance(a, Best) for a in analyzers) and \
+            any(isinstance(a, SpatialIndex) for a in analyzers)
 
+    @delivery('latest')
     def on_new_best(self, best):
         assert best is not None and best.x is not None
-        box = self.strategy.analyzer('splitter').get_leaf(best)
-        if len(box.results) < 3:
+        import numpy as np
+        _, results = self.strategy.analyzer('spatial_index').nearest(best.x, k=self.neighbors)
+        results = [r for r in results if np.isfinite(r.fx)]  # without failed evaluations
+        if len(results) < 3:
             return
 
         # actual calculation
-        import numpy as np
-        xx = np.array([r.x for r in box.results])
-        yy = np.array([r.fx for r in box.results])
+        xx = np.array([r.x for r in results])
+        yy = np.array([r.fx for r in results])
         weights = np.log1p(yy - best.fx)
         weights = -weights + (1 + self.k) * weights.max()
         # weights = np.log1p(np.arange(len(yy) + 1, 1, -1))
         # self.logger.info("weights: %s" % zip(weights, yy))
-        self.clear_output()
+        epoch = self.bump_epoch()
         ret = np.average(xx, axis=0, weights=weights)
         std = xx.std(axis=0)
         # std must be > 0
         std[std < self.minstd] = self.minstd
         # self.logger.info("std: %s" % std)
+        points = []
         for i in range(self.cap):
             ret = ret.copy()
             ret += (float(i) / self.cap) * np.random.normal(0, std)
             if np.linalg.norm(best.x - ret) > .01:
                 # self.logger.info("out: %s" % ret)
-                self.emit(ret)
+                points.append(ret)
+        if len(points) > 0:
+            points = self.problem.project(np.array(points))
+            points = points[self.strategy.in_flight.distances(points) > self.spacing]
+        self.emit(points, epoch=epoch)
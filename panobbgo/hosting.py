@@ -0,0 +1,490 @@
+# -*- coding: utf8 -*-
+# Copyright 2012 -- 2013 Harald Schilly <harald.schilly@univie.ac.at>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+r"""
+Out-of-process Modules
+======================
+
+All :mod:`.analyzers` and :mod:`.heuristics` share the GIL of the controller process.
+Hence, CPU-heavy handlers stall the delivery of events to all other modules.
+A *hosted* module runs in a worker process on its own instead, without being rewritten:
+
+- Mark it via the :func:`.hosted` decorator (for the class or an instance)
+  or by its name on the command line, via ``--hosted <name>``.
+- The :class:`~panobbgo.core.EventBus` starts the worker process via the
+  ``forkserver`` of :mod:`multiprocessing`, when the module is registered.
+  The controller has threads running at that time, hence it does not fork itself.
+  The module is pickled, i.e. its class has to be importable and the state it has
+  at registration picklable. Its subscriptions stay in the controller:
+  their events are sent to the worker via a pipe, where a local
+  :class:`~panobbgo.core.EventBus` delivers them to the module --
+  with the same :func:`delivery policies <panobbgo.core.delivery>` and threads.
+  The pending events in the controller are bounded by the same ``maxsize``
+  and ``overflow`` policy.
+  Lists of :class:`~panobbgo_lib.lib.Result` are sent as :mod:`numpy`
+  blocks, see :func:`panobbgo.replay.encode`.
+- The other way round, the points it emits, the events it publishes,
+  :meth:`~panobbgo.core.Heuristic.bump_epoch` and
+  :meth:`~panobbgo.core.Heuristic.clear_output` are sent back.
+  They arrive in the controller, as if the module would run there.
+- The :meth:`~panobbgo.core.EventBus.stats` of the module
+  are reported by the worker periodically.
+
+Example::
+
+    @hosted(state=('_min', '_cv', '_pareto', '_pareto_front'))
+    class Best(Analyzer):
+        ...
+
+.. Note::
+
+  The worker has a copy of the module as it was at the time of registration.
+  Of the strategy, only the :class:`~panobbgo_lib.lib.Problem`, the config and an
+  (empty) :attr:`~panobbgo.core.StrategyBase.in_flight` set are available.
+  Therefore, a hosted module should only rely on the data of its events.
+  If other modules read its attributes directly (e.g. ``strategy.best``),
+  they must be listed in ``state`` -- they are mirrored into the controller,
+  whenever they changed after a handler call and before points or events are sent back.
+  The same holds for :meth:`~panobbgo.core.Heuristic.produce`, which is called in the controller.
+  Events with arguments, which can't be pickled, are skipped and counted
+  in :attr:`.ModuleHost.skipped`.
+  As with all start methods except ``fork``, the main module of the controller is imported
+  by the worker, i.e. a script has to be guarded by ``if __name__ == '__main__':``.
+
+.. codeauthor:: Harald Schilly <harald.schilly@univie.ac.at>
+"""
+
+import threading
+from IPython.utils.timing import time
+
+from .core import EventBus, Event, Heuristic, PointBuffer, BLOCK, DROP_OLDEST, _coalesce
+from .replay import encode, decode, _Unencodable
+
+
+def hosted(module=None, state=()):
+    """
+    Marks a :class:`~panobbgo.core.Module` class or instance to run in a worker process.
+
+    Args:
+
+    - ``state``: names of attributes, which are mirrored from the
+      worker into the controller process.
+    """
+    def mark(m):
+        m.hosted = True
+        m.hosted_state = tuple(state)
+        return m
+    return mark if module is None else mark(module)
+
+
+def _pack(kwargs):
+    """
+    Prepares the arguments of an event for the pipe.
+    """
+    packed = {}
+    for k, v in kwargs.items():
+        try:
+            packed[k] = (True, encode(v))
+        except _Unencodable:
+            packed[k] = (False, v)
+    return packed
+
+
+def _unpack(packed):
+    return dict((k, decode(v) if encoded else v) for k, (encoded, v) in packed.items())
+
+
+class _HostSlot:
+
+    """
+    Stands in for the event queue of a hosted module in the controller.
+    It holds at most ``maxsize`` events of its key, which are not sent yet.
+    """
+
+    def __init__(self, host, key, maxsize=0, overflow=BLOCK):
+        self.host = host
+        self.key = key
+        self.maxsize = maxsize
+        self.overflow = overflow
+
+    def put(self, event):
+        self.host._post(self.key, event, self.maxsize, self.overflow)
+
+    def qsize(self):
+        return self.host._sizes[self.key]
+
+
+def _blueprint(target):
+    """
+    The picklable class and state of the module ``target``, without the references
+    to the strategy and without the threads, queues and locks of this process.
+    """
+    state = dict(target.__dict__)
+    for name in ['_strategy', '_threads', '_mailbox', '_host', 'eventbus_events',
+                 '_output', '_producer']:
+        state.pop(name, None)
+    epoch = target.epoch if isinstance(target, Heuristic) else None
+    return type(target), state, epoch, target.problem
+
+
+def _rebuild(blueprint, eventbus):
+    """
+    Creates the module in the worker process from its :func:`._blueprint`.
+    """
+    from types import SimpleNamespace
+    from .pending import PendingPoints
+    cls, state, epoch, problem = blueprint
+    target = cls.__new__(cls)
+    target.__dict__.update(state)
+    target._strategy = SimpleNamespace(problem=problem, config=target.config, eventbus=eventbus,
+                                       in_flight=PendingPoints(problem.dim, problem.ranges))
+    target.hosted = False
+    target._threads = []
+    target._mailbox = None
+    target._host = None
+    if isinstance(target, Heuristic):
+        target._output = PointBuffer(target.cap)
+        target._output.epoch = epoch
+        target._producer = None
+    return target
+
+
+class ModuleHost:
+
+    """
+    Runs the module ``target`` in a worker process
+    and connects it to the ``eventbus`` of the controller, see :mod:`panobbgo.hosting`.
+    """
+
+    #: seconds between the status reports (stats and activity) of the worker
+    interval = .25
+
+    def __init__(self, eventbus, target):
+        import collections
+        from .utils import forkserver_context
+        self.eventbus = eventbus
+        self.target = target
+        self.logger = eventbus.logger
+        #: number of events per key, which couldn't be sent to the worker
+        self.skipped = collections.Counter()
+        self._outbox = collections.deque()  # (key, event), None stops the sender
+        self._sizes = collections.Counter()  # number of events per key in the outbox
+        self._cond = threading.Condition()
+        self._closing = False
+        self._lost = False  # the worker or the sender is gone
+        self._worker_active = True
+
+        ctx = forkserver_context()
+        self._conn, child = ctx.Pipe()
+        self.process = ctx.Process(target=_serve, args=(child, _blueprint(target), self.interval),
+                                   name='%s-host' % target.name)
+        self.process.daemon = True
+        self.process.start()
+        child.close()
+
+        # sending and receiving never blocks the publishers and the main loop
+        for run, name in [(self._send, 'send'), (self._receive, 'receive')]:
+            t = threading.Thread(target=run, name='ModuleHost::%s/%s' % (target.name, name))
+            t.daemon = True
+            t.start()
+        self.logger.info("'%s' is hosted in process %d" % (target.name, self.process.pid))
+
+    def slot(self, key, maxsize=0, overflow=BLOCK):
+        """
+        :return: the object, which receives the events of ``key`` via ``put(event)``.
+        """
+        return _HostSlot(self, key, maxsize, overflow)
+
+    def _post(self, key, event, maxsize, overflow):
+        """
+        Puts the event into the outbox, according to the ``overflow`` policy
+        for more than ``maxsize`` pending events of ``key``.
+        """
+        bus = self.eventbus
+        if bus._dispatcher is not None:
+            overflow = bus._dispatcher.nonblocking(key, overflow)
+        with self._cond:
+            while 0 < maxsize <= self._sizes[key] and not self._lost:
+                if overflow == BLOCK:
+                    self._cond.wait()
+                    continue
+                # the oldest or newest pending event of the key
+                idxs = range(len(self._outbox)) if overflow == DROP_OLDEST else \
+                    range(len(self._outbox) - 1, -1, -1)
+                i = next(i for i in idxs if self._outbox[i] is not None and self._outbox[i][0] == key)
+                if overflow == DROP_OLDEST:
+                    del self._outbox[i]
+                    self._sizes[key] -= 1
+                    bus._count(bus.dropped, key)
+                else:
+                    self._outbox[i] = (key, _coalesce(self._outbox[i][1], event))
+                    bus._count(bus.coalesced, key)
+                    event = None
+                    break
+            if self._lost:
+                bus._count(bus.dropped, key)
+                return
+            if event is not None:
+                self._outbox.append((key, event))
+                self._sizes[key] += 1
+                self._cond.notify_all()
+            size = self._sizes[key]
+        bus._high_water(key, self.target, size, maxsize)
+
+    @property
+    def active(self):
+        """
+        True, while the worker is alive and its module is active.
+        """
+        return self.process.is_alive() and self._worker_active
+
+    def _send(self):
+        import pickle
+        while True:
+            with self._cond:
+                while len(self._outbox) == 0:
+                    self._cond.wait()
+                item = self._outbox.popleft()
+                if item is not None:
+                    self._sizes[item[0]] -= 1
+                self._cond.notify_all()
+            if item is None:
+                break
+            key, event = item
+            try:
+                self._conn.send((key, event.terminate, event._when, _pack(event._kwargs)))
+            except (pickle.PicklingError, TypeError, AttributeError) as e:
+                self.skipped[key] += 1
+                if self.skipped[key] == 1:
+                    self.logger.warning("'%s': can't send '%s' events: %s" %
+                                        (self.target.name, key, e))
+            except (EOFError, OSError):
+                self._disconnect()
+                return
+        try:
+            self._conn.send(None)
+        except (EOFError, OSError):
+            pass
+
+    def _receive(self):
+        target = self.target
+        bus = self.eventbus
+        while True:
+            try:
+                msg = self._conn.recv()
+            except (EOFError, OSError):
+                break
+            kind = msg[0]
+            try:
+                if kind == 'emit':
+                    target.emit(msg[1], epoch=msg[2])
+                elif kind == 'bump_epoch':
+                    target.bump_epoch()
+                elif kind == 'clear_output':
+                    target.clear_output()
+                elif kind == 'publish':
+                    _, key, terminate, kwargs = msg
+                    bus.publish(key, terminate=terminate, **_unpack(kwargs))
+                elif kind == 'state':
+                    for name, value in msg[1].items():
+                        setattr(target, name, value)
+                elif kind == 'status':
+                    _, self._worker_active, stats = msg
+                    self._merge(stats)
+            except Exception as e:
+                import traceback
+                self.logger.critical("'%s': %s from the worker failed: %s\n%s" %
+                                     (target.name, kind, e, traceback.format_exc()))
+        self._worker_active = False
+        if not self._closing:
+            self.logger.critical("'%s': worker process %d exited -> unsubscribing." %
+                                 (target.name, self.process.pid))
+        self._disconnect()
+
+    def _disconnect(self):
+        """
+        Called, when the worker or the sender is gone: the pending and all further
+        events are dropped, blocked publishers are released and
+        the module is unsubscribed (unless it is closing anyways).
+        """
+        bus = self.eventbus
+        with self._cond:
+            if self._lost:
+                return
+            self._lost = True
+            for key, size in self._sizes.items():
+                bus._count(bus.dropped, key, size)
+            self._sizes.clear()
+            self._outbox.clear()
+            self._outbox.append(None)  # stops the sender
+            self._cond.notify_all()
+        if not self._closing:
+            bus.unsubscribe(None, self.target)
+
+    def _merge(self, stats):
+        """
+        Takes over the delivery statistics of the worker,
+        the number of published events is counted in the controller.
+        """
+        for key, s in stats.items():
+            mine = self.eventbus._event_stats(key, self.target)
+            mine.delivered = s.delivered
+            mine.failed = s.failed
+            mine.wait = s.wait
+            mine.handler = s.handler
+
+    def close(self, timeout=2.):
+        """
+        Stops the worker process, after it received the pending events.
+        """
+        self._closing = True
+        with self._cond:
+            self._outbox.append(None)
+            self._cond.notify_all()
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+
+    def __repr__(self):
+        return 'ModuleHost[%s, pid %s]' % (self.target.name, self.process.pid)
+
+
+class _WorkerEventBus(EventBus):
+
+    """
+    The :class:`~panobbgo.core.EventBus` inside the worker process.
+    Events published by the module are sent to the controller,
+    the events from the controller are delivered locally.
+    """
+
+    def __init__(self, config, conn, target):
+        EventBus.__init__(self, config)
+        self._conn = conn
+        self._target = target
+        self._lock = threading.Lock()
+        self._state = {}
+
+    def _send(self, msg):
+        import pickle
+        try:
+            with self._lock:
+                self._conn.send(msg)
+        except (pickle.PicklingError, TypeError, AttributeError) as e:
+            self.logger.warning("'%s': can't send %s: %s" % (self._target.name, msg[0], e))
+
+    def sync(self):
+        """
+        Sends the mirrored attributes of the module, which changed since the last time.
+        """
+        import pickle
+        changed = {}
+        with self._lock:
+            for name in self._target.hosted_state:
+                value = getattr(self._target, name, None)
+                data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+                if self._state.get(name) != data:
+                    self._state[name] = data
+                    changed[name] = value
+        if len(changed) > 0:
+            self._send(('state', changed))
+
+    def publish(self, key, event=None, terminate=False, **kwargs):
+        self.sync()
+        kwargs = kwargs if event is None else event._kwargs
+        self._send(('publish', key, terminate, _pack(kwargs)))
+
+    def deliver(self, key, terminate, when, kwargs):
+        """
+        Delivers an event from the controller to the local subscribers.
+        """
+        EventBus.publish(self, key, event=Event._create(_unpack(kwargs), terminate, when),
+                         terminate=terminate)
+
+    def emit(self, points, epoch=None):
+        self.sync()
+        self._send(('emit', points, self._target.epoch if epoch is None else epoch))
+
+    def bump_epoch(self):
+        # the epochs in both processes stay in step
+        epoch = Heuristic.bump_epoch(self._target)
+        self._send(('bump_epoch',))
+        return epoch
+
+    def clear_output(self):
+        self._send(('clear_output',))
+
+    def status(self):
+        stats = dict((key, s) for (key, name), s in self.stats().items()
+                     if name == self._target.name)
+        self._send(('status', self._target.active if isinstance(self._target, Heuristic)
+                    else True, stats))
+
+    def _call(self, key, target, event, handler=None, stats=None):
+        try:
+            return EventBus._call(self, key, target, event, handler, stats)
+        finally:
+            self.sync()
+
+
+def _serve(conn, blueprint, interval):
+    """
+    The main function of the worker process.
+    """
+    from .utils import create_logger
+    config = blueprint[1]['config']
+    config.hosted = []
+    # the loggers were unpickled by name, without their handlers
+    for key in list(config._loggers.keys()):
+        name, level = key.split('::')
+        config._loggers[key] = create_logger(name, int(level))
+    bus = _WorkerEventBus(config, conn, None)
+    target = bus._target = _rebuild(blueprint, bus)
+    if isinstance(target, Heuristic):
+        target.emit = bus.emit
+        target.bump_epoch = bus.bump_epoch
+        target.clear_output = bus.clear_output
+    bus.register(target)
+
+    done = threading.Event()
+
+    def report():
+        while not done.wait(interval):
+            bus.status()
+
+    reporter = threading.Thread(target=report, name='ModuleHost::status')
+    reporter.daemon = True
+    reporter.start()
+
+    while True:
+        try:
+            msg = conn.recv()
+        except (EOFError, OSError):
+            break
+        if msg is None:
+            break
+        bus.deliver(*msg)
+
+    # wait a little for the pending events, then report for the last time
+    def pending():
+        mb = target._mailbox
+        queues = target.eventbus_events.values()
+        return (mb is not None and mb.scheduled) or \
+            any(q.qsize() > 0 for q in queues if hasattr(q, 'qsize'))
+
+    deadline = time.time() + 1.
+    while time.time() < deadline and pending():
+        time.sleep(1e-3)
+    done.set()
+    bus.status()
@@ -0,0 +1,217 @@
+# -*- coding: utf8 -*-
+# Copyright 2012 Harald Schilly <harald.schilly@univie.ac.at>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from __future__ import unicode_literals
+
+import os
+import time
+import numpy as np
+
+from panobbgo.core import Analyzer, Heuristic
+from panobbgo.utils import PanobbgoTestCase
+
+# hosted modules are pickled, hence their classes are defined at the module level
+
+
+class Heavy(Analyzer):
+
+    def __init__(self, strategy):
+        Analyzer.__init__(self, strategy)
+        self.total = 0
+        self.pid = None
+
+    def on_new_results(self, results):
+        self.total += len(results)
+        self.pid = os.getpid()
+        self.eventbus.publish('counted', total=self.total)
+
+
+class Echo(Heuristic):
+
+    def on_counted(self, total):
+        return np.array([total / 10., 0.])
+
+
+class Stale(Heuristic):
+
+    def on_go(self):
+        old = self.epoch
+        self.emit(np.zeros(2))
+        self.bump_epoch()
+        self.emit(np.ones(2), epoch=old)  # discarded right away
+        self.emit(np.full(2, .5))
+
+
+class Slow(Analyzer):
+
+    def __init__(self, strategy):
+        Analyzer.__init__(self, strategy)
+        self.items = []
+
+    def on_item(self, items):
+        time.sleep(.05)
+        self.items.extend(items)
+
+
+class Dying(Analyzer):
+
+    def on_item(self, items):
+        os._exit(3)
+
+
+class HostingTests(PanobbgoTestCase):
+
+    def test_hosted_modules(self):
+        from panobbgo.core import EventBus
+        from panobbgo.hosting import hosted
+
+        class Listener(Analyzer):
+
+            def __init__(self, strategy):
+                Analyzer.__init__(self, strategy)
+                self.totals = []
+
+            def on_counted(self, total):
+                self.totals.append(total)
+
+        bus = EventBus(self.config)
+        self.strategy.eventbus = bus
+        heavy = hosted(Heavy(self.strategy), state=('total', 'pid'))
+        echo = Echo(self.strategy)
+        self.config.hosted = ['Echo']
+        listener = Listener(self.strategy)
+        for m in [heavy, echo, listener]:
+            bus.register(m)
+        assert heavy._host is not None and echo._host is not None
+        assert listener._host is None
+
+        for i in range(3):
+            bus.publish('new_results', results=self.random_results(2, 2))
+        bus.publish('unknown', x=object())  # not subscribed, nothing to send
+
+        points = []
+        deadline = time.time() + 10.
+        while len(points) < 3:
+            assert time.time() < deadline
+            time.sleep(.01)
+            points.extend(echo.get_point_list())
+
+        # the events of the hosted analyzer were published in this process
+        assert listener.totals == [2, 4, 6]
+        assert [p.x[0] for p in points] == [.2, .4, .6]
+        assert all(p.who == 'Echo' for p in points)
+        # the mirrored state
+        assert heavy.total == 6
+        assert heavy.pid not in (None, os.getpid())
+        assert echo.active
+
+        heavy.__stop__()
+        echo.__stop__()
+        assert not heavy._host.process.is_alive()
+        stats = bus.stats()[('new_results', 'Heavy')]
+        assert stats.published == 3
+        assert stats.delivered == 3
+        assert bus.stats()[('counted', 'Echo')].delivered == 3
+
+    def test_hosted_epochs(self):
+        from panobbgo.core import EventBus
+        from panobbgo.hosting import hosted
+
+        bus = EventBus(self.config)
+        self.strategy.eventbus = bus
+        h = hosted(Stale(self.strategy))
+        bus.register(h)
+        bus.publish('go')
+        deadline = time.time() + 10.
+        while not (h.discarded == 1 and len(h._output) == 2):
+            assert time.time() < deadline
+            time.sleep(.01)
+        assert h.epoch == 1
+        assert h.get_points().tolist() == [[.5, .5]]
+        assert h.discarded == 2
+        h.__stop__()
+
+    def test_bounded_outbox(self):
+        from panobbgo.core import EventBus
+        from panobbgo.hosting import hosted
+        self.config.event_queue_size = 3
+        self.config.event_overflow = 'coalesce'
+        self.config.dispatch_threads = 2
+        bus = EventBus(self.config)
+        self.strategy.eventbus = bus
+        slow = hosted(Slow(self.strategy), state=('items',))
+        bus.register(slow)
+        slot = slow.eventbus_events['item']
+        assert slot.maxsize == 3 and slot.overflow == 'coalesce'
+
+        # the sender is stuck meanwhile
+        import threading
+        gate = threading.Event()
+
+        class Gated(object):
+
+            def __init__(self, conn):
+                self.conn = conn
+
+            def send(self, msg):
+                gate.wait()
+                self.conn.send(msg)
+
+            def __getattr__(self, name):
+                return getattr(self.conn, name)
+        slow._host._conn = Gated(slow._host._conn)
+
+        for i in range(50):
+            bus.publish('item', items=[i])
+            assert slot.qsize() <= 3
+        gate.set()
+        # nothing is lost, the pending events are merged
+        deadline = time.time() + 10.
+        while len(slow.items) < 50:
+            assert time.time() < deadline
+            time.sleep(.01)
+        assert sorted(slow.items) == list(range(50))
+        assert bus.coalesced['item'] > 0
+        slow.__stop__()
+
+    def test_worker_dies(self):
+        from panobbgo.core import EventBus
+        from panobbgo.hosting import hosted
+        from threading import Thread
+        self.config.event_queue_size = 3
+        self.config.event_overflow = 'block'
+        self.config.dispatch_threads = 2
+        bus = EventBus(self.config)
+        self.strategy.eventbus = bus
+        dying = hosted(Dying(self.strategy))
+        bus.register(dying)
+
+        def publish():
+            for i in range(50):
+                bus.publish('item', items=[i])
+        publisher = Thread(target=publish)
+        publisher.daemon = True
+        publisher.start()
+        # the publisher isn't blocked by the full outbox of the dead worker
+        publisher.join(10.)
+        assert not publisher.is_alive()
+        dying._host.process.join(10.)
+        assert dying._host.process.exitcode == 3
+        deadline = time.time() + 10.
+        while dying in bus._subs['item']:
+            assert time.time() < deadline
+            time.sleep(.01)
+        assert not dying._host.active
+        bus.publish('item', items=[50])
+        dying.__stop__()
@@ -0,0 +1,163 @@
+# -*- coding: utf8 -*-
+# Copyright 2012 -- 2013 Harald Schilly <harald.schilly@univie.ac.at>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+r"""
+Pending Points
+==============
+
+With many tasks outstanding, heuristics would otherwise propose points next to
+those, which are already being evaluated -- e.g. :class:`~panobbgo.heuristics.Nearby`
+around the same best point -- and waste the parallel slots on near-duplicates.
+
+The :class:`~panobbgo.core.StrategyBase` keeps all points in flight in
+:attr:`~panobbgo.core.StrategyBase.in_flight`, a :class:`.PendingPoints` set,
+and publishes two events, both with the coordinates of the ``points`` (one per row):
+
+- ``new_pending``, after it submitted new points for evaluation, and
+- ``pending_done``, when their evaluation has finished.
+
+They are only published, if there is a subscriber for them.
+Heuristics query the set to reject or down-weight candidates close to pending evaluations::
+
+    far = self.strategy.in_flight.distances(candidates) > .01
+
+.. Note::
+
+  A :mod:`hosted <panobbgo.hosting>` module has an empty set in its worker.
+  It has to keep track of the pending points via the events instead.
+
+.. codeauthor:: Harald Schilly <harald.schilly@univie.ac.at>
+"""
+
+import threading
+import numpy as np
+
+
+class PendingPoints:
+
+    """
+    The set of :class:`Points <panobbgo_lib.lib.Point>`, which are currently evaluated.
+
+    The coordinates are stored as rows of one block, which grows by doubling.
+    Removing a point moves the last row into its place, hence adding and
+    removing cost :math:`O(1)` per point. Queries compare against all rows at once,
+    which is fast for the few hundred points in flight.
+
+    Distances are euclidean, after dividing the coordinates by ``scale``
+    (e.g. the :attr:`~panobbgo_lib.lib.Problem.ranges`, then a radius of ``.01``
+    is one percent of the box).
+    It is thread-safe, the strategy changes it while heuristics query it.
+    """
+
+    def __init__(self, dim, scale=None, capacity=64):
+        self.dim = dim
+        self._scale = np.ones(dim) if scale is None else \
+            np.where(np.asarray(scale) > 0, scale, 1.)
+        self._z = np.empty((capacity, dim), dtype=np.float64)  # scaled coordinates
+        self._points = []  # the point of each row
+        self._rows = {}  # id of a point -> row
+        self._lock = threading.Lock()
+
+    def add(self, points):
+        """
+        Adds the given list of points.
+
+        :return: their coordinates, one point per row.
+        """
+        x = np.array([p.x for p in points], dtype=np.float64).reshape(-1, self.dim)
+        with self._lock:
+            n = len(self._points)
+            if n + len(x) > len(self._z):
+                cap = len(self._z)
+                while cap < n + len(x):
+                    cap *= 2
+                z = np.empty((cap, self.dim), dtype=np.float64)
+                z[:n] = self._z[:n]
+                self._z = z
+            self._z[n:n + len(x)] = x / self._scale
+            for i, p in enumerate(points):
+                self._rows[id(p)] = n + i
+            self._points.extend(points)
+        return x
+
+    def remove(self, points):
+        """
+        Removes the given list of points, unknown ones are ignored.
+
+        :return: the coordinates of the removed points, one point per row.
+        """
+        removed = []
+        with self._lock:
+            for p in points:
+                row = self._rows.pop(id(p), None)
+                if row is None:
+                    continue
+                removed.append(p.x)
+                last = len(self._points) - 1
+                if row != last:
+                    moved = self._points[last]
+                    self._points[row] = moved
+                    self._z[row] = self._z[last]
+                    self._rows[id(moved)] = row
+                self._points.pop()
+        return np.array(removed, dtype=np.float64).reshape(-1, self.dim)
+
+    def _snapshot(self):
+        with self._lock:
+            n = len(self._points)
+            return self._z[:n].copy(), self._points[:n]
+
+    def distances(self, x):
+        """
+        The distance of each of the given points to the nearest pending point.
+
+        Args:
+
+        - ``x``: one point or a 2-dimensional array with one point per row.
+
+        :return: array of distances, ``inf`` if there are no pending points.
+        """
+        z = np.asarray(x, dtype=np.float64).reshape(-1, self.dim) / self._scale
+        pending, _ = self._snapshot()
+        if len(pending) == 0:
+            return np.full(len(z), np.inf)
+        # |z - p|^2 = |z|^2 + |p|^2 - 2 z.p, for all pairs at once
+        sq = (z ** 2).sum(axis=1)[:, None] + (pending ** 2).sum(axis=1) - 2. * z.dot(pending.T)
+        return np.sqrt(np.maximum(sq.min(axis=1), 0.))
+
+    def within(self, x, radius):
+        """
+        All pending points with a distance of at most ``radius`` to ``x``.
+
+        :return: list of :class:`Points <panobbgo_lib.lib.Point>`.
+        """
+        pending, points = self._snapshot()
+        dists = np.linalg.norm(pending - np.asarray(x) / self._scale, axis=1)
+        return [points[i] for i in np.flatnonzero(dists <= radius)]
+
+    def points(self):
+        """
+        :return: list of all pending points.
+        """
+        return self._snapshot()[1]
+
+    def __len__(self):
+        return len(self._points)
+
+    def __contains__(self, point):
+        return id(point) in self._rows
+
+    def __repr__(self):
+        return 'PendingPoints[%d]' % len(self._points)
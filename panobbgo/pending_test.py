@@ -0,0 +1,58 @@
+# -*- coding: utf8 -*-
+# Copyright 2012 Harald Schilly <harald.schilly@univie.ac.at>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from __future__ import unicode_literals
+
+import numpy as np
+
+from panobbgo.utils import PanobbgoTestCase
+from panobbgo_lib.lib import Point
+
+
+class PendingTests(PanobbgoTestCase):
+
+    def test_pending_points(self):
+        from panobbgo.pending import PendingPoints
+        pending = PendingPoints(2, scale=[10., 1.], capacity=2)
+        assert np.all(np.isinf(pending.distances(np.zeros((3, 2)))))
+        points = [Point(np.array([i, 0.]), 'test') for i in range(5)]
+        x = pending.add(points)
+        assert x.shape == (5, 2) and len(pending) == 5
+        # distances are relative to the scale
+        assert np.allclose(pending.distances(np.array([[.5, 0.], [2., 1.]])), [.05, 1.])
+        assert pending.within(np.array([1.4, 0.]), .1) == points[1:3]
+
+        # removing moves the last row, unknown points are ignored
+        done = pending.remove([points[1], Point(np.ones(2), 'unknown'), points[1]])
+        assert done.tolist() == [[1., 0.]]
+        assert points[1] not in pending and points[4] in pending
+        assert set(id(p) for p in pending.points()) == \
+            set(id(p) for p in points if p is not points[1])
+        assert pending.within(np.array([4., 0.]), 0.) == [points[4]]
+        assert np.isclose(pending.distances(np.array([1., 0.]))[0], .1)
+        pending.remove(points)
+        assert len(pending) == 0 and pending.remove([]).shape == (0, 2)
+
+    def test_nearby_avoids_pending(self):
+        from panobbgo.pending import PendingPoints
+        from panobbgo.heuristics import Nearby
+        self.strategy.in_flight = PendingPoints(2, self.problem.ranges)
+        nearby = Nearby(self.strategy, radius=.1, new=2, axes='all', oversample=50)
+        best = self.problem(Point(np.zeros(2), 'test'))
+        # a pending point at the best one blocks its neighborhood
+        self.strategy.in_flight.add([Point(np.zeros(2), 'pending')])
+        nearby.on_new_best(best)
+        pts = nearby.get_points()
+        assert pts.shape == (2, 2)
+        assert np.all(self.strategy.in_flight.distances(pts) >= .05)
@@ -0,0 +1,337 @@
+# -*- coding: utf8 -*-
+# Copyright 2012 -- 2013 Harald Schilly <harald.schilly@univie.ac.at>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+r"""
+Event Recording and Replay
+==========================
+
+Repeatable workloads for benchmarking :mod:`.analyzers` and :mod:`.heuristics`.
+
+- The :class:`.EventRecorder` writes all events published on the
+  :class:`~panobbgo.core.EventBus` into a file (enable it via ``--record <file>``).
+  :class:`~panobbgo_lib.lib.Result` payloads are stored column-wise
+  as :class:`numpy.ndarray` blocks.
+- :class:`.EventLog` reads such a file.
+- The :class:`.ReplayStrategy` feeds the recorded events into a chosen set of
+  modules -- without any evaluator -- either as fast as possible or at the recorded pace.
+  Afterwards, it reports the throughput of each module.
+
+Example::
+
+    strategy = ReplayStrategy(Rosenbrock(3))
+    strategy.add_analyzer(Best(strategy))
+    strategy.add_analyzer(Splitter(strategy))
+    print(strategy.replay('run.events', keys=['new_results']))
+
+.. codeauthor:: Harald Schilly <harald.schilly@univie.ac.at>
+"""
+
+from __future__ import division
+import numpy as np
+from IPython.utils.timing import time
+
+from .core import StrategyBase
+
+FORMAT = 'panobbgo-events'
+VERSION = 1
+
+
+class _Unencodable(Exception):
+    pass
+
+
+def _results_block(results):
+    """
+    The columns of a list of :class:`~panobbgo_lib.lib.Result`.
+    """
+    cv_vec = None
+    if results[0].cv_vec is not None:
+        cv_vec = np.array([r.cv_vec for r in results], dtype=np.float64)
+    return {
+        'x': np.array([r.x for r in results], dtype=np.float64),
+        'fx': np.array([r.fx for r in results], dtype=np.float64),
+        'cv_vec': cv_vec,
+        'error': np.array([r.error for r in results], dtype=np.float64),
+        'who': [r.who for r in results]
+    }
+
+
+def _block_results(cols):
+    from panobbgo_lib import Point, Result
+    results = []
+    for i in range(len(cols['fx'])):
+        cv_vec = None if cols['cv_vec'] is None else cols['cv_vec'][i]
+        results.append(Result(Point(cols['x'][i], cols['who'][i]), cols['fx'][i],
+                              cv_vec=cv_vec, error=cols['error'][i]))
+    return results
+
+
+def encode(value):
+    """
+    Converts the ``value`` of an event into a compact and picklable form.
+    Lists of results become one block of columns.
+
+    :raises _Unencodable: for other objects (e.g. boxes of the :class:`~.analyzers.Splitter`).
+    """
+    from panobbgo_lib import Result
+    if value is None or isinstance(value, (bool, int, float, str, np.ndarray, np.number)):
+        return value
+    if isinstance(value, Result):
+        return ('result', _results_block([value]))
+    if isinstance(value, (list, tuple)):
+        if len(value) > 0 and all(isinstance(v, Result) for v in value):
+            return ('results', _results_block(value))
+        return ('list', [encode(v) for v in value])
+    raise _Unencodable(type(value).__name__)
+
+
+def decode(value):
+    """
+    Counterpart of :func:`.encode`.
+    """
+    if not isinstance(value, tuple):
+        return value
+    kind, data = value
+    if kind == 'result':
+        return _block_results(data)[0]
+    if kind == 'results':
+        return _block_results(data)
+    return [decode(v) for v in data]
+
+
+class EventRecorder:
+
+    """
+    Writes the events of an :class:`~panobbgo.core.EventBus` into the file ``path``,
+    as a stream of pickled records: a header dict followed by one
+    ``(time, key, terminate, kwargs)`` tuple per event, where ``time`` is relative
+    to the creation of the recorder.
+
+    Events, whose arguments can't be :func:`encoded <.encode>`, are skipped
+    and counted in :attr:`.skipped`.
+    """
+
+    def __init__(self, path, problem=None):
+        import pickle
+        import threading
+        import collections
+        self.path = path
+        self._pickle = pickle
+        self._lock = threading.Lock()
+        self._start = time.time()
+        self._file = open(path, 'wb')
+        self.recorded = 0
+        #: number of skipped events per key
+        self.skipped = collections.Counter()
+        header = {'format': FORMAT, 'version': VERSION, 'start': self._start,
+                  'problem': repr(problem),
+                  'dim': None if problem is None else problem.dim}
+        pickle.dump(header, self._file, pickle.HIGHEST_PROTOCOL)
+
+    def record(self, key, kwargs, terminate=False):
+        """
+        Called by :meth:`~panobbgo.core.EventBus.publish` for each event.
+        """
+        when = time.time() - self._start
+        try:
+            kwargs = dict((k, encode(v)) for k, v in kwargs.items())
+        except _Unencodable:
+            with self._lock:
+                self.skipped[key] += 1
+            return
+        with self._lock:
+            if self._file is None:
+                return
+            self._pickle.dump((when, key, terminate, kwargs), self._file,
+                              self._pickle.HIGHEST_PROTOCOL)
+            self.recorded += 1
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def __repr__(self):
+        return 'EventRecorder[%s: %d events, %d skipped]' % \
+            (self.path, self.recorded, sum(self.skipped.values()))
+
+
+class EventLog:
+
+    """
+    Reads a file written by the :class:`.EventRecorder`.
+    Iterating over it yields ``(time, key, terminate, kwargs)`` tuples.
+    A truncated last record (e.g. after a crash) is ignored.
+    """
+
+    def __init__(self, path):
+        import pickle
+        self.path = path
+        with open(path, 'rb') as f:
+            self.header = pickle.load(f)
+        if not isinstance(self.header, dict) or self.header.get('format') != FORMAT:
+            raise ValueError("%s is not a recorded event log" % path)
+
+    def __iter__(self):
+        import pickle
+        with open(self.path, 'rb') as f:
+            pickle.load(f)  # header
+            while True:
+                try:
+                    when, key, terminate, kwargs = pickle.load(f)
+                except (EOFError, pickle.UnpicklingError):
+                    return
+                kwargs = dict((k, decode(v)) for k, v in kwargs.items())
+                yield when, key, terminate, kwargs
+
+    def keys(self):
+        """
+        Number of events per key.
+        """
+        import collections
+        return collections.Counter(key for _, key, _, _ in self)
+
+    def __repr__(self):
+        return 'EventLog[%s]' % self.path
+
+
+class ReplayStrategy(StrategyBase):
+
+    """
+    Replays an :class:`.EventLog` into the modules added via
+    :meth:`~panobbgo.core.StrategyBase.add_analyzer` and
+    :meth:`~panobbgo.core.StrategyBase.add_heuristic`.
+    There is no evaluator: the points emitted by the heuristics are only counted.
+
+    ``new_results`` events are added to the :class:`~panobbgo.core.Results`,
+    all other events are published on the :class:`~panobbgo.core.EventBus` as they are.
+
+    .. Note::
+
+      Events published by the replayed modules themselves are delivered, too.
+      E.g. when replaying :class:`~panobbgo.analyzers.Best`, restrict ``keys``
+      to ``['new_results']`` -- otherwise, ``new_best`` arrives twice.
+    """
+
+    def __init__(self, problem, parse_args=False):
+        StrategyBase.__init__(self, problem, parse_args=parse_args)
+        import collections
+        #: number of points emitted per heuristic
+        self.emitted = collections.Counter()
+        self._finished = False
+
+    def _setup_cluster(self, nb_gens, problem):
+        self.evaluators = None
+
+    def execute(self):
+        return []
+
+    def _drain(self):
+        for h in list(self._heuristics.values()):
+            self.emitted[h.name] += len(h.get_points())
+
+    def _drain_loop(self):
+        while not self._finished:
+            self._wakeup.wait(.1)
+            self._wakeup.clear()
+            self._drain()
+
+    def _idle(self):
+        for m in self.analyzers + list(self._heuristics.values()):
+            mb = m._mailbox
+            if mb is not None and mb.scheduled:
+                return False
+            queues = getattr(m, 'eventbus_events', {}).values()
+            if any(q.qsize() > 0 for q in queues if hasattr(q, 'qsize')):
+                return False
+        return True
+
+    def replay(self, path, keys=None, speed=None, timeout=60.):
+        """
+        Feeds the recorded events into the modules and waits until they are processed.
+
+        Args:
+
+        - ``path``: the file written by the :class:`.EventRecorder`.
+        - ``keys``: if set, only events of these keys are replayed.
+        - ``speed``: if ``None``, events are published as fast as possible.
+          Otherwise, at the recorded pace times ``speed`` (i.e. ``1.`` is the recorded pace).
+        - ``timeout``: maximum number of seconds to wait for the modules at the end.
+
+        :return: :class:`pandas.DataFrame` with the throughput of each module.
+        """
+        import threading
+        log = EventLog(path)
+        for h in sorted(self._hs, key=lambda h: h.name):
+            self.add_heuristic(h)
+        self._hs = []
+        self.check_dependencies()
+
+        self._finished = False
+        drainer = threading.Thread(target=self._drain_loop, name='Replay::drain')
+        drainer.daemon = True
+        drainer.start()
+
+        nb_events = 0
+        self._start = start = time.time()
+        for when, key, terminate, kwargs in log:
+            if keys is not None and key not in keys:
+                continue
+            if speed is not None:
+                delay = start + when / speed - time.time()
+                if delay > 0:
+                    time.sleep(delay)
+            if key == 'new_results':
+                self.results += kwargs['results']
+            else:
+                self.eventbus.publish(key, terminate=terminate, **kwargs)
+            nb_events += 1
+
+        # wait until all (also derived) events are processed
+        deadline = time.time() + timeout
+        stable = 0
+        while stable < 2 and time.time() < deadline:
+            time.sleep(1e-3)
+            stable = stable + 1 if self._idle() else 0
+        self._end = time.time()
+        self._finished = True
+        self._wakeup.set()
+        drainer.join()
+        self._drain()
+        self.logger.info("replayed %d events from %s in %.3f [s]" %
+                         (nb_events, log, self._end - start))
+        return self.throughput()
+
+    def throughput(self):
+        """
+        Number of delivered events, the total time spent in the handlers,
+        the resulting events per second and the emitted points of each module.
+
+        :return: :class:`pandas.DataFrame`, indexed by the module names.
+        """
+        import pandas as pd
+        rows = {}
+        for (key, name), s in self.eventbus.stats().items():
+            row = rows.setdefault(name, {'events': 0, 'failed': 0, 'time': 0.})
+            row['events'] += s.delivered
+            row['failed'] += s.failed
+            row['time'] += s.total_time
+        for name, row in rows.items():
+            row['events/s'] = row['events'] / row['time'] if row['time'] > 0 else np.nan
+            row['points'] = self.emitted.get(name, 0)
+        cols = ['events', 'failed', 'time', 'events/s', 'points']
+        return pd.DataFrame.from_dict(rows, orient='index')[cols].sort_values('time',
+                                                                              ascending=False)
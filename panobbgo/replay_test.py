@@ -0,0 +1,116 @@
+# -*- coding: utf8 -*-
+# Copyright 2012 Harald Schilly <harald.schilly@univie.ac.at>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from __future__ import unicode_literals
+
+import os
+import shutil
+import tempfile
+import time
+import numpy as np
+
+from panobbgo.utils import PanobbgoTestCase
+
+
+class ReplayTests(PanobbgoTestCase):
+
+    def setUp(self):
+        PanobbgoTestCase.setUp(self)
+        self.path = tempfile.mkdtemp()
+        self.fn = os.path.join(self.path, 'run.events')
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def record(self, nb=10):
+        from panobbgo.core import EventBus
+        from panobbgo.replay import EventRecorder
+        bus = EventBus(self.config)
+        bus.recorder = EventRecorder(self.fn, self.problem)
+        self.orig = []
+        bus.publish('start', terminate=True)
+        for i in range(nb):
+            results = self.random_results(2, 5, pcv=.5)
+            self.orig.extend(results)
+            bus.publish('new_results', results=results)
+            bus.publish('new_best', best=results[0])
+        bus.publish('new_split', box=object(), children=[], dim=0)  # skipped
+        bus.publish('finished')
+        bus.recorder.close()
+        return bus.recorder
+
+    def test_roundtrip(self):
+        from panobbgo.replay import EventLog
+        recorder = self.record()
+        assert recorder.recorded == 22
+        assert recorder.skipped['new_split'] == 1
+
+        log = EventLog(self.fn)
+        assert log.header['dim'] == 2
+        assert log.keys() == {'start': 1, 'new_results': 10, 'new_best': 10, 'finished': 1}
+        events = list(log)
+        assert events[0][1:] == ('start', True, {})
+        assert all(e0[0] <= e1[0] for e0, e1 in zip(events, events[1:]))
+        loaded = [r for _, key, _, kw in events if key == 'new_results' for r in kw['results']]
+        assert np.allclose([r.x for r in loaded], [r.x for r in self.orig])
+        assert np.allclose([r.fx for r in loaded], [r.fx for r in self.orig])
+        assert np.allclose([r.cv_vec for r in loaded], [r.cv_vec for r in self.orig])
+        assert events[2][3]['best'].fx == self.orig[0].fx
+
+        # a truncated last record is ignored
+        with open(self.fn, 'ab') as f:
+            f.write(b'\x80\x04\x95')
+        assert len(list(EventLog(self.fn))) == 22
+
+    def test_replay(self):
+        from panobbgo.core import Analyzer, Heuristic
+        from panobbgo.replay import ReplayStrategy
+        self.record()
+
+        class Counter(Analyzer):
+
+            def __init__(self, strategy):
+                Analyzer.__init__(self, strategy)
+                self.nb = 0
+
+            def on_new_results(self, results):
+                self.nb += len(results)
+
+        class Echo(Heuristic):
+
+            def on_new_best(self, best):
+                self.emit(best.x)
+
+        strategy = ReplayStrategy(self.problem)
+        counter = Counter(strategy)
+        strategy.add_analyzer(counter)
+        strategy.add(Echo)
+        report = strategy.replay(self.fn)
+        assert counter.nb == 50
+        assert len(strategy.results) == 50
+        assert report.loc['Counter', 'events'] == 10
+        assert report.loc['Echo', 'events'] == 10
+        assert report.loc['Echo', 'points'] == 10
+        assert report['failed'].sum() == 0
+
+        # recorded pacing
+        from panobbgo.replay import EventLog
+        span = max(when for when, _, _, _ in EventLog(self.fn))
+        strategy = ReplayStrategy(self.problem)
+        strategy.add_analyzer(Counter(strategy))
+        start = time.time()
+        report = strategy.replay(self.fn, keys=['new_results'], speed=.5)
+        assert time.time() - start >= 2 * span
+        assert list(report.index) == ['Counter']
+
@@ -0,0 +1,237 @@
+# -*- coding: utf8 -*-
+# Copyright 2012 -- 2013 Harald Schilly <harald.schilly@univie.ac.at>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+r"""
+Streaming Statistics
+====================
+
+Statistics about the tasks and events of a run, which are updated in :math:`O(1)` per
+sample and need a fixed amount of memory -- no matter how long the run is.
+
+- :class:`.StreamingStats` holds count, mean and variance (via Welford's algorithm),
+  an exponentially weighted moving average, the extrema and a :class:`.QuantileSketch`.
+- :class:`.TaskStatistics` collects them for all tasks of the
+  :class:`~panobbgo.core.StrategyBase`.
+- :class:`.EventStatistics` collects them for the events of the
+  :class:`~panobbgo.core.EventBus`.
+
+.. codeauthor:: Harald Schilly <harald.schilly@univie.ac.at>
+"""
+
+from __future__ import division
+import math
+import numpy as np
+
+
+class QuantileSketch:
+
+    r"""
+    Fixed memory histogram with logarithmically spaced bins
+    for positive values between ``low`` and ``high``.
+    Values outside are counted in the first or last bin.
+    The relative error of a quantile is about
+    :math:`10^{1 / \mathit{bins\_per\_decade}} - 1`.
+    """
+
+    def __init__(self, low=1e-7, high=1e5, bins_per_decade=50):
+        self._log_low = np.log10(low)
+        self._scale = bins_per_decade
+        nb_bins = int(np.ceil((np.log10(high) - self._log_low) * bins_per_decade))
+        # a plain list, since incrementing an item is much faster than for an array
+        self.counts = [0] * nb_bins
+        self._last = nb_bins - 1
+        self.count = 0
+
+    def add(self, x):
+        i = int((math.log10(x) - self._log_low) * self._scale) if x > 0 else 0
+        self.counts[0 if i < 0 else (i if i < self._last else self._last)] += 1
+        self.count += 1
+
+    def quantile(self, q):
+        """
+        The ``q``-quantile, i.e. the geometric center of the bin containing it.
+        ``NaN`` if the sketch is empty.
+        """
+        if self.count == 0:
+            return np.nan
+        i = np.searchsorted(np.cumsum(self.counts), q * self.count)
+        i = min(i, len(self.counts) - 1)
+        return 10 ** (self._log_low + (i + .5) / self._scale)
+
+
+class StreamingStats:
+
+    """
+    Running statistics of a stream of floats.
+    """
+
+    def __init__(self, alpha=.1, sketch=True):
+        """
+        Args:
+
+        - ``alpha``: weight of new samples in the :attr:`.ewma`.
+        - ``sketch``: if ``False``, no :class:`.QuantileSketch` is kept.
+        """
+        self.alpha = alpha
+        self.count = 0
+        self.mean = np.nan
+        self._m2 = 0.
+        self.ewma = np.nan
+        self.min = np.inf
+        self.max = -np.inf
+        self.sketch = QuantileSketch() if sketch else None
+
+    def add(self, x):
+        self.count += 1
+        if self.count == 1:
+            self.mean = self.ewma = x
+        else:
+            delta = x - self.mean
+            self.mean += delta / self.count
+            self._m2 += delta * (x - self.mean)
+            self.ewma += self.alpha * (x - self.ewma)
+        if x < self.min:
+            self.min = x
+        if x > self.max:
+            self.max = x
+        if self.sketch is not None:
+            self.sketch.add(x)
+
+    @property
+    def var(self):
+        """
+        Sample variance, ``NaN`` for less than two samples.
+        """
+        return self._m2 / (self.count - 1) if self.count > 1 else np.nan
+
+    @property
+    def std(self):
+        return np.sqrt(self.var)
+
+    def quantile(self, q):
+        return self.sketch.quantile(q) if self.sketch is not None else np.nan
+
+    def __len__(self):
+        return self.count
+
+    def __repr__(self):
+        return '%.3g (%.3g) [s] mean (std), %.3g median, %.3g q90, %d samples' % \
+            (self.mean, self.std, self.quantile(.5), self.quantile(.9), self.count)
+
+
+class TaskStatistics:
+
+    """
+    Statistics of all finished tasks:
+
+    - :attr:`.evaltime`: time spent evaluating a task on the worker,
+    - :attr:`.walltime`: time between submitting a task and collecting it,
+    - :attr:`.queue_delay`: the difference, i.e. dispatch overhead and time
+      the task was queued,
+    - :attr:`.point_time`: evaluation time per point,
+    - the evaluation time per point of each heuristic via :meth:`.heuristic`, and
+    - the evaluation time per point on each worker via :meth:`.worker`.
+    """
+
+    def __init__(self, alpha=.1):
+        self.alpha = alpha
+        self.evaltime = StreamingStats(alpha)
+        self.walltime = StreamingStats(alpha)
+        self.queue_delay = StreamingStats(alpha)
+        self.point_time = StreamingStats(alpha)
+        self._heuristics = {}
+        self._workers = {}
+
+    def add_task(self, results, elapsed, walltime, worker=None):
+        """
+        Records a finished task with the given list of ``results``,
+        which has been evaluated on the ``worker`` (if known).
+        """
+        self.evaltime.add(elapsed)
+        self.walltime.add(walltime)
+        self.queue_delay.add(max(0., walltime - elapsed))
+        if len(results) == 0:
+            return
+        cost = elapsed / len(results)
+        self.point_time.add(cost)
+        for r in results:
+            self.heuristic(r.who).add(cost)
+        if worker is not None:
+            self.worker(worker).add(cost)
+
+    def heuristic(self, who):
+        """
+        Evaluation cost per point of the heuristic named ``who``.
+        """
+        if who not in self._heuristics:
+            self._heuristics[who] = StreamingStats(self.alpha, sketch=False)
+        return self._heuristics[who]
+
+    @property
+    def heuristics(self):
+        return sorted(self._heuristics.keys())
+
+    def worker(self, worker):
+        """
+        Evaluation cost per point on the given ``worker``.
+        """
+        if worker not in self._workers:
+            self._workers[worker] = StreamingStats(self.alpha, sketch=False)
+        return self._workers[worker]
+
+    @property
+    def workers(self):
+        return sorted(self._workers.keys())
+
+    @property
+    def nb_tasks(self):
+        return self.evaltime.count
+
+    def __repr__(self):
+        return 'TaskStatistics[%d tasks | eval %s | queue %s]' % \
+            (self.nb_tasks, self.evaltime, self.queue_delay)
+
+
+class EventStatistics:
+
+    """
+    Statistics of the events of one key for one subscriber,
+    see :meth:`~panobbgo.core.EventBus.stats`:
+
+    - :attr:`.published`, :attr:`.delivered` and :attr:`.failed` count the events,
+    - :attr:`.wait` is the time between publishing and handling an event, and
+    - :attr:`.handler` is the execution time of the handler.
+    """
+
+    def __init__(self):
+        self.published = 0
+        self.delivered = 0
+        self.failed = 0
+        self.wait = StreamingStats()
+        self.handler = StreamingStats()
+
+    @property
+    def total_time(self):
+        """
+        Total execution time of the handler in seconds.
+        """
+        return self.handler.mean * self.handler.count if self.handler.count > 0 else 0.
+
+    def __repr__(self):
+        return '%6d pub %6d dlv %3d fail | wait %.1e med %.1e q99 | ' \
+            'handler %.1e med %.1e q99 %.2f [s] total' % \
+            (self.published, self.delivered, self.failed,
+             self.wait.quantile(.5), self.wait.quantile(.99),
+             self.handler.quantile(.5), self.handler.quantile(.99), self.total_time)
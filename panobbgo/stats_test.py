@@ -0,0 +1,57 @@
+# -*- coding: utf8 -*-
+# Copyright 2012 Harald Schilly <harald.schilly@univie.ac.at>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from __future__ import unicode_literals
+
+import numpy as np
+
+from panobbgo.utils import PanobbgoTestCase
+from panobbgo_lib.lib import Point
+
+
+class StatsTests(PanobbgoTestCase):
+
+    def test_streaming_stats(self):
+        from panobbgo.stats import StreamingStats
+        np.random.seed(1)
+        x = np.random.lognormal(-3, 1, size=1000)
+        s = StreamingStats(alpha=.5)
+        assert np.isnan(s.mean) and np.isnan(s.var)
+        for xi in x:
+            s.add(xi)
+        assert len(s) == 1000
+        assert np.isclose(s.mean, x.mean())
+        assert np.isclose(s.var, x.var(ddof=1))
+        assert s.min == x.min() and s.max == x.max()
+        ewma = x[0]
+        for xi in x[1:]:
+            ewma = .5 * ewma + .5 * xi
+        assert np.isclose(s.ewma, ewma)
+        for q in [.1, .5, .9]:
+            assert np.isclose(s.quantile(q), np.percentile(x, 100 * q), rtol=.05)
+
+    def test_task_statistics(self):
+        from panobbgo.stats import TaskStatistics
+        stats = TaskStatistics()
+        results = [self.problem(Point(np.zeros(2), 'a')),
+                   self.problem(Point(np.ones(2), 'b'))]
+        stats.add_task(results, 2., 3.)
+        stats.add_task(results[:1], 1., 1.)
+        assert stats.nb_tasks == 2
+        assert stats.evaltime.mean == 1.5
+        assert stats.queue_delay.max == 1.
+        assert stats.point_time.mean == 1.
+        assert stats.heuristics == ['a', 'b']
+        assert stats.heuristic('a').count == 2
+        assert stats.heuristic('b').mean == 1.
@@ -79,12 +79,13 @@ class StrategyRewarding(StrategyBase):
 
     def execute(self):
         points = []
-        target = self.jobs_per_client * len(self.evaluators)
+        target = self.jobs_per_client * self.free_slots
         self.logger.debug(
             "per_client = %s | target = %s" % (self.jobs_per_client, target))
-        if len(self.evaluators.outstanding) < target:
+        if target > 0:
             s = self.config.smooth
             while True:
+                nb_points = len(points)
                 heurs = self.heuristics
                 perf_sum = sum(h.performance for h in heurs)
                 for h in heurs:
@@ -92,10 +93,10 @@ class StrategyRewarding(StrategyBase):
                     # smoothing
                     prob = (h.performance + s) / (perf_sum + s * len(heurs))
                     nb_h = max(1, round(target * prob))
-                    h_pts = h.get_points(nb_h)
+                    h_pts = h.get_point_list(nb_h)
                     points.extend(h_pts)
                     # print "  %16s -> %s" % (h, nb_h)
-                # stopping criteria
-                if len(points) >= target:
+                # stopping criteria, or wait for new points
+                if len(points) >= target or len(points) == nb_points:
                     break
         return points
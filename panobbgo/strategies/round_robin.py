@@ -32,11 +32,11 @@ class StrategyRoundRobin(StrategyBase):
         StrategyBase.__init__(self, problem, **kwargs)
 
     def execute(self):
-        from IPython.utils.timing import time
         points = []
-        while len(points) == 0:
-            hs = self.heuristics
+        hs = self.heuristics
+        for _ in range(len(hs)):
             self.current = (self.current + 1) % len(hs)
-            points.extend(hs[self.current].get_points(self.size))
-            time.sleep(1e-3)
+            points.extend(hs[self.current].get_point_list(self.size))
+            if len(points) > 0:
+                break
         return points
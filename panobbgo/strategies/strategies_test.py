@@ -14,7 +14,9 @@
 # limitations under the License.
 
 import mock
+import numpy as np
 
+from panobbgo.core import Heuristic
 from panobbgo.heuristics.latin_hypercube import LatinHypercube
 from panobbgo.utils import PanobbgoTestCase
 from panobbgo.strategies import StrategyRoundRobin
@@ -28,6 +30,40 @@ def get_my_setup_cluster():
     return my_setup_cluster
 
 
+def get_serial_setup_cluster():
+    def serial_setup_cluster(self, nb_gens, problem):
+        from panobbgo.evaluators import SerialEvaluator
+        self.generators = mock.MagicMock()
+        self.evaluators = SerialEvaluator(self, problem)
+    return serial_setup_cluster
+
+
+class Repeat(Heuristic):
+
+    """
+    Always proposes the same point.
+    """
+
+    def __init__(self, strategy):
+        Heuristic.__init__(self, strategy, name="Repeat", cap=10)
+
+    def produce(self, n):
+        return np.zeros((n, self.problem.dim))
+
+
+class Spread(Heuristic):
+
+    """
+    Proposes random points in the box.
+    """
+
+    def __init__(self, strategy):
+        Heuristic.__init__(self, strategy, name="Spread", cap=10)
+
+    def produce(self, n):
+        return np.array([self.problem.random_point() for _ in range(n)])
+
+
 class StrategiesTests(PanobbgoTestCase):
 
     def setUp(self):
@@ -42,6 +78,62 @@ class StrategiesTests(PanobbgoTestCase):
         #print rr._heuristics
 
 
+    @mock.patch('panobbgo.core.StrategyBase._setup_cluster', new_callable=get_serial_setup_cluster)
+    def test_round_cache_stops(self, my_setup_cluster):
+        from panobbgo.cache import EvaluationCache
+        rr = StrategyRoundRobin(self.problem, size=5)
+        rr.cache = EvaluationCache(self.problem)
+        rr.config.max_eval = 10
+        rr.config.max_answered = 2.
+        rr.add_heuristic(Repeat(rr))
+
+        # the first point is evaluated, the other four wait for its result
+        assert not rr._round()
+        assert rr.nb_evaluations == 1
+        assert rr.cache.answered == 4
+
+        # all further points are cache hits, only the bound stops the loop
+        rounds = 1
+        while not rr._round():
+            rounds += 1
+            assert rounds < 10
+        assert rr.nb_evaluations == 1
+        assert rr.cache.answered > 2 * 10
+
+    @mock.patch('panobbgo.core.StrategyBase._setup_cluster', new_callable=get_serial_setup_cluster)
+    def test_pending_events(self, my_setup_cluster):
+        import time
+        from panobbgo.core import Module
+        rr = StrategyRoundRobin(self.problem, size=5)
+        rr.config.max_eval = 10
+        rr.add_heuristic(Spread(rr))
+
+        class Tracker(Module):
+
+            def __init__(self, strategy):
+                Module.__init__(self, strategy, 'Tracker')
+                self.pending, self.done = [], []
+
+            def on_new_pending(self, points):
+                self.pending.extend(points.tolist())
+
+            def on_pending_done(self, points):
+                self.done.extend(points.tolist())
+
+        assert not rr.eventbus.subscribed('new_pending')
+        tracker = Tracker(rr)
+        rr.eventbus.register(tracker)
+        assert rr.eventbus.subscribed('new_pending')
+        rounds = 0
+        while len(tracker.done) < 5:
+            rr._round()
+            rounds += 1
+            assert rounds < 100
+            time.sleep(.01)
+        # all evaluated points were pending before
+        assert all(p in tracker.pending for p in tracker.done)
+        assert len(rr.in_flight) == len(tracker.pending) - len(tracker.done)
+
     @mock.patch('panobbgo.core.StrategyBase._setup_cluster', new_callable=get_my_setup_cluster)
     def test_rewarding(self, my_setup_cluster):
         #rwd = StrategyRewarding(self.problem)
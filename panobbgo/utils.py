@@ -120,6 +120,20 @@ def info():
     return v
 
 
+def forkserver_context():
+    """
+    The ``forkserver`` context of :mod:`multiprocessing` for the worker processes
+    (see :mod:`panobbgo.hosting` and :mod:`panobbgo.workers`).
+    The controller already runs threads, when they are started, hence it must not fork itself.
+    The fork server preloads panobbgo, such that the workers start quickly.
+    It doesn't preload the main module, since the workers of panobbgo don't need it.
+    """
+    import multiprocessing
+    ctx = multiprocessing.get_context('forkserver')
+    ctx.set_forkserver_preload(['panobbgo.hosting', 'panobbgo.workers'])
+    return ctx
+
+
 def is_left(p0, p1, ptest):
     return is_right(p1, p0, ptest)
 
@@ -0,0 +1,373 @@
+# -*- coding: utf8 -*-
+# Copyright 2012 -- 2013 Harald Schilly <harald.schilly@univie.ac.at>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+r"""
+Subprocess Workers
+==================
+
+The :class:`.HeuristicWorker` is the base class for heuristics, which compute
+their points in a subprocess (e.g. fitting a model), without blocking their event thread:
+
+- The ``x`` and ``fx`` columns of the results are stored in :class:`.SharedColumns`,
+  which are backed by :mod:`multiprocessing.shared_memory`.
+  Each result is copied there only once, a request only contains ranges of row indices.
+- :meth:`~.HeuristicWorker.submit` returns a :class:`concurrent.futures.Future`
+  immediately. There is at most one request in the subprocess, newer requests wait.
+- A newer request supersedes the older ones: a waiting request is cancelled,
+  the result of a running one is discarded (its future raises :class:`.Superseded`).
+- Results, which are not ``None``, are :meth:`emitted <panobbgo.core.Heuristic.emit>`.
+
+Subclasses implement the static method :meth:`~.HeuristicWorker.work`, which is
+called in the subprocess. The subprocess is started via the ``forkserver``
+of :mod:`multiprocessing`, hence the subclass has to be importable
+(i.e. defined at the top level of a module). If the subprocess exits,
+the heuristic logs a critical message and stops::
+
+    class Mean(HeuristicWorker):
+
+        @staticmethod
+        def work(x, fx):
+            return np.average(x, axis=0, weights=1. / (1. + fx - fx.min()))
+
+        def on_new_best_box(self, best_box):
+            self.submit(best_box.results)
+
+.. codeauthor:: Harald Schilly <harald.schilly@univie.ac.at>
+"""
+
+from __future__ import division
+import threading
+import numpy as np
+
+from .core import Heuristic
+
+
+class Superseded(Exception):
+
+    """
+    The result of a request was discarded, because a newer one was submitted.
+    """
+    pass
+
+
+def _ranges(rows):
+    """
+    Compresses a sequence of row indices into a list of ``(start, stop)`` ranges.
+    """
+    ranges = []
+    for r in rows:
+        if len(ranges) > 0 and ranges[-1][1] == r:
+            ranges[-1][1] = r + 1
+        else:
+            ranges.append([r, r + 1])
+    return [tuple(r) for r in ranges]
+
+
+def _attach(name):
+    """
+    Attaches to an existing shared memory block, without handing it over
+    to the resource tracker of this process (the owner unlinks it).
+    """
+    from multiprocessing import shared_memory
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # before Python 3.13
+        from multiprocessing import resource_tracker
+        shm = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(shm._name, 'shared_memory')
+        return shm
+
+
+def _read_rows(shm, shape, ranges):
+    """
+    Copies the rows in the given ranges out of the shared memory block.
+    """
+    table = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+    if len(ranges) == 0:
+        return np.empty((0, shape[1]))
+    return table[np.concatenate([np.arange(a, b) for a, b in ranges])]
+
+
+class SharedColumns:
+
+    """
+    A table of ``float64`` values with ``width`` columns in shared memory,
+    whose rows are only appended. When it is full, a block with twice the
+    capacity replaces it. The replaced blocks are only released
+    in :meth:`.close`, since a subprocess might still read them.
+    """
+
+    def __init__(self, width, capacity=1024):
+        self.width = width
+        self._n = 0
+        self._shm = None
+        self._retired = []
+        self._lock = threading.Lock()
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        from multiprocessing import shared_memory
+        shm = shared_memory.SharedMemory(create=True, size=max(1, capacity * self.width * 8))
+        table = np.ndarray((capacity, self.width), dtype=np.float64, buffer=shm.buf)
+        if self._shm is not None:
+            table[:self._n] = self.table[:self._n]
+            self._retired.append(self._shm)
+        self._shm = shm
+        self.table = table
+
+    def append(self, rows):
+        """
+        Appends the given 2-dimensional array of ``rows``.
+
+        :return: the indices of the new rows as a :func:`range`.
+        """
+        rows = np.atleast_2d(rows)
+        with self._lock:
+            start = self._n
+            if start + len(rows) > len(self.table):
+                cap = len(self.table)
+                while cap < start + len(rows):
+                    cap *= 2
+                self._allocate(cap)
+            self.table[start:start + len(rows)] = rows
+            self._n += len(rows)
+        return range(start, start + len(rows))
+
+    @property
+    def name(self):
+        """
+        Name of the current shared memory block.
+        """
+        return self._shm.name
+
+    @property
+    def shape(self):
+        return (len(self.table), self.width)
+
+    def __len__(self):
+        return self._n
+
+    def close(self):
+        """
+        Releases all shared memory blocks.
+        """
+        with self._lock:
+            if self._shm is None:
+                return
+            blocks = self._retired + [self._shm]
+            self._retired = []
+            self._shm = self.table = None  # no more views into the buffers
+        for shm in blocks:
+            shm.close()
+            try:
+                shm.unlink()
+            except FileNotFoundError:
+                pass
+
+    def __repr__(self):
+        return 'SharedColumns[%d x %d]' % (self._n, self.width)
+
+
+class HeuristicWorker(Heuristic):
+
+    """
+    A :class:`~panobbgo.core.Heuristic`, which computes in a subprocess,
+    see :mod:`panobbgo.workers`.
+
+    .. Note::
+
+      As with all start methods except ``fork``, the main module of the controller is imported
+      by the subprocess, i.e. a script has to be guarded by ``if __name__ == '__main__':``.
+    """
+
+    def __init__(self, strategy, name=None, cap=None):
+        Heuristic.__init__(self, strategy, name=name, cap=cap)
+        from .utils import forkserver_context
+        self._columns = None
+        self._rows = {}  # id of a result -> row in the columns
+        self._kept = []  # keeps the results alive, i.e. their ids unique
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._running = None  # (id, future) of the request in the subprocess
+        self._waiting = None  # (id, future, message) of the next request
+        self._superseded = set()
+        self._closing = False
+
+        ctx = forkserver_context()
+        self._pipe, child = ctx.Pipe()
+        self._process = ctx.Process(target=self._serve, args=(child, self.work),
+                                    name='%s-worker' % self.name)
+        self._process.daemon = True
+        self._process.start()
+        child.close()
+        t = threading.Thread(target=self._receive, name='%s::worker' % self.name)
+        t.daemon = True
+        t.start()
+
+    @staticmethod
+    def work(x, fx, *args):
+        """
+        Overwrite this method, it is called in the subprocess for each request.
+
+        Args:
+
+        - ``x``: array of the points of the requested results, one per row.
+        - ``fx``: array of their function values.
+        - ``*args``: the additional arguments of :meth:`.submit`.
+
+        :return: ``None`` or points, which are emitted.
+        """
+        raise NotImplementedError()
+
+    def _locate(self, results):
+        """
+        The rows of the given results in the shared columns, new ones are appended.
+        """
+        if self._columns is None:
+            self._columns = SharedColumns(self.problem.dim + 1)
+        rows = [self._rows.get(id(r)) for r in results]
+        new = [r for r, row in zip(results, rows) if row is None]
+        if len(new) > 0:
+            block = np.empty((len(new), self._columns.width))
+            block[:, :-1] = [r.x for r in new]
+            block[:, -1] = [r.fx for r in new]
+            for r, row in zip(new, self._columns.append(block)):
+                self._rows[id(r)] = row
+                self._kept.append(r)
+            rows = [self._rows[id(r)] for r in results]
+        return rows
+
+    def submit(self, results, *args):
+        """
+        Requests :meth:`.work` for the given list of
+        :class:`Results <panobbgo_lib.lib.Result>` and additional picklable ``args``.
+        It supersedes all previous requests.
+
+        :return: :class:`concurrent.futures.Future` of the result of :meth:`.work`.
+        """
+        from concurrent.futures import Future
+        future = Future()
+        with self._lock:
+            rows = self._locate(results)
+            columns = self._columns
+            msg = (columns.name, columns.shape, _ranges(rows), args)
+            self._requests += 1
+            rid = self._requests
+            self._cancel()
+            if self._running is None:
+                self._start(rid, future, msg)
+            else:
+                self._waiting = (rid, future, msg)
+        return future
+
+    def cancel(self):
+        """
+        Cancels the waiting request and discards the result of the running one.
+        """
+        with self._lock:
+            self._cancel()
+
+    def _cancel(self):
+        if self._waiting is not None:
+            self._waiting[1].cancel()
+            self._waiting = None
+        if self._running is not None:
+            self._superseded.add(self._running[0])
+
+    def _start(self, rid, future, msg):
+        future.set_running_or_notify_cancel()
+        try:
+            self._pipe.send((rid,) + msg)
+        except (EOFError, OSError):
+            future.set_exception(RuntimeError("'%s' worker exited" % self.name))
+            return
+        self._running = (rid, future)
+
+    def _receive(self):
+        while True:
+            try:
+                rid, ok, value = self._pipe.recv()
+            except (EOFError, OSError):
+                break
+            with self._lock:
+                _, future = self._running
+                superseded = rid in self._superseded
+                self._superseded.discard(rid)
+                self._running = None
+                if self._waiting is not None:
+                    self._start(*self._waiting)
+                    self._waiting = None
+            if superseded:
+                future.set_exception(Superseded("request %d" % rid))
+            elif not ok:
+                self.logger.critical("'%s' worker failed:\n%s" % (self.name, value))
+                future.set_exception(RuntimeError(value))
+            else:
+                future.set_result(value)
+                if value is not None:
+                    self.emit(value)
+        # the subprocess is gone
+        with self._lock:
+            for item in [self._running, self._waiting]:
+                if item is not None and not item[1].done():
+                    item[1].set_exception(RuntimeError("'%s' worker exited" % self.name))
+            self._running = self._waiting = None
+        if not self._closing:
+            self._process.join(1.)
+            self.logger.critical("'%s' worker process exited (code %s) -> stopping." %
+                                 (self.name, self._process.exitcode))
+            self._stopped = True
+            self.eventbus.unsubscribe(None, self)
+
+    @staticmethod
+    def _serve(pipe, work):
+        """
+        The loop in the subprocess.
+        """
+        import traceback
+        shm = None
+        while True:
+            try:
+                msg = pipe.recv()
+            except (EOFError, OSError):
+                break
+            if msg is None:
+                break
+            rid, name, shape, ranges, args = msg
+            try:
+                if shm is None or shm.name != name:
+                    if shm is not None:
+                        shm.close()
+                    shm = _attach(name)
+                data = _read_rows(shm, shape, ranges)
+                value = work(data[:, :-1], data[:, -1], *args)
+                pipe.send((rid, True, value))
+            except Exception:
+                pipe.send((rid, False, traceback.format_exc()))
+        if shm is not None:
+            shm.close()
+
+    def __stop__(self):
+        self._closing = True
+        try:
+            self._pipe.send(None)
+        except (EOFError, OSError):
+            pass
+        self._process.join(1.)
+        if self._process.is_alive():
+            self._process.terminate()
+        if self._columns is not None:
+            self._columns.close()
+        Heuristic.__stop__(self)
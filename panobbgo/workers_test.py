@@ -0,0 +1,108 @@
+# -*- coding: utf8 -*-
+# Copyright 2012 Harald Schilly <harald.schilly@univie.ac.at>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from __future__ import unicode_literals
+
+import os
+import numpy as np
+
+from panobbgo.utils import PanobbgoTestCase
+from panobbgo.workers import HeuristicWorker
+
+
+class Mean(HeuristicWorker):
+
+    @staticmethod
+    def work(x, fx, delay=0.):
+        import time
+        if delay < 0:
+            raise ValueError("negative delay")
+        time.sleep(delay)
+        return np.r_[x.mean(axis=0), fx.sum(), os.getpid()]
+
+
+class WorkersTests(PanobbgoTestCase):
+
+    def test_ranges(self):
+        from panobbgo.workers import _ranges
+        assert _ranges([]) == []
+        assert _ranges([3, 4, 5, 9, 1, 2]) == [(3, 6), (9, 10), (1, 3)]
+
+    def test_shared_columns(self):
+        from panobbgo.workers import SharedColumns, _attach, _read_rows
+        cols = SharedColumns(3, capacity=2)
+        assert list(cols.append(np.ones((1, 3)))) == [0]
+        name = cols.name
+        assert list(cols.append(np.arange(9.).reshape(3, 3))) == [1, 2, 3]
+        assert cols.shape == (4, 3) and len(cols) == 4
+        assert cols.name != name
+
+        shm = _attach(cols.name)
+        rows = _read_rows(shm, cols.shape, [(3, 4), (0, 1)])
+        shm.close()
+        assert rows.tolist() == [[6., 7., 8.], [1., 1., 1.]]
+        cols.close()
+        cols.close()
+
+    def test_heuristic_worker(self):
+        import time
+        from concurrent.futures import CancelledError
+        from panobbgo.workers import Superseded
+
+        w = Mean(self.strategy)
+        w.problem.project = lambda x: x
+        results = self.random_results(2, 5)
+        # a slow one, which is superseded by the last one
+        slow = w.submit(results[:2], .5)
+        cancelled = w.submit(results[:3])
+        last = w.submit(results[3:])
+        assert isinstance(slow.exception(10), Superseded)
+        assert cancelled.cancelled()
+        self.assertRaises(CancelledError, cancelled.result)
+        value = last.result(10)
+        assert np.allclose(value[:2], np.mean([r.x for r in results[3:]], axis=0))
+        assert np.isclose(value[2], sum(r.fx for r in results[3:]))
+        assert value[3] != os.getpid()
+        # each result is only stored once
+        assert len(w._columns) == 5
+        assert np.allclose(w.submit(results[::-1]).result(10)[2], sum(r.fx for r in results))
+        assert len(w._columns) == 5
+
+        failed = w.submit(results, -1)
+        assert isinstance(failed.exception(10), RuntimeError)
+        assert 'negative delay' in str(failed.exception())
+
+        # only the non-superseded results were emitted
+        deadline = time.time() + 10
+        while w._output.qsize() < 2:
+            assert time.time() < deadline
+            time.sleep(.01)
+        assert len(w.get_points()) == 2
+        w.__stop__()
+        assert not w._process.is_alive()
+
+    def test_worker_exits(self):
+        import time
+        w = Mean(self.strategy)
+        w.problem.project = lambda x: x
+        w._process.kill()
+        # the heuristic notices it and stops
+        deadline = time.time() + 10
+        while not w._stopped:
+            assert time.time() < deadline
+            time.sleep(.01)
+        assert not w.active
+        failed = w.submit(self.random_results(2, 3))
+        assert isinstance(failed.exception(10), RuntimeError)
+        w.__stop__()
@@ -49,6 +49,9 @@ class Rosenbrock(Problem):
     def eval(self, x):
         return np.sum(self.par1 * (x[1:] - x[:-1] ** 2) ** 2 + (1 - x[:-1]) ** 2)
 
+    def eval_batch(self, X):
+        return np.sum(self.par1 * (X[:, 1:] - X[:, :-1] ** 2) ** 2 + (1 - X[:, :-1]) ** 2, axis=1)
+
 
 class RosenbrockConstraint(Problem):
 
@@ -80,6 +83,16 @@ class RosenbrockConstraint(Problem):
         pos[pos < 0] = 0.0
         return np.concatenate([cv, pos])
 
+    def eval_batch(self, X):
+        return np.sum(self.par1 * (X[:, 1:] - X[:, :-1] ** 2) ** 2 + (1 - X[:, :-1]) ** 2, axis=1) - 50
+
+    def eval_constraints_batch(self, X):
+        cv = - (X[:, 1:] - X[:, :-1]) ** 2.0 + self.par2
+        cv[cv < 0] = 0.0
+        pos = -X  # note the -
+        pos[pos < 0] = 0.0
+        return np.hstack([cv, pos])
+
 
 class RosenbrockAbs(Problem):
 
@@ -102,6 +115,10 @@ class RosenbrockAbs(Problem):
         return np.sum(self.par1 * np.abs(x[1:] - np.abs(x[:-1])) +
                       np.abs(1 - x[:-1]))
 
+    def eval_batch(self, X):
+        return np.sum(self.par1 * np.abs(X[:, 1:] - np.abs(X[:, :-1])) +
+                      np.abs(1 - X[:, :-1]), axis=1)
+
 
 class RosenbrockAbsConstraint(Problem):
 
@@ -134,6 +151,17 @@ class RosenbrockAbsConstraint(Problem):
         pos[pos < 0] = 0.0
         return np.concatenate([cv, pos])
 
+    def eval_batch(self, X):
+        return np.sum(self.par1 * np.abs(X[:, 1:] - np.abs(X[:, :-1])) +
+                      np.abs(1 - X[:, :-1]), axis=1)
+
+    def eval_constraints_batch(self, X):
+        cv = - np.abs(X[:, 1:] - X[:, :-1]) + self.par2
+        cv[cv < 0] = 0.0
+        pos = -X  # note the -
+        pos[pos < 0] = 0.0
+        return np.hstack([cv, pos])
+
 
 class RosenbrockStochastic(Problem):
 
@@ -161,6 +189,11 @@ class RosenbrockStochastic(Problem):
             self.par1 * eps * (x[1:] - x[:-1] ** 2) ** 2 + (1 - x[:-1]) ** 2)
         return ret
 
+    def eval_batch(self, X):
+        eps = self.jitter * np.random.rand(len(X), self.dim - 1)
+        return np.sum(
+            self.par1 * eps * (X[:, 1:] - X[:, :-1] ** 2) ** 2 + (1 - X[:, :-1]) ** 2, axis=1)
+
 
 class Himmelblau(Problem):
 
@@ -179,6 +212,9 @@ class Himmelblau(Problem):
         x, y = x[0], x[1]
         return (x ** 2 + y - 11) ** 2 + (x + y ** 2 - 7) ** 2
 
+    def eval_batch(self, X):
+        return self.eval(X.T)
+
 
 class Rastrigin(Problem):
 
@@ -202,6 +238,11 @@ class Rastrigin(Problem):
         return self.par1 * self.dim + \
             np.sum(x ** 2 - self.par1 * np.cos(2 * np.pi * x))
 
+    def eval_batch(self, X):
+        X = X - self.offset
+        return self.par1 * self.dim + \
+            np.sum(X ** 2 - self.par1 * np.cos(2 * np.pi * X), axis=1)
+
 
 class Shekel(Problem):
 
@@ -244,6 +285,12 @@ class Shekel(Problem):
             return self.c[i] + d.dot(d)
         return - np.sum([1. / denom(i) for i in range(self.m)])
 
+    def eval_batch(self, X):
+        # d has shape (n, dims, m)
+        d = X[:, :, np.newaxis] - self.a[np.newaxis, :, :]
+        denom = np.asarray(self.c) + np.sum(d ** 2, axis=1)
+        return - np.sum(1. / denom, axis=1)
+
 
 class DeJong(Problem):
 
@@ -265,6 +312,9 @@ class DeJong(Problem):
     def eval(self, x):
         return self.c * np.dot(x, x)
 
+    def eval_batch(self, X):
+        return self.c * np.sum(X ** 2, axis=1)
+
 
 class Quadruple(Problem):
 
@@ -286,6 +336,9 @@ class Quadruple(Problem):
     def eval(self, x):
         return self.c * np.sum((x / 4.) ** 4)
 
+    def eval_batch(self, X):
+        return self.c * np.sum((X / 4.) ** 4, axis=1)
+
 
 class Powell(Problem):
 
@@ -310,6 +363,9 @@ class Powell(Problem):
             10 * (x[0] - x[3]) ** 2
         return f
 
+    def eval_batch(self, X):
+        return self.eval(X.T)
+
 
 class Trigonometric(Problem):
 
@@ -338,6 +394,13 @@ class Trigonometric(Problem):
             ret += fi ** 2
         return ret
 
+    def eval_batch(self, X):
+        n = self.dim
+        tmp = np.arange(n) * (1 - np.cos(X)) - np.sin(X)
+        # sum_j (cos x_j - tmp_i) = sum_j cos x_j - n tmp_i
+        fi = n - (np.sum(np.cos(X), axis=1)[:, np.newaxis] - n * tmp)
+        return np.sum(fi ** 2, axis=1)
+
 
 class SumDifferentPower(Problem):
 
@@ -356,6 +419,9 @@ class SumDifferentPower(Problem):
     def eval(self, x):
         return np.abs(np.power(x, np.arange(self.dim) + 2)).sum()
 
+    def eval_batch(self, X):
+        return np.abs(np.power(X, np.arange(self.dim) + 2)).sum(axis=1)
+
 
 class Step(Problem):
 
@@ -374,6 +440,9 @@ class Step(Problem):
     def eval(self, x):
         return np.sum(np.abs(x + 0.5) ** 2)
 
+    def eval_batch(self, X):
+        return np.sum(np.abs(X + 0.5) ** 2, axis=1)
+
 
 class Box(Problem):
 
@@ -406,6 +475,9 @@ class Box(Problem):
             ret += tmp ** 2
         return ret
 
+    def eval_batch(self, X):
+        return self.eval(X.T)
+
 
 class Wood(Problem):
 
@@ -429,6 +501,9 @@ class Wood(Problem):
             90 * (x[3] - x[2] ** 2) + (1 - x[2]) ** 2 + \
             10 * (x[1] + x[3] - 2) ** 2 + 10 * (x[1] - x[3])
 
+    def eval_batch(self, X):
+        return self.eval(X.T)
+
 
 class HelicalValley(Problem):
 
@@ -459,9 +534,8 @@ class HelicalValley(Problem):
     @staticmethod
     def _theta(x0, x1):
         ret = 1. / (2 * np.pi) * np.arctan(x1 / x0)
-        if x0 < 0:
-            ret += 0.5
-        return ret
+        # works for scalars and arrays
+        return ret + np.where(np.asarray(x0) < 0, 0.5, 0.)
 
     def eval(self, x):
         f0 = 10 * (x[2] - 10 * self._theta(x[0], x[1]))
@@ -469,6 +543,9 @@ class HelicalValley(Problem):
         f2 = x[2]
         return f0 ** 2 + f1 ** 2 + f2 ** 2
 
+    def eval_batch(self, X):
+        return self.eval(X.T)
+
 
 class Beale(Problem):
 
@@ -495,6 +572,9 @@ class Beale(Problem):
         v = [y[i] - x[0] * (1 - x[1] ** (i + 1)) for i in range(3)]
         return sum(_ ** 2 for _ in v)
 
+    def eval_batch(self, X):
+        return self.eval(X.T)
+
 
 class NesterovQuadratic(Problem):
 
@@ -529,6 +609,12 @@ class NesterovQuadratic(Problem):
             ret += np.abs(x).sum()
         return ret
 
+    def eval_batch(self, X):
+        ret = .5 * ((X.dot(self.A.T) - self.b) ** 2).sum(axis=1)
+        if self.nonsmooth:
+            ret += np.abs(X).sum(axis=1)
+        return ret
+
 
 class Arwhead(Problem):
 
@@ -548,6 +634,9 @@ class Arwhead(Problem):
     def eval(self, x):
         return ((x[:-1] ** 2 + x[-1] ** 2) ** 2 - 4 * x[:-1] + 3).sum()
 
+    def eval_batch(self, X):
+        return ((X[:, :-1] ** 2 + X[:, -1:] ** 2) ** 2 - 4 * X[:, :-1] + 3).sum(axis=1)
+
 
 class Branin(Problem):
 
@@ -568,7 +657,7 @@ class Branin(Problem):
             s = 10,
             t = 1,
             **kwargs):
-        box = np.array([[-5, 10], [0, 15]])
+        box = [(-5, 10), (0, 15)]
         self.a = a
         self.b = b
         self.c = c
@@ -581,9 +670,12 @@ class Branin(Problem):
         x1, x2 = x
         term1 = self.a * (x2 - self.b*x1**2 + self.c*x1 - self.r)**2
         term2 = self.s*(1-self.t)*np.cos(x1)
-        y = term1 + term2 + s;
+        y = term1 + term2 + self.s
         return y
 
+    def eval_batch(self, X):
+        return self.eval(X.T)
+
 
 class GoldsteinPrice(Problem):
     r"""
@@ -594,7 +686,7 @@ class GoldsteinPrice(Problem):
                  \left(30+\left(2x-3y\right)^{2}\left(18-32x+12x^{2}+48y-36xy+27y^{2}\right)\right)
     """
     def __init__(self, **kwargs):
-        box = np.array([-2, 2], [-2, 2])
+        box = [(-2, 2), (-2, 2)]
         Problem.__init__(self, box, **kwargs)
 
     def eval(self, x):
@@ -603,4 +695,7 @@ class GoldsteinPrice(Problem):
         b = 30+(2*x1-3*x2)**2*(18-32*x1+12*x1**2+48*x2-36*x1*x2+27*x2**2)
         return a*b
 
+    def eval_batch(self, X):
+        return self.eval(X.T)
+
 
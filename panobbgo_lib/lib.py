@@ -235,6 +235,13 @@ class BoundingBox:
     def copy(self):
         return type(self)(self.box.copy())
 
+    def clip(self, points):
+        """
+        Projects a point or an array of points (one per row) into the box,
+        all at once (this is faster than :func:`numpy.clip`, in particular for one point).
+        """
+        return np.minimum(np.maximum(points, self.box[:, 0]), self.box[:, 1])
+
     def __contains__(self, point):
         """
         :param Point point: the box of the problem
@@ -315,9 +322,11 @@ class Problem:
         projects given point into the search box.
         e.g. :math:`[-1.1, 1]` with box :math:`[(-1,1),(-1,1)]`
         gives :math:`[-1,1]`
+
+        It also projects a 2-dimensional array of points, one per row, at once.
         """
         assert isinstance(point, np.ndarray), 'point must be a numpy ndarray'
-        return np.minimum(np.maximum(point, self.box[:, 0]), self.box[:, 1])
+        return self._box.clip(point)
 
     def random_point(self):
         """
@@ -346,6 +355,41 @@ class Problem:
         """
         pass
 
+    def eval_batch(self, X):
+        r"""
+        Evaluates all rows of the :math:`(n, \mathit{dim})` array ``X`` at once.
+        By default, this loops over :meth:`.eval`. Overwrite it with a
+        vectorized implementation, if the problem allows it.
+
+        :rtype: numpy.ndarray of length :math:`n`
+        """
+        return np.array([self.eval(x) for x in X], dtype=np.float64)
+
+    def eval_constraints_batch(self, X):
+        r"""
+        Calculates the constraint violations for all rows of ``X`` at once.
+        By default, this loops over :meth:`.eval_constraints`.
+
+        :rtype: :math:`(n, m)` numpy.ndarray or ``None``, if there are no constraints.
+        """
+        cvs = [self.eval_constraints(x) for x in X]
+        if len(cvs) == 0 or cvs[0] is None:
+            return None
+        return np.array(cvs, dtype=np.float64)
+
+    def batch(self, X):
+        """
+        The counterpart of calling the problem for a whole chunk of points,
+        given as the rows of the array ``X``.
+
+        :return: tuple of the array of function values and the array
+                 of constraint violation vectors (or ``None``).
+        """
+        X = X + self.dx if self.dx is not None else X
+        fx = np.asarray(self.eval_batch(X), dtype=np.float64)
+        cv = self.eval_constraints_batch(X)
+        return fx, cv
+
     def __call__(self, point):
         x = point.x + self.dx if self.dx is not None else point.x
         fx = self.eval(x)
@@ -106,6 +106,18 @@ class Lib(unittest.TestCase):
         rbrk = Rosenbrock(2, dx=[2.41, 3.14])
         rbrk.ranges[0] = 1.
 
+    def test_problem_project(self):
+        rbrk = Rosenbrock(2)
+        box = rbrk.box
+        x = np.array([box[0, 0] - 1., box[1, 1] + 1.])
+        assert np.allclose(rbrk.project(x), [box[0, 0], box[1, 1]])
+        X = np.array([x, rbrk.center, -x])
+        P = rbrk.project(X)
+        assert P.shape == (3, 2)
+        assert np.allclose(P[0], rbrk.project(x))
+        assert np.allclose(P[1], rbrk.center)
+        assert np.allclose(P, box.clip(X))
+
     @expected_failure(ValueError, "point must be an instance of lib.Point")
     def test_result_error(self):
         Result([1., 1.], 1.1)
@@ -178,6 +190,37 @@ class Classics(unittest.TestCase):
 
         assert np.isclose(arwhead(x).fx, sum)
 
+    def test_eval_batch(self):
+        np.random.seed(2)
+        problems = [Rosenbrock(3), RosenbrockConstraint(3), RosenbrockAbs(3),
+                    RosenbrockAbsConstraint(3), Himmelblau(), Rastrigin(3, offset=.1),
+                    Shekel(4), DeJong(3), Quadruple(3), Powell(), Trigonometric(3),
+                    SumDifferentPower(3), Step(3), Box(), Wood(), HelicalValley(),
+                    Beale(), NesterovQuadratic(dim=5), Arwhead(dim=4), Branin(),
+                    GoldsteinPrice(), Rosenbrock(2, dx=[.1, .2])]
+        for prob in problems:
+            X = np.array([prob.random_point() for _ in range(7)])
+            fx, cv = prob.batch(X)
+            results = [prob(Point(x, "test")) for x in X]
+            assert fx.shape == (7,)
+            assert np.allclose(fx, [r.fx for r in results]), prob
+            if cv is None:
+                assert all(r.cv == 0. for r in results)
+            else:
+                assert np.allclose(cv, [r.cv_vec for r in results]), prob
+
+    def test_eval_batch_default(self):
+        class Sphere(Problem):
+
+            def eval(self, x):
+                return np.sum(x ** 2)
+
+        sphere = Sphere([(-1, 1)] * 2)
+        X = np.array([[0., 0.], [1., -1.]])
+        fx, cv = sphere.batch(X)
+        assert np.allclose(fx, [0., 2.])
+        assert cv is None
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+
+"""
+Micro-benchmark of the EventBus: the overhead per event of creating it,
+publishing it and delivering it to a handler, which does nothing.
+
+Usage: python sketchpad/bench_eventbus.py [number of events]
+"""
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import sys
+sys.path.append(".")
+import time
+from threading import Event as Flag
+
+from panobbgo.config import Config
+from panobbgo.core import EventBus, Event, Module, delivery
+
+N = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+
+
+class Strategy:
+
+    def __init__(self, config):
+        self.config = config
+
+
+class Sink(Module):
+
+    def __init__(self, strategy, n):
+        Module.__init__(self, strategy)
+        self.n = n
+        self.nb = 0
+        self.done = Flag()
+
+    def on_foo(self, i):
+        self.nb += 1
+        if self.nb == self.n:
+            self.done.set()
+
+    @delivery('batch')
+    def on_bar(self, events):
+        self.nb += len(events)
+        if self.nb >= self.n:
+            self.done.set()
+
+
+class Nop:
+
+    def put(self, event):
+        pass
+
+
+def per_event(seconds):
+    return '%6.2f [us/event]' % (1e6 * seconds / N)
+
+
+def bench(label, dispatch_threads, key='foo', subscribers=1):
+    config = Config(parse_args=False, testing_mode=True)
+    config.dispatch_threads = dispatch_threads
+    config.event_stats_interval = 0
+    config.event_queue_size = 0  # unbounded, measure the overhead only
+    bus = EventBus(config)
+    sinks = [Sink(Strategy(config), N) for _ in range(subscribers)]
+    for sink in sinks:
+        bus.register(sink)
+    start = time.time()
+    for i in range(N):
+        bus.publish(key, i=i)
+    published = time.time() - start
+    for sink in sinks:
+        sink.done.wait()
+    delivered = time.time() - start
+    print('%-40s publish %s   delivered %s' % (label, per_event(published), per_event(delivered)))
+
+
+def bench_publish(label):
+    """
+    Only the fast path of publish, the event queue of the subscriber does nothing.
+    """
+    config = Config(parse_args=False, testing_mode=True)
+    bus = EventBus(config)
+    sink = Sink(Strategy(config), N)
+    sink.eventbus_events = {'foo': Nop()}
+    bus.subscribe('foo', sink)
+    start = time.time()
+    for i in range(N):
+        bus.publish('foo', i=i)
+    print('%-40s publish %s' % (label, per_event(time.time() - start)))
+
+
+if __name__ == '__main__':
+    start = time.time()
+    for i in range(N):
+        Event(i=i)
+    print('%-40s         %s' % ('Event(i=i)', per_event(time.time() - start)))
+    bench_publish('publish only, no-op queue')
+    bench('fifo, dispatcher', 4)
+    bench('fifo, dispatcher, 4 subscribers', 4, subscribers=4)
+    bench('batch, dispatcher', 4, key='bar')
+    bench('fifo, thread per handler', 0)
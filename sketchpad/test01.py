@@ -33,36 +33,38 @@ problem = Rosenbrock(4, par1=10)
 #
 #problem = LocalProblem()
 
-strategy = StrategyRewarding(problem, parse_args=True)
-#strategy = StrategyRoundRobin(problem, parse_args = True)
+if __name__ == '__main__':
+    # the heuristic workers import this module in their subprocess
+    strategy = StrategyRewarding(problem, parse_args=True)
+    #strategy = StrategyRoundRobin(problem, parse_args = True)
 
-strategy.add(Random)
-strategy.add(Nearby, radius=1. / 1000, axes='all', new=3)
-strategy.add(Nearby, radius=1. / 100, axes='all', new=3)
-strategy.add(Nearby, radius=1. / 10, axes='all', new=3)
-strategy.add(Nearby, radius=1. / 10, new=3)
-strategy.add(Zero)
-strategy.add(Extremal)
-strategy.add(Center)
-strategy.add(WeightedAverage)
-strategy.add(NelderMead)
-strategy.add(QuadraticWlsModel)
+    strategy.add(Random)
+    strategy.add(Nearby, radius=1. / 1000, axes='all', new=3)
+    strategy.add(Nearby, radius=1. / 100, axes='all', new=3)
+    strategy.add(Nearby, radius=1. / 10, axes='all', new=3)
+    strategy.add(Nearby, radius=1. / 10, new=3)
+    strategy.add(Zero)
+    strategy.add(Extremal)
+    strategy.add(Center)
+    strategy.add(WeightedAverage)
+    strategy.add(NelderMead)
+    strategy.add(QuadraticWlsModel)
 
-# target of max_eval generated points is the inverse of the gamma function
-if False:
-    from scipy import special as sp
-    from scipy.optimize import fmin
-    from panobbgo.config import get_config
-    config = get_config()
-    m = fmin(lambda x: (sp.gamma(x) - config.max_eval / 3.0) ** 2, [5])
-    div = max(1, int(m[0]))
-else:
-    div = 5  # for 1000, should be 7 to 8
-strategy.add(LatinHypercube, div=div)
+    # target of max_eval generated points is the inverse of the gamma function
+    if False:
+        from scipy import special as sp
+        from scipy.optimize import fmin
+        from panobbgo.config import get_config
+        config = get_config()
+        m = fmin(lambda x: (sp.gamma(x) - config.max_eval / 3.0) ** 2, [5])
+        div = max(1, int(m[0]))
+    else:
+        div = 5  # for 1000, should be 7 to 8
+    strategy.add(LatinHypercube, div=div)
 
-strategy.start()
+    strategy.start()
 
-if strategy.best is None:
-    print("no solution found")
-else:
-    print(u"best: %s" % strategy.best)
+    if strategy.best is None:
+        print("no solution found")
+    else:
+        print(u"best: %s" % strategy.best)